@@ -0,0 +1,104 @@
+"""Matching throughput of tree and ladder order books on deep books
+
+Example:
+    python -m benchmarks.books --levels 100 1000 10000 --orders 200000
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.harness import current_commit
+from stock_exchange.domain.ladder_book import LadderBook
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.order_book import OrderBook
+
+BOOKS = {"tree": OrderBook, "ladder": LadderBook}
+# Price in ticks around which both sides rest
+MID_PRICE = 100000
+
+
+def deep_book(book_class, levels):
+    """Order book with one resting order on every price level of both sides
+
+    Arguments:
+        book_class(type): OrderBook or LadderBook
+        levels(int): Number of price levels per side
+
+    Returns:
+        OrderBook: Order book of stock S
+    """
+    book = book_class("S")
+    for level in range(1, levels + 1):
+        book.add(Order("S", "LMT", "BUY", MID_PRICE - level, 100))
+        book.add(Order("S", "LMT", "SELL", MID_PRICE + level, 100))
+    return book
+
+
+def order_flow(orders, levels, seed=1):
+    """Mix of orders resting inside the book and orders crossing a few levels
+
+    Arguments:
+        orders(int): Number of orders
+        levels(int): Number of price levels per side
+        seed(int): Seed of random generator
+
+    Returns:
+        list: Orders in arrival order
+    """
+    rng = random.Random(seed)
+    flow = []
+    for _ in range(orders):
+        order_type = rng.choice(("BUY", "SELL"))
+        sign = 1 if order_type == "BUY" else -1
+        if rng.random() < 0.6:
+            # Passive order resting somewhere in the book
+            price = MID_PRICE - sign * rng.randint(1, levels)
+        else:
+            # Aggressive order sweeping the top levels of the other side
+            price = MID_PRICE + sign * rng.randint(1, 5)
+        flow.append(Order("S", "LMT", order_type, price, rng.randint(50, 300)))
+    return flow
+
+
+def run(book_name, levels, orders):
+    """Place order flow in deep order book
+
+    Arguments:
+        book_name(str): tree or ladder
+        levels(int): Number of price levels per side
+        orders(int): Number of orders
+
+    Returns:
+        dict: Benchmark results
+    """
+    book = deep_book(BOOKS[book_name], levels)
+    flow = order_flow(orders, levels)
+    fills = 0
+    start = time.perf_counter()
+    for order in flow:
+        fills += len(book.place(order))
+    elapsed = time.perf_counter() - start
+    return {
+        "book": book_name,
+        "levels": levels,
+        "orders": orders,
+        "fills": fills,
+        "seconds": elapsed,
+        "orders_per_sec": orders / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Number of price levels per side")
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--books", nargs="+", choices=sorted(BOOKS), default=["tree", "ladder"])
+    args = parser.parse_args()
+    results = {
+        "commit": current_commit(),
+        "runs": [run(book_name, levels, args.orders)
+                 for levels in args.levels for book_name in args.books],
+    }
+    print(json.dumps(results, indent=2))
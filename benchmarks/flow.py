@@ -0,0 +1,112 @@
+import random
+
+
+class FlowConfig:
+    """Parameters of synthetic order flow
+
+    Args:
+        orders(int): Number of measured commands
+        symbols(int): Number of traded stocks
+        mkt_ratio(float): Share of MKT orders among placed orders
+        quote_ratio(float): Share of QUOTE commands among all commands
+        depth(int): Number of price levels per side placed before measured flow
+        distribution(str): normal or uniform distance of LMT prices from mid price
+        spread(float): Standard deviation (normal) or half width (uniform) in ticks
+        max_amount(int): Largest amount of single order
+        seed(int): Seed making flow reproducible
+    """
+    def __init__(self, orders=10000, symbols=10, mkt_ratio=0.1, quote_ratio=0.1, depth=20,
+                 distribution="normal", spread=10.0, max_amount=100, seed=1):
+        self.orders = orders
+        self.symbols = symbols
+        self.mkt_ratio = mkt_ratio
+        self.quote_ratio = quote_ratio
+        self.depth = depth
+        self.distribution = distribution
+        self.spread = spread
+        self.max_amount = max_amount
+        self.seed = seed
+
+    def to_dict(self):
+        """Generate dictionary from FlowConfig object
+
+        Returns:
+            dict: Flow parameters
+        """
+        return dict(vars(self))
+
+
+# Price step of generated LMT orders
+TICK = 0.01
+# Mid price every stock starts trading around
+MID_PRICE = 100.0
+
+
+def symbol_names(count):
+    """Names of generated stocks
+
+    Arguments:
+        count(int): Number of stocks
+
+    Returns:
+        list: Stock names
+    """
+    return ["S{:04d}".format(i) for i in range(count)]
+
+
+def prefill_flow(config):
+    """Resting LMT orders building book of configured depth on both sides
+
+    Arguments:
+        config(FlowConfig): Flow parameters
+
+    Returns:
+        list: Command lines in console interface grammar
+    """
+    rng = random.Random(config.seed)
+    lines = []
+    for stock_name in symbol_names(config.symbols):
+        for level in range(1, config.depth + 1):
+            amount = rng.randint(1, config.max_amount)
+            lines.append("BUY {} LMT ${:.2f} {}".format(stock_name, MID_PRICE - level * TICK,
+                                                        amount))
+            lines.append("SELL {} LMT ${:.2f} {}".format(stock_name, MID_PRICE + level * TICK,
+                                                         amount))
+    return lines
+
+
+def measured_flow(config):
+    """Reproducible mix of orders and quotes to be measured
+
+    Arguments:
+        config(FlowConfig): Flow parameters
+
+    Returns:
+        list: Command lines in console interface grammar
+    """
+    rng = random.Random(config.seed + 1)
+    stock_names = symbol_names(config.symbols)
+    lines = []
+    for _ in range(config.orders):
+        stock_name = rng.choice(stock_names)
+        if rng.random() < config.quote_ratio:
+            lines.append("QUOTE {}".format(stock_name))
+            continue
+        side = rng.choice(("BUY", "SELL"))
+        amount = rng.randint(1, config.max_amount)
+        if rng.random() < config.mkt_ratio:
+            lines.append("{} {} MKT {}".format(side, stock_name, amount))
+            continue
+        lines.append("{} {} LMT ${:.2f} {}".format(side, stock_name,
+                                                   _lmt_price(rng, config, side), amount))
+    return lines
+
+
+def _lmt_price(rng, config, side):
+    if config.distribution == "uniform":
+        ticks = rng.uniform(-config.spread, config.spread)
+    else:
+        ticks = rng.gauss(0, config.spread)
+    # Buyers lean below and sellers above mid price so part of the flow rests
+    ticks = round(ticks) - 1 if side == "BUY" else round(ticks) + 1
+    return max(TICK, MID_PRICE + ticks * TICK)
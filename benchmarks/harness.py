@@ -0,0 +1,159 @@
+"""Matching throughput and latency benchmark through the use case layer
+
+Example:
+    python -m benchmarks.harness --repo memory --orders 100000 --output results.json
+"""
+import argparse
+import json
+import math
+import subprocess
+import time
+
+from benchmarks.flow import FlowConfig, measured_flow, prefill_flow
+from stock_exchange import commands
+from stock_exchange.cli import ConsoleInterface
+from stock_exchange.main import create_repo
+
+
+def percentile(sorted_values, fraction):
+    """Nearest rank percentile
+
+    Arguments:
+        sorted_values(list): Values sorted ascending, not empty
+        fraction(float): Percentile as fraction, e.g. 0.99
+
+    Returns:
+        float: Percentile value
+    """
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies):
+    """Latency statistics of single command type in microseconds
+
+    Arguments:
+        latencies(list): Latencies in seconds
+
+    Returns:
+        dict: Count, mean and p50/p99/p999 latency
+    """
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_us": sum(values) / len(values) * 1e6,
+        "p50_us": percentile(values, 0.50) * 1e6,
+        "p99_us": percentile(values, 0.99) * 1e6,
+        "p999_us": percentile(values, 0.999) * 1e6,
+    }
+
+
+def perform(repo, lines, latencies=None):
+    """Perform command lines through use cases of console interface
+
+    Arguments:
+        repo(MongoRepo or InMemoryRepo): Repository class object
+        lines(list): Command lines in console interface grammar
+        latencies(dict): Command name -> list collecting latencies, None to skip timing
+    """
+    clock = time.perf_counter
+    for line in lines:
+        start = clock()
+        command = commands.parse_command(line.split())
+        use_case = ConsoleInterface.USE_CASES[command.name](repo)
+        use_case.process_request(command.request)
+        if latencies is not None:
+            latencies.setdefault(command.name, []).append(clock() - start)
+
+
+def run(repo_name, config):
+    """Run benchmark of configured flow against repository
+
+    Arguments:
+        repo_name(str): mongo or memory
+        config(FlowConfig): Flow parameters
+
+    Returns:
+        dict: Benchmark results
+    """
+    repo = create_repo(repo_name)
+    repo.clear()
+    perform(repo, prefill_flow(config))
+    lines = measured_flow(config)
+    latencies = {}
+    start = time.perf_counter()
+    perform(repo, lines, latencies)
+    elapsed = time.perf_counter() - start
+    repo.clear()
+    return {
+        "repo": repo_name,
+        "commit": current_commit(),
+        "config": config.to_dict(),
+        "total": {
+            "commands": len(lines),
+            "seconds": elapsed,
+            "commands_per_sec": len(lines) / elapsed,
+        },
+        "commands": {name: summarize(values) for name, values in sorted(latencies.items())},
+    }
+
+
+def current_commit():
+    """Git commit of working tree so results can be compared across commits
+
+    Returns:
+        str: Commit hash, None outside of git repository
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def add_flow_arguments(parser):
+    """Add FlowConfig parameters to command line parser
+
+    Arguments:
+        parser(ArgumentParser): Command line parser
+    """
+    defaults = FlowConfig()
+    parser.add_argument("--orders", type=int, default=defaults.orders)
+    parser.add_argument("--symbols", type=int, default=defaults.symbols)
+    parser.add_argument("--mkt-ratio", type=float, default=defaults.mkt_ratio)
+    parser.add_argument("--quote-ratio", type=float, default=defaults.quote_ratio)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--distribution", choices=["normal", "uniform"],
+                        default=defaults.distribution)
+    parser.add_argument("--spread", type=float, default=defaults.spread)
+    parser.add_argument("--max-amount", type=int, default=defaults.max_amount)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def flow_config(args):
+    """Create FlowConfig from parsed command line
+
+    Arguments:
+        args(Namespace): Parsed command line
+
+    Returns:
+        FlowConfig: Flow parameters
+    """
+    return FlowConfig(orders=args.orders, symbols=args.symbols, mkt_ratio=args.mkt_ratio,
+                      quote_ratio=args.quote_ratio, depth=args.depth,
+                      distribution=args.distribution, spread=args.spread,
+                      max_amount=args.max_amount, seed=args.seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", choices=["mongo", "memory"], default="memory")
+    parser.add_argument("--output", help="Write results to JSON file instead of stdout")
+    add_flow_arguments(parser)
+    args = parser.parse_args()
+    results = run(args.repo, flow_config(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,76 @@
+"""Memory per resting order of memory repository and its order books
+
+Example:
+    python -m benchmarks.memory --orders 1000000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.harness import current_commit
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+def resting_commands(orders, levels):
+    """Commands of non-crossing LMT orders spread over price levels of both sides
+
+    Prices are in ticks of 0.01 like commands produced by request objects.
+
+    Arguments:
+        orders(int): Number of orders
+        levels(int): Number of price levels per side
+
+    Yields:
+        str, dict: Name of repository method and its command
+    """
+    for i in range(orders):
+        level = i % levels
+        if i % 2:
+            yield "place_lmt_buy", {"command": {"stock_name": "S{}".format(i % 10),
+                                                "price": 9900 - level,
+                                                "amount": "100"}}
+        else:
+            yield "place_lmt_sell", {"command": {"stock_name": "S{}".format(i % 10),
+                                                 "price": 10100 + level,
+                                                 "amount": "100"}}
+
+
+def run(orders, levels):
+    """Rest orders in memory repository measuring allocated memory and time
+
+    Arguments:
+        orders(int): Number of orders
+        levels(int): Number of price levels per side
+
+    Returns:
+        dict: Benchmark results
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = InMemoryRepo()
+    for method, command in resting_commands(orders, levels):
+        getattr(repo, method)(command)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "commit": current_commit(),
+        "orders": orders,
+        "levels": levels,
+        "allocated_bytes": allocated,
+        "bytes_per_order": allocated / orders,
+        "seconds": elapsed,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--levels", type=int, default=1000,
+                        help="Number of price levels per side")
+    args = parser.parse_args()
+    print(json.dumps(run(args.orders, args.levels), indent=2))
@@ -0,0 +1,69 @@
+"""Recovery time of journaled memory repository against journal size
+
+Example:
+    python -m benchmarks.recovery --sizes 10000 100000 --snapshot-every 50000
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.flow import FlowConfig, measured_flow, prefill_flow
+from benchmarks.harness import current_commit, perform
+from stock_exchange.repository.journal import Journal
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+def run(size, snapshot_every, group_size):
+    """Journal flow of given size and measure recovery of repository from it
+
+    Arguments:
+        size(int): Number of measured commands
+        snapshot_every(int): Number of records between snapshots, None for none
+        group_size(int): Number of records fsynced together
+
+    Returns:
+        dict: Benchmark results
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        config = FlowConfig(orders=size, quote_ratio=0.0)
+        journal = Journal(directory, group_size=group_size, snapshot_every=snapshot_every)
+        repo = InMemoryRepo(journal)
+        lines = prefill_flow(config) + measured_flow(config)
+        start = time.perf_counter()
+        perform(repo, lines)
+        journal.close()
+        journaling = time.perf_counter() - start
+        journal_bytes = os.path.getsize(journal.journal_path)
+
+        start = time.perf_counter()
+        recovered = InMemoryRepo(Journal(directory, snapshot_every=snapshot_every))
+        recovery = time.perf_counter() - start
+        recovered.journal.close()
+        return {
+            "orders": len(recovered.orders),
+            "replayed_records": recovered.journal.since_snapshot,
+            "journal_bytes": journal_bytes,
+            "journaling_seconds": journaling,
+            "recovery_seconds": recovery,
+        }
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--snapshot-every", type=int, default=None)
+    parser.add_argument("--group-size", type=int, default=64)
+    args = parser.parse_args()
+    results = {
+        "commit": current_commit(),
+        "snapshot_every": args.snapshot_every,
+        "group_size": args.group_size,
+        "runs": [run(size, args.snapshot_every, args.group_size) for size in args.sizes],
+    }
+    print(json.dumps(results, indent=2))
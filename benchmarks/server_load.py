@@ -0,0 +1,83 @@
+"""End to end load test of running order server with many simulated clients
+
+Example:
+    python -m stock_exchange.server --port 8888 &
+    python -m benchmarks.server_load --port 8888 --clients 1000 --orders 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.flow import measured_flow, prefill_flow
+from benchmarks.harness import add_flow_arguments, current_commit, flow_config, summarize
+
+
+async def client(host, port, lines, latencies):
+    """Send commands one by one waiting for every response
+
+    Arguments:
+        host(str): Server host
+        port(int): Server port
+        lines(list): Command lines of this client
+        latencies(dict): Command word -> list collecting round trip latencies
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    clock = time.perf_counter
+    for line in lines:
+        start = clock()
+        writer.write((line + "\n").encode())
+        await writer.drain()
+        await reader.readline()
+        latencies.setdefault(line.split()[0], []).append(clock() - start)
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+
+
+async def run(host, port, clients, config):
+    """Run load test of configured flow split between clients
+
+    Arguments:
+        host(str): Server host
+        port(int): Server port
+        clients(int): Number of concurrent connections
+        config(FlowConfig): Flow parameters
+
+    Returns:
+        dict: Load test results
+    """
+    await client(host, port, prefill_flow(config), {})
+    lines = measured_flow(config)
+    latencies = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, lines[i::clients], latencies)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        "commit": current_commit(),
+        "clients": clients,
+        "config": config.to_dict(),
+        "total": {
+            "commands": len(lines),
+            "seconds": elapsed,
+            "commands_per_sec": len(lines) / elapsed,
+        },
+        "commands": {name: summarize(values) for name, values in sorted(latencies.items())},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--output", help="Write results to JSON file instead of stdout")
+    add_flow_arguments(parser)
+    args = parser.parse_args()
+    results = asyncio.run(run(args.host, args.port, args.clients, flow_config(args)))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,89 @@
+"""Pipelined matching throughput of stocks split between worker processes
+
+Example:
+    python -m benchmarks.sharding --repo memory --shards 1 2 4 8 --orders 100000
+"""
+import argparse
+import collections
+import json
+import time
+
+from benchmarks.flow import measured_flow, prefill_flow
+from benchmarks.harness import add_flow_arguments, current_commit, flow_config
+from stock_exchange import commands
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+from stock_exchange.repository.sharded_repo import ShardedRepo
+
+
+def submit_all(repo, lines, window):
+    """Submit command lines keeping at most window calls in flight
+
+    Arguments:
+        repo(ShardedRepo): Sharded repository
+        lines(list): PLACE and QUOTE command lines in console interface grammar
+        window(int): Maximal number of calls waiting for result
+    """
+    in_flight = collections.deque()
+    for line in lines:
+        command = commands.parse_command(line.split())
+        if command.name == commands.QUOTE:
+            in_flight.append(repo.submit("quote", command.stock_name))
+        else:
+            place = {"command": command.request.command}
+            in_flight.append(repo.submit(command.name.lower(), place))
+        if len(in_flight) == window:
+            in_flight.popleft().result()
+    for future in in_flight:
+        future.result()
+
+
+def run(repo_name, shards, config, window):
+    """Run configured flow against sharded repository
+
+    Arguments:
+        repo_name(str): mongo or memory
+        shards(int): Number of worker processes
+        config(FlowConfig): Flow parameters
+        window(int): Maximal number of calls waiting for result
+
+    Returns:
+        dict: Benchmark results
+    """
+    if repo_name == "memory":
+        repo_class = InMemoryRepo
+    else:
+        from stock_exchange.repository.mongorepo import MongoRepo
+        repo_class = MongoRepo
+    repo = ShardedRepo(repo_class, shards)
+    repo.clear()
+    submit_all(repo, prefill_flow(config), window)
+    lines = measured_flow(config)
+    start = time.perf_counter()
+    submit_all(repo, lines, window)
+    elapsed = time.perf_counter() - start
+    repo.clear()
+    repo.close()
+    return {
+        "shards": shards,
+        "commands": len(lines),
+        "seconds": elapsed,
+        "commands_per_sec": len(lines) / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", choices=["mongo", "memory"], default="memory")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--window", type=int, default=1000,
+                        help="Maximal number of commands waiting for result")
+    add_flow_arguments(parser)
+    args = parser.parse_args()
+    config = flow_config(args)
+    results = {
+        "repo": args.repo,
+        "commit": current_commit(),
+        "config": config.to_dict(),
+        "runs": [run(args.repo, shards, config, args.window) for shards in args.shards],
+    }
+    print(json.dumps(results, indent=2))
@@ -1,10 +1,13 @@
-from stock_exchange.use_cases.request_objects import (
-    OrderPlaceLmtRequestObject,
-    OrderPlaceMktRequestObject,
-    OrderQuoteRequestObject,
-    OrderViewRequestObject,
-)
+import sys
+import time
+
+from stock_exchange import commands
+from stock_exchange.shared.stats import STATS
 from stock_exchange.use_cases.order_use_case import (
+    OrderAmendUseCase,
+    OrderBarsUseCase,
+    OrderCancelUseCase,
+    OrderDepthUseCase,
     OrderPlaceMktBuyUseCase,
     OrderPlaceMktSellUseCase,
     OrderPlaceLmtBuyUseCase,
@@ -21,6 +24,27 @@ class ConsoleInterface:
         repo(:obj:'MongoRepo', optional): Repository class object for interacting with database
         input_list(list): List with user input command
     """
+    # Number of output lines written at once in batch mode
+    OUTPUT_BATCH = 1000
+    PLACE_COMMANDS = (commands.PLACE_MKT_BUY, commands.PLACE_MKT_SELL,
+                      commands.PLACE_LMT_BUY, commands.PLACE_LMT_SELL)
+    # Commands resulting in batches of rows instead of a single line
+    ROW_COMMANDS = (commands.VIEW, commands.BARS, commands.QUOTES, commands.DEPTH)
+    # Command name -> use case performing it
+    USE_CASES = {
+        commands.PLACE_MKT_BUY: OrderPlaceMktBuyUseCase,
+        commands.PLACE_MKT_SELL: OrderPlaceMktSellUseCase,
+        commands.PLACE_LMT_BUY: OrderPlaceLmtBuyUseCase,
+        commands.PLACE_LMT_SELL: OrderPlaceLmtSellUseCase,
+        commands.VIEW: OrderViewUseCase,
+        commands.QUOTE: OrderQuoteUseCase,
+        commands.BARS: OrderBarsUseCase,
+        commands.QUOTES: OrderQuoteUseCase,
+        commands.DEPTH: OrderDepthUseCase,
+        commands.CANCEL: OrderCancelUseCase,
+        commands.AMEND: OrderAmendUseCase,
+    }
+
     def __init__(self, repo):
         self.repo = repo
         self.input_list = None
@@ -32,22 +56,70 @@ class ConsoleInterface:
         """
         while True:
             self.input_list = self.__get_input()
-            if self.input_list[0] == "BUY":
-                self.__place_buy_order()
-                continue
-            if self.input_list[0] == "SELL":
-                self.__place_sell_order()
+            command = commands.parse_command(self.input_list)
+            if command is None:
                 continue
-            if self.input_list[0] == "VIEW":
-                self.__place_view_orders()
+            if command.name == commands.QUIT:
+                self.repo.clear()
+                break
+            if command.name == commands.STATS:
+                print(STATS.report())
                 continue
-            if self.input_list[0] == "QUOTE":
-                self.__place_quote()
+            self.__perform(command)
+
+    def run_batch(self, lines, output=sys.stdout, summary_only=False):
+        """Perform command lines at full speed, e.g. of file or piped standard input
+
+        Results are written in batches of OUTPUT_BATCH lines. Unknown lines are
+        skipped like in interactive mode, QUIT stops the batch and STATS is not
+        counted as command.
+
+        Arguments:
+            lines(iterable): Command lines
+            output(file): Stream results are written to
+            summary_only(bool): Do not write results, only count them
+
+        Returns:
+            dict: Number of commands, placed orders and unknown lines, elapsed seconds
+                and orders per second
+        """
+        performed = orders = unknown = 0
+        buffer = []
+        start = time.perf_counter()
+        for line in lines:
+            command = commands.parse_command(line.split())
+            if command is None:
+                unknown += 1
                 continue
-            if self.input_list[0] == "QUIT":
-                self.repo.db.drop_collection("orders")
-                self.repo.db.drop_collection("history")
+            if command.name == commands.QUIT:
+                self.repo.clear()
                 break
+            if command.name == commands.STATS:
+                if not summary_only:
+                    buffer.append("{}\n".format(STATS.report()))
+                continue
+            use_case = self.USE_CASES[command.name](self.repo)
+            result = use_case.execute(command.request)
+            performed += 1
+            if command.name in self.PLACE_COMMANDS:
+                orders += 1
+            if summary_only:
+                self.__consume(command, result)
+                continue
+            buffer.append(self.__format(command, result))
+            if len(buffer) >= self.OUTPUT_BATCH:
+                output.write("".join(buffer))
+                buffer = []
+        output.write("".join(buffer))
+        output.flush()
+        elapsed = time.perf_counter() - start
+        return {
+            "commands": performed,
+            "orders": orders,
+            "unknown": unknown,
+            "seconds": elapsed,
+            "orders_per_sec": orders / elapsed if elapsed else 0.0,
+        }
 
     def __get_input(self):
         """Processes raw user input from console
@@ -59,86 +131,41 @@ class ConsoleInterface:
         input_list = raw_input.split()
         return input_list
 
-    def __place_buy_mkt_order(self):
-        """Performs buy at market price use case"""
-        command = {
-            "command": {
-                "stock_name": self.input_list[1],
-                "amount": self.input_list[3]
-            }
-        }
-        request = OrderPlaceMktRequestObject(command)
-        place_use_case = OrderPlaceMktBuyUseCase(self.repo)
-        result = place_use_case.process_request(request)
-        print(result.value)
+    def __perform(self, command):
+        """Performs use case corresponding to command
 
-    def __place_buy_lmt_order(self):
-        """Performs buy at user defined price use case"""
-        command = {
-            "command": {
-                "stock_name": self.input_list[1],
-                "price": self.input_list[3],
-                "amount": self.input_list[4]
-            }
-        }
-        request = OrderPlaceLmtRequestObject(command)
-        place_use_case = OrderPlaceLmtBuyUseCase(self.repo)
-        result = place_use_case.process_request(request)
+        Arguments:
+            command(Command): Parsed user command
+        """
+        use_case = self.USE_CASES[command.name](self.repo)
+        result = use_case.execute(command.request)
+        if command.name in self.ROW_COMMANDS and result:
+            for rows in result.value:
+                print(rows, end="")
+            return
         print(result.value)
 
-    def __place_sell_mkt_order(self):
-        """Performs sell at market price use case"""
-        command = {
-            "command": {
-                "stock_name": self.input_list[1],
-                "amount": self.input_list[3]
-            }
-        }
-        request = OrderPlaceMktRequestObject(command)
-        place_use_case = OrderPlaceMktSellUseCase(self.repo)
-        result = place_use_case.process_request(request)
-        print(result.value)
+    def __consume(self, command, result):
+        """Read rows of performed command without keeping them, they may be lazy
 
-    def __place_sell_lmt_order(self):
-        """Performs sell at user defined price use case"""
-        command = {
-            "command": {
-                "stock_name": self.input_list[1],
-                "price": self.input_list[3],
-                "amount": self.input_list[4]
-            }
-        }
-        request = OrderPlaceLmtRequestObject(command)
-        place_use_case = OrderPlaceLmtSellUseCase(self.repo)
-        result = place_use_case.process_request(request)
-        print(result.value)
+        Arguments:
+            command(Command): Parsed user command
+            result(ResponseSuccess or ResponseFailure): Result of use case
+        """
+        if command.name in self.ROW_COMMANDS and result:
+            for _ in result.value:
+                pass
 
-    def __place_view_orders(self):
-        """Performs view orders use case"""
-        command = {"command": self.input_list[0] + self.input_list[1]}
-        request = OrderViewRequestObject(command)
-        view_use_case = OrderViewUseCase(self.repo)
-        result = view_use_case.process_request(request)
-        print(result.value)
+    def __format(self, command, result):
+        """Output of performed command as printed in interactive mode
 
-    def __place_quote(self):
-        """Performs quote use case"""
-        command = {"command": {"stock_name": self.input_list[1]}}
-        request = OrderQuoteRequestObject.from_dict(command)
-        quote_use_case = OrderQuoteUseCase(self.repo)
-        result = quote_use_case.process_request(request)
-        print(result.value)
+        Arguments:
+            command(Command): Parsed user command
+            result(ResponseSuccess or ResponseFailure): Result of use case
 
-    def __place_buy_order(self):
-        """Perfroms buy use case"""
-        if self.input_list[2] == "MKT":
-            self.__place_buy_mkt_order()
-        if self.input_list[2] == "LMT":
-            self.__place_buy_lmt_order()
-
-    def __place_sell_order(self):
-        """Performs sell use case"""
-        if self.input_list[2] == "MKT":
-            self.__place_sell_mkt_order()
-        if self.input_list[2] == "LMT":
-            self.__place_sell_lmt_order()
+        Returns:
+            str: Output lines
+        """
+        if command.name in self.ROW_COMMANDS and result:
+            return "".join(result.value)
+        return "{}\n".format(result.value)
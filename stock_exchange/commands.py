@@ -0,0 +1,145 @@
+import collections
+
+from stock_exchange.use_cases.request_objects import (
+    OrderAmendRequestObject,
+    OrderBarsRequestObject,
+    OrderCancelRequestObject,
+    OrderDepthRequestObject,
+    OrderPlaceLmtRequestObject,
+    OrderPlaceMktRequestObject,
+    OrderQuoteRequestObject,
+    OrderViewRequestObject,
+)
+
+
+# Parsed user command: use case name, name of stock it trades and its request object
+Command = collections.namedtuple('Command', ['name', 'stock_name', 'request'])
+
+PLACE_MKT_BUY = "PLACE_MKT_BUY"
+PLACE_MKT_SELL = "PLACE_MKT_SELL"
+PLACE_LMT_BUY = "PLACE_LMT_BUY"
+PLACE_LMT_SELL = "PLACE_LMT_SELL"
+VIEW = "VIEW"
+QUOTE = "QUOTE"
+QUOTES = "QUOTES"
+DEPTH = "DEPTH"
+BARS = "BARS"
+CANCEL = "CANCEL"
+AMEND = "AMEND"
+STATS = "STATS"
+QUIT = "QUIT"
+
+
+def parse_command(input_list):
+    """Parse user command shared by console interface and order server
+
+    Arguments:
+        input_list(list): List with user command
+
+    Returns:
+        Command: Parsed command, None if command is unknown or incomplete
+    """
+    try:
+        return _parse(input_list)
+    except (IndexError, ValueError):
+        return None
+
+
+def _parse(input_list):
+    if not input_list:
+        return None
+    parser = _PARSERS.get(input_list[0])
+    return None if parser is None else parser(input_list)
+
+
+def _parse_view(input_list):
+    command = {
+        "command": " ".join(input_list[:2]),
+        "filters": _parse_view_filters(input_list[2:])
+    }
+    return Command(VIEW, None, OrderViewRequestObject.from_dict(command))
+
+
+def _parse_quote(input_list):
+    if len(input_list) > 2:
+        command = {"command": {"stock_names": input_list[1:]}}
+        return Command(QUOTES, None, OrderQuoteRequestObject.from_dict(command))
+    command = {"command": {"stock_name": input_list[1]}}
+    return Command(QUOTE, input_list[1], OrderQuoteRequestObject.from_dict(command))
+
+
+def _parse_depth(input_list):
+    command = {"command": {"stock_name": input_list[1], "levels": int(input_list[2])}}
+    return Command(DEPTH, input_list[1], OrderDepthRequestObject.from_dict(command))
+
+
+def _parse_bars(input_list):
+    command = {"command": {"stock_name": input_list[1], "interval": input_list[2]}}
+    return Command(BARS, input_list[1], OrderBarsRequestObject.from_dict(command))
+
+
+def _parse_cancel(input_list):
+    command = {"command": {"order_id": input_list[1]}}
+    return Command(CANCEL, None, OrderCancelRequestObject.from_dict(command))
+
+
+def _parse_amend(input_list):
+    command = {"command": {"order_id": input_list[1], "amount": int(input_list[2])}}
+    return Command(AMEND, None, OrderAmendRequestObject.from_dict(command))
+
+
+def _parse_view_filters(words):
+    """Parse filters of VIEW ORDERS [STOCK] [BUY|SELL] [STATUS] [PAGE {N}] [LIMIT {N}]"""
+    filters = {}
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word in ("BUY", "SELL"):
+            filters["order_type"] = word
+        elif word in ("PENDING", "PARTIAL", "FILLED", "CANCELLED"):
+            filters["status"] = word
+        elif word in ("PAGE", "LIMIT"):
+            i += 1
+            filters[word.lower()] = int(words[i])
+        else:
+            filters["stock_name"] = word
+        i += 1
+    return filters
+
+
+def _parse_place(input_list):
+    if input_list[2] == "MKT":
+        command = {
+            "command": {
+                "stock_name": input_list[1],
+                "amount": input_list[3]
+            }
+        }
+        name = PLACE_MKT_BUY if input_list[0] == "BUY" else PLACE_MKT_SELL
+        return Command(name, input_list[1], OrderPlaceMktRequestObject.from_dict(command))
+    if input_list[2] == "LMT":
+        command = {
+            "command": {
+                "stock_name": input_list[1],
+                "price": input_list[3],
+                "amount": input_list[4]
+            }
+        }
+        name = PLACE_LMT_BUY if input_list[0] == "BUY" else PLACE_LMT_SELL
+        return Command(name, input_list[1], OrderPlaceLmtRequestObject.from_dict(command))
+    return None
+
+
+# First word of command -> parser of the whole command
+_PARSERS = {
+    "BUY": _parse_place,
+    "SELL": _parse_place,
+    "VIEW": _parse_view,
+    "QUOTE": _parse_quote,
+    "DEPTH": _parse_depth,
+    "BARS": _parse_bars,
+    "CANCEL": _parse_cancel,
+    "AMEND": _parse_amend,
+    "STATS": lambda input_list: Command(STATS, None, None),
+    "QUIT": lambda input_list: Command(QUIT, None, None),
+}
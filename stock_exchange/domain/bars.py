@@ -0,0 +1,157 @@
+import collections
+import copy
+import time
+
+
+# Bar interval name -> length in nanoseconds
+INTERVALS = {
+    "1s": 1000000000,
+    "1m": 60 * 1000000000,
+    "1h": 3600 * 1000000000,
+}
+
+
+class MonotonicClock:
+    """Wall clock in nanoseconds since epoch that never goes backwards
+
+    Timestamps stay aligned with wall time for bars, but a clock adjustment only
+    holds them at the latest timestamp instead of reordering trades.
+    """
+    def __init__(self):
+        self.last = 0
+
+    def __call__(self):
+        now = time.time_ns()
+        if now > self.last:
+            self.last = now
+        return self.last
+
+
+# Clock of accepted orders and trades of this process
+CLOCK = MonotonicClock()
+
+
+class Bar:
+    """Open, high, low, close prices and traded amount of stock over one interval
+
+    Args:
+        start(int): Start of interval in nanoseconds since epoch
+        price(int): Price in ticks of first trade of interval
+        amount(int): Amount of stocks traded by first trade of interval
+    """
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, start, price, amount):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = amount
+
+    def add(self, price, amount):
+        """Account trade within interval of bar
+
+        Arguments:
+            price(int): Price in ticks
+            amount(int): Amount of stocks traded
+        """
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += amount
+
+    def merge(self, later):
+        """Account later bar within interval of bar
+
+        Arguments:
+            later(Bar): Bar of shorter interval starting after trades of this bar
+        """
+        if later.high > self.high:
+            self.high = later.high
+        if later.low < self.low:
+            self.low = later.low
+        self.close = later.close
+        self.volume += later.volume
+
+
+class BarAggregator:
+    """OHLCV bars of every stock and interval in INTERVALS, updated on every trade
+
+    A trade only updates the current bar of the shortest interval. When that bar is
+    closed by a trade of a later bar it is merged into bars of longer intervals, and
+    bars of longer intervals are read together with the current bar of the shortest
+    one. Only the latest max_bars bars of every stock and interval are kept, intervals
+    without trades have no bar.
+
+    Args:
+        max_bars(int): Number of bars kept per stock and interval
+    """
+    def __init__(self, max_bars=1440):
+        self.max_bars = max_bars
+        # Stock name -> bars from oldest to newest of every interval in INTERVALS order
+        self._bars = {}
+        self._lengths = tuple(INTERVALS.values())
+
+    def add(self, stock_name, price, amount, timestamp):
+        """Account trade in bars of all intervals
+
+        Arguments:
+            stock_name(str): Name of traded stock
+            price(int): Price in ticks
+            amount(int): Amount of stocks traded
+            timestamp(int): Time of trade in nanoseconds since epoch, not older
+                than previous trade of stock
+        """
+        intervals = self._bars.get(stock_name)
+        if intervals is None:
+            intervals = self._bars[stock_name] = [collections.deque(maxlen=self.max_bars)
+                                                  for _ in self._lengths]
+        bars = intervals[0]
+        start = timestamp - timestamp % self._lengths[0]
+        if bars and bars[-1].start == start:
+            bars[-1].add(price, amount)
+            return
+        if bars:
+            for longer, length in zip(intervals[1:], self._lengths[1:]):
+                self.__merge(longer, length, bars[-1])
+        bars.append(Bar(start, price, amount))
+
+    def bars(self, stock_name, interval):
+        """Bars of particular stock and interval
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of interval in INTERVALS
+
+        Returns:
+            list: Bars from oldest to newest
+        """
+        intervals = self._bars.get(stock_name)
+        if intervals is None:
+            return []
+        index = list(INTERVALS).index(interval)
+        if index == 0:
+            return list(intervals[0])
+        # Current bar of the shortest interval is merged into a copy of its longer bar
+        bars = collections.deque(intervals[index], maxlen=self.max_bars)
+        if bars:
+            bars[-1] = copy.copy(bars[-1])
+        self.__merge(bars, self._lengths[index], intervals[0][-1])
+        return list(bars)
+
+    @staticmethod
+    def __merge(bars, length, shorter):
+        """Merge closed bar of the shortest interval into bars of longer interval
+
+        Arguments:
+            bars(deque): Bars of longer interval
+            length(int): Length of longer interval in nanoseconds
+            shorter(Bar): Bar of the shortest interval
+        """
+        start = shorter.start - shorter.start % length
+        if bars and bars[-1].start == start:
+            bars[-1].merge(shorter)
+        else:
+            bar = copy.copy(shorter)
+            bar.start = start
+            bars.append(bar)
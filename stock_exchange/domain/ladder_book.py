@@ -0,0 +1,220 @@
+import collections
+import heapq
+
+from stock_exchange.domain.order_book import OrderBook
+
+
+# Stocks matched in LadderBook instead of OrderBook
+LADDER_STOCKS = set()
+
+
+def create_book(stock_name, orders=None):
+    """Create empty order book of the structure selected for particular stock
+
+    Arguments:
+        stock_name(str): Name of stock
+        orders(dict): Index of resting orders by id shared by books, None for own index
+
+    Returns:
+        OrderBook: LadderBook for stocks in LADDER_STOCKS, OrderBook otherwise
+    """
+    if stock_name in LADDER_STOCKS:
+        return LadderBook(stock_name, orders=orders)
+    return OrderBook(stock_name, orders)
+
+
+class LadderBook(OrderBook):
+    """Order book keeping price levels in an array indexed by tick offset
+
+    Meant for liquid stocks trading in a narrow band of prices. Slot i of a side holds
+    the FIFO queue of price base + i, or None. Occupied slots are marked in a bitmap of
+    64 bit words with a summary bitmap of non-empty words, so adding and dropping a
+    level takes constant time and the next best level after the best one empties is
+    found by scanning two machine words instead of keeping sorted keys. Best prices
+    are cached per side.
+
+    The ladder starts centered on the first price and grows to cover prices it meets,
+    up to max_width levels. Levels of prices outside of it are kept sorted as in
+    OrderBook, so an outlier price neither blows up memory nor slows matching in the
+    band.
+
+    Args:
+        stock_name(str): Name of stock
+        width(int): Number of price levels of the initial ladder, rounded up to
+            whole 64 bit words
+        orders(dict): Index of resting orders by id, None for an own index
+        max_width(int): Largest number of price levels of the ladder, rounded up to
+            whole 64 bit words
+    """
+    def __init__(self, stock_name, width=4096, orders=None, max_width=65536):
+        super().__init__(stock_name, orders)
+        self.width = (width + 63) >> 6 << 6
+        self.max_width = max(self.width, (max_width + 63) >> 6 << 6)
+        # Price in ticks of slot 0, None before first LMT order
+        self.base = None
+        # Price offset -> FIFO queue of resting LMT orders or None, per side
+        self._ladder = {"BUY": [], "SELL": []}
+        # Bit per price offset holding a queue, in 64 bit words, per side
+        self._words = {"BUY": [], "SELL": []}
+        # Bit per non-empty word, per side
+        self._summary = {"BUY": 0, "SELL": 0}
+        # Cached best price of the ladder per side, None if it has no LMT orders
+        self._best = {"BUY": None, "SELL": None}
+
+    def depth(self, side, count):
+        sizes = self._sizes[side]
+        levels = [(price, sizes[price]) for price in self.__walk(side, count)]
+        outliers = super().depth(side, count)
+        if outliers:
+            levels = list(heapq.merge(levels, outliers, reverse=side == "BUY"))[:count]
+        return levels
+
+    def _best_price(self, side):
+        best = self._best[side]
+        if not self._keys[side]:
+            return best
+        outlier = super()._best_price(side)
+        if best is None:
+            return outlier
+        return max(best, outlier) if side == "BUY" else min(best, outlier)
+
+    def _level(self, side, price):
+        queue = self._levels[side].get(price)
+        if queue is not None:
+            return queue
+        base = self.base
+        if base is None or price < base:
+            return None
+        ladder = self._ladder[side]
+        offset = price - base
+        return ladder[offset] if offset < len(ladder) else None
+
+    def _new_level(self, side, price):
+        if not self.__cover(price):
+            return super()._new_level(side, price)
+        offset = price - self.base
+        queue = self._ladder[side][offset] = collections.deque()
+        words = self._words[side]
+        index = offset >> 6
+        if not words[index]:
+            self._summary[side] |= 1 << index
+        words[index] |= 1 << (offset & 63)
+        best = self._best[side]
+        if best is None or (price > best if side == "BUY" else price < best):
+            self._best[side] = price
+        return queue
+
+    def _drop_level(self, side, price):
+        if price in self._levels[side]:
+            super()._drop_level(side, price)
+            return
+        offset = price - self.base
+        self._ladder[side][offset] = None
+        words = self._words[side]
+        index = offset >> 6
+        words[index] &= ~(1 << (offset & 63))
+        if not words[index]:
+            self._summary[side] &= ~(1 << index)
+        if price == self._best[side]:
+            self._best[side] = self.__scan(side, offset)
+
+    def __scan(self, side, offset):
+        """Find best price of one side after its best level at offset was dropped
+
+        Arguments:
+            side(str): BUY or SELL
+            offset(int): Offset of dropped level, no better level exists
+        Returns:
+            int: Best price in ticks, None if the side has no LMT orders
+        """
+        words = self._words[side]
+        index = offset >> 6
+        if side == "BUY":
+            # Highest set bit below the dropped level
+            word = words[index] & ((1 << (offset & 63)) - 1)
+            if not word:
+                summary = self._summary[side] & ((1 << index) - 1)
+                if not summary:
+                    return None
+                index = summary.bit_length() - 1
+                word = words[index]
+            bit = word.bit_length() - 1
+        else:
+            # Lowest set bit above the dropped level
+            word = words[index] >> (offset & 63) << (offset & 63)
+            if not word:
+                summary = self._summary[side] >> (index + 1) << (index + 1)
+                if not summary:
+                    return None
+                index = (summary & -summary).bit_length() - 1
+                word = words[index]
+            bit = (word & -word).bit_length() - 1
+        return self.base + (index << 6) + bit
+
+    def __walk(self, side, count):
+        """Prices of best ladder levels of one side, walking its bitmap
+
+        Arguments:
+            side(str): BUY or SELL
+            count(int): Maximal number of levels
+        Returns:
+            list: Prices in ticks from the best level
+        """
+        words = self._words[side]
+        summary = self._summary[side]
+        prices = []
+        while summary and len(prices) < count:
+            if side == "BUY":
+                index = summary.bit_length() - 1
+            else:
+                index = (summary & -summary).bit_length() - 1
+            summary ^= 1 << index
+            word = words[index]
+            start = self.base + (index << 6)
+            while word and len(prices) < count:
+                if side == "BUY":
+                    bit = word.bit_length() - 1
+                else:
+                    bit = (word & -word).bit_length() - 1
+                word ^= 1 << bit
+                prices.append(start + bit)
+        return prices
+
+    def __cover(self, price):
+        """Grow ladders of both sides so they have a slot for price
+
+        Arguments:
+            price(int): Price in ticks
+        Returns:
+            bool: Ladders have a slot for price, False if they would grow beyond
+                max_width
+        """
+        if self.base is None:
+            self.base = max(0, price - self.width // 2)
+            for side in self._ladder:
+                self._ladder[side] = [None] * self.width
+                self._words[side] = [0] * (self.width >> 6)
+            return True
+        length = len(self._ladder["BUY"])
+        room = self.max_width - length
+        if price < self.base:
+            # Grow at least by doubling so repeated lower prices stay amortized O(1),
+            # whole words keep offsets of bits within their word
+            base = max(0, min(price, self.base - min(length, room)))
+            shift = (self.base - base + 63) >> 6 << 6
+            if shift > room:
+                return False
+            for side in self._ladder:
+                self._ladder[side][:0] = [None] * shift
+                self._words[side][:0] = [0] * (shift >> 6)
+                self._summary[side] <<= shift >> 6
+            self.base -= shift
+        elif price >= self.base + length:
+            grow = (price - self.base + 1 - length + 63) >> 6 << 6
+            if grow > room:
+                return False
+            grow = min(max(grow, length), room)
+            for side in self._ladder:
+                self._ladder[side].extend([None] * grow)
+                self._words[side].extend([0] * (grow >> 6))
+        return True
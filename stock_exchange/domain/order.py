@@ -4,19 +4,51 @@ from stock_exchange.shared.domain_model import DomainModel
 class Order(object):
     """Domain entity structure for market order
 
+    Orders are slotted records, the same object is stored by the repository and rests
+    in the order book, which updates its fill state in place.
+
     Args:
         stock_name(str): Name of stock
         price_type(str): LMT or MKT order price
         order_type(str): BUY or SELL order
-        price(float): Price of order
-        amount(int): Amount of stocks to buy or sell
+        price(int): Price of order in ticks of its stock, -1 for MKT order before its
+            first trade
+        total_qty(int): Amount of stocks to buy or sell
+        filled_qty(int): Amount of stocks already bought or sold
+        order_id(any): Identifier of order in repository, None before it is stored
+        timestamp(int): Time order was accepted in nanoseconds since epoch
+        cancelled(bool): Remaining amount of order was cancelled
     """
-    def __init__(self, stock_name, price_type, order_type, price, amount):
+    __slots__ = ('stock_name', 'price_type', 'order_type', 'price', 'total_qty', 'filled_qty',
+                 'order_id', 'timestamp', 'cancelled')
+
+    def __init__(self, stock_name, price_type, order_type, price, total_qty, filled_qty=0,
+                 order_id=None, timestamp=0, cancelled=False):
         self.stock_name = stock_name
         self.price_type = price_type
         self.order_type = order_type
-        self.price = float(price)
-        self.amount = amount
+        self.price = int(price)
+        self.total_qty = int(total_qty)
+        self.filled_qty = int(filled_qty)
+        self.order_id = order_id
+        self.timestamp = timestamp
+        self.cancelled = cancelled
+
+    @property
+    def remaining(self):
+        """Amount of stocks left to trade"""
+        return self.total_qty - self.filled_qty
+
+    @property
+    def status(self):
+        """PENDING, PARTIAL or FILLED depending on traded amount, CANCELLED once cancelled"""
+        if self.cancelled:
+            return "CANCELLED"
+        if self.filled_qty == 0:
+            return "PENDING"
+        if self.filled_qty < self.total_qty:
+            return "PARTIAL"
+        return "FILLED"
 
     @classmethod
     def from_dict(cls, input_dict):
@@ -32,8 +64,12 @@ class Order(object):
             stock_name=input_dict['stock_name'],
             price_type=input_dict['price_type'],
             order_type=input_dict['order_type'],
-            price=float(input_dict['price']),
-            amount=input_dict['amount'],
+            price=input_dict['price'],
+            total_qty=input_dict['total_qty'],
+            filled_qty=input_dict.get('filled_qty', 0),
+            order_id=input_dict.get('_id'),
+            timestamp=input_dict.get('timestamp', 0),
+            cancelled=input_dict.get('status') == "CANCELLED",
         )
         return order
 
@@ -41,15 +77,20 @@ class Order(object):
         """Generate dictionary from Order object
 
         Returns:
-            order_dict(dict): Dictionary with order information
+            order_dict(dict): Dictionary with order information, with _id once order is stored
         """
         order_dict = {
             "stock_name": self.stock_name,
             "price_type": self.price_type,
             "order_type": self.order_type,
             "price": self.price,
-            "amount": self.amount,
+            "total_qty": self.total_qty,
+            "filled_qty": self.filled_qty,
+            "status": self.status,
+            "timestamp": self.timestamp,
         }
+        if self.order_id is not None:
+            order_dict["_id"] = self.order_id
         return order_dict
 
 
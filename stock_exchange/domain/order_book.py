@@ -0,0 +1,283 @@
+import bisect
+import collections
+
+
+# Single trade between incoming order and resting maker order
+Fill = collections.namedtuple('Fill', ['maker', 'price', 'amount'])
+
+
+class OrderBook:
+    """Price-time priority order book of a single stock
+
+    Limit orders rest in price levels sorted from best to worst price, every level
+    being a FIFO queue. MKT orders that could not be filled rest in a separate FIFO
+    queue per side.
+
+    Incoming orders consume resting liquidity strictly best price first and oldest
+    first within a price. Trades with a resting LMT order happen at its price, trades
+    with a resting MKT order happen at the limit price of the incoming order, so
+    resting MKT orders rank ahead of the level at that limit price and behind all
+    better levels. Two MKT orders only trade at the last transaction price.
+
+    Resting orders are indexed by id. Cancelling an order takes its amount off its
+    price level, or drops the level, at once and leaves the order in its queue,
+    where matching discards it once it reaches the front, so no queue is searched.
+
+    Args:
+        stock_name(str): Name of stock
+        orders(dict): Index of resting orders by id, shared with other books of the
+            same repository, None for an own index
+    """
+    def __init__(self, stock_name, orders=None):
+        self.stock_name = stock_name
+        # Order id -> resting order, maintained by the book
+        self.orders = {} if orders is None else orders
+        # Price of last transaction, None before first trade
+        self.last_price = None
+        # Price -> FIFO queue of resting LMT orders, per side
+        self._levels = {"BUY": {}, "SELL": {}}
+        # Sort keys of price levels per side, best level is the last one
+        self._keys = {"BUY": [], "SELL": []}
+        # Price -> aggregate remaining amount of resting LMT orders, per side
+        self._sizes = {"BUY": {}, "SELL": {}}
+        # FIFO queue of resting MKT orders per side
+        self._market = {"BUY": collections.deque(), "SELL": collections.deque()}
+
+    def place(self, order):
+        """Match incoming order against the book and rest what is left of it
+
+        Arguments:
+            order(Order): Incoming order, its filled amount is updated in place
+
+        Returns:
+            fills(list): Fill tuples in the order trades happened
+        """
+        fills = self.match(order)
+        if order.remaining > 0:
+            self.add(order)
+        return fills
+
+    def add(self, order):
+        """Rest order in the book without matching it
+
+        Arguments:
+            order(Order): Order to rest
+        """
+        self.orders[order.order_id] = order
+        side = order.order_type
+        if order.price_type == "MKT":
+            self._market[side].append(order)
+            return
+        queue = self._level(side, order.price)
+        if queue is None:
+            queue = self._new_level(side, order.price)
+        queue.append(order)
+        sizes = self._sizes[side]
+        sizes[order.price] = sizes.get(order.price, 0) + order.remaining
+
+    def match(self, order):
+        """Trade incoming order against resting orders of the opposite side
+
+        Arguments:
+            order(Order): Incoming order, its filled amount is updated in place
+
+        Returns:
+            fills(list): Fill tuples in the order trades happened
+        """
+        fills = []
+        side = "SELL" if order.order_type == "BUY" else "BUY"
+        market = self._market[side]
+        if order.price_type == "MKT":
+            self.__fill_from_levels(order, side, fills, inclusive=True)
+            if self.last_price is not None:
+                self.__fill_from_queue(order, market, self.last_price, fills)
+            return fills
+
+        self.__fill_from_levels(order, side, fills, inclusive=False)
+        self.__fill_from_queue(order, market, order.price, fills)
+        self.__fill_from_levels(order, side, fills, inclusive=True)
+        return fills
+
+    def cancel(self, order_id):
+        """Remove remaining amount of resting order from the book
+
+        Arguments:
+            order_id(any): Id of resting order
+        Returns:
+            Order: Cancelled order, None if no such order rests in the book
+        """
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        order.cancelled = True
+        self.__reduce(order, order.remaining)
+        return order
+
+    def amend(self, order_id, total_qty):
+        """Reduce total amount of resting order keeping its time priority
+
+        Arguments:
+            order_id(any): Id of resting order
+            total_qty(int): New total amount, above filled and below total amount
+        Returns:
+            Order: Amended order, None if no such order rests in the book
+        """
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+        reduction = order.total_qty - total_qty
+        order.total_qty = total_qty
+        self.__reduce(order, reduction)
+        return order
+
+    def best_bid(self):
+        """Best price of resting BUY LMT orders, None if there are none"""
+        return self._best_price("BUY")
+
+    def best_ask(self):
+        """Best price of resting SELL LMT orders, None if there are none"""
+        return self._best_price("SELL")
+
+    def level_size(self, side, price):
+        """Aggregate remaining amount of resting LMT orders at price
+
+        Arguments:
+            side(str): BUY or SELL
+            price(int): Price in ticks
+        Returns:
+            int: Amount of stocks, 0 if there is no such level
+        """
+        return self._sizes[side].get(price, 0)
+
+    def depth(self, side, count):
+        """Best price levels of one side with their aggregate remaining amounts
+
+        Arguments:
+            side(str): BUY or SELL
+            count(int): Maximal number of levels
+        Returns:
+            list: (price in ticks, amount of stocks) pairs from the best level
+        """
+        sizes = self._sizes[side]
+        prices = [self.__price(side, key) for key in reversed(self._keys[side][-count:])]
+        return [(price, sizes[price]) for price in prices]
+
+    def level_sizes(self, side):
+        """Aggregate remaining amounts of all price levels of one side
+
+        Arguments:
+            side(str): BUY or SELL
+        Returns:
+            list: (price in ticks, amount of stocks) pairs in no particular order
+        """
+        return list(self._sizes[side].items())
+
+    def _best_price(self, side):
+        """Best price level of one side
+
+        Price levels are kept by _best_price, _level, _new_level and _drop_level,
+        which other book structures override.
+
+        Arguments:
+            side(str): BUY or SELL
+        Returns:
+            int: Best price in ticks, None if the side has no LMT orders
+        """
+        keys = self._keys[side]
+        return self.__price(side, keys[-1]) if keys else None
+
+    def _level(self, side, price):
+        """FIFO queue of price level, None if there is no such level"""
+        return self._levels[side].get(price)
+
+    def _new_level(self, side, price):
+        """Create empty price level and return its FIFO queue"""
+        queue = self._levels[side][price] = collections.deque()
+        bisect.insort(self._keys[side], self.__key(side, price))
+        return queue
+
+    def _drop_level(self, side, price):
+        """Remove empty price level"""
+        del self._levels[side][price]
+        keys = self._keys[side]
+        key = self.__key(side, price)
+        if keys[-1] == key:
+            keys.pop()
+        else:
+            del keys[bisect.bisect_left(keys, key)]
+
+    def __reduce(self, order, amount):
+        """Take amount of resting order off its price level, dropping emptied level
+
+        Arguments:
+            order(Order): Resting order
+            amount(int): Amount of stocks no longer offered
+        """
+        if order.price_type == "MKT":
+            return
+        side, price = order.order_type, order.price
+        sizes = self._sizes[side]
+        size = sizes[price] - amount
+        if size:
+            sizes[price] = size
+        else:
+            del sizes[price]
+            self._drop_level(side, price)
+
+    def __fill_from_levels(self, order, side, fills, inclusive):
+        """Consume price levels of one side from the best one while they cross order
+
+        Arguments:
+            order(Order): Incoming order
+            side(str): Side of resting orders
+            fills(list): Fill tuples to append trades to
+            inclusive(bool): Also consume level at limit price of LMT order
+        """
+        limited = order.price_type == "LMT"
+        sizes = self._sizes[side]
+        while order.remaining > 0:
+            price = self._best_price(side)
+            if price is None or limited and not self.__crosses(order, price, inclusive):
+                break
+            queue = self._level(side, price)
+            filled = order.filled_qty
+            self.__fill_from_queue(order, queue, price, fills)
+            # Queue may still hold cancelled orders once the level is used up
+            size = sizes[price] - (order.filled_qty - filled)
+            if size:
+                sizes[price] = size
+            else:
+                del sizes[price]
+                self._drop_level(side, price)
+
+    def __fill_from_queue(self, order, queue, price, fills):
+        while order.remaining > 0 and queue:
+            maker = queue[0]
+            if maker.cancelled:
+                queue.popleft()
+                continue
+            amount = min(order.remaining, maker.remaining)
+            maker.filled_qty += amount
+            order.filled_qty += amount
+            self.last_price = price
+            fills.append(Fill(maker, price, amount))
+            if maker.remaining == 0:
+                queue.popleft()
+                self.orders.pop(maker.order_id, None)
+
+    @staticmethod
+    def __crosses(order, price, inclusive):
+        if price == order.price:
+            return inclusive
+        if order.order_type == "BUY":
+            return price < order.price
+        return price > order.price
+
+    @staticmethod
+    def __key(side, price):
+        # Bids are kept ascending and asks descending so the best level is always last
+        return price if side == "BUY" else -price
+
+    @staticmethod
+    def __price(side, key):
+        return key if side == "BUY" else -key
@@ -0,0 +1,158 @@
+import functools
+from decimal import Decimal, InvalidOperation
+
+
+@functools.lru_cache(maxsize=None)
+def _scale(tick):
+    """Tick size as integer numerator over power of ten
+
+    Arguments:
+        tick(Decimal): Tick size
+
+    Returns:
+        int, int: Numerator and number of decimal digits, e.g. 5, 2 for 0.05
+    """
+    _, _, exponent = tick.normalize().as_tuple()
+    places = max(0, -exponent)
+    return int(tick.scaleb(places)), places
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ticks(text, numerator, places):
+    """Number of ticks in decimal price, cached as few distinct prices are traded
+
+    Arguments:
+        text(str): Decimal price, e.g. "20.05"
+        numerator(int): Tick size numerator
+        places(int): Tick size decimal digits
+
+    Returns:
+        int: Number of ticks, None if price is not a multiple of tick size
+
+    Raises:
+        ValueError: Price is not a number
+    """
+    whole, _, fraction = text.partition('.')
+    if fraction[places:].strip('0') or not (whole + fraction).lstrip('-').isdigit():
+        # Digits beyond tick precision or exponent notation, e.g. 2e1
+        try:
+            units = Decimal(text).scaleb(places)
+        except InvalidOperation:
+            units = None
+        if units is None or not units.is_finite():
+            raise ValueError("Invalid price {}".format(text))
+    else:
+        units = int(whole + fraction[:places].ljust(places, '0'))
+    if units % numerator or units != int(units):
+        return None
+    return int(units) // numerator
+
+
+class TickSizes:
+    """Price increments of stocks
+
+    Prices are integer numbers of ticks of their stock everywhere behind request
+    objects, decimal prices only appear in user input and output.
+
+    Args:
+        default(str): Tick size of stocks without own tick size
+        sizes(dict): Stock name -> tick size
+    """
+    def __init__(self, default="0.01", sizes=None):
+        self.default = Decimal(default)
+        self.sizes = {name: Decimal(size) for name, size in (sizes or {}).items()}
+        # Stock name -> (numerator, decimal digits) of its tick size, filled on use
+        self.__scales = {}
+
+    def set(self, stock_name, size):
+        """Set tick size of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            size(str): Tick size, e.g. "0.05"
+        """
+        self.sizes[stock_name] = Decimal(size)
+        self.__scales.pop(stock_name, None)
+
+    def configure(self, default=None, specs=()):
+        """Set tick sizes given on command line
+
+        Arguments:
+            default(str): Tick size of stocks without own tick size, None to keep it
+            specs(list): STOCK=SIZE strings, e.g. BRK=0.05
+
+        Raises:
+            ValueError: Spec is not STOCK=SIZE with decimal size
+        """
+        try:
+            if default is not None:
+                self.default = Decimal(default)
+                self.__scales = {}
+            for spec in specs:
+                stock_name, separator, size = spec.partition("=")
+                if not separator:
+                    raise ValueError("Tick size {} is not STOCK=SIZE".format(spec))
+                self.set(stock_name, size)
+        except InvalidOperation:
+            raise ValueError("Invalid tick size in {} {}".format(default, " ".join(specs)))
+
+    def tick(self, stock_name):
+        """Tick size of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+
+        Returns:
+            Decimal: Tick size
+        """
+        return self.sizes.get(stock_name, self.default)
+
+    def to_ticks(self, stock_name, price):
+        """Convert decimal price to integer number of ticks
+
+        Arguments:
+            stock_name(str): Name of stock
+            price(str or float): Price, optionally prefixed with $, e.g. "$20.05"
+
+        Returns:
+            int: Number of ticks
+
+        Raises:
+            ValueError: Price is not a number or not a multiple of tick size
+        """
+        ticks = _parse_ticks(str(price).split('$')[-1], *self.__scale(stock_name))
+        if ticks is None:
+            raise ValueError("Price {} of {} is not a multiple of tick size {}".format(
+                price, stock_name, self.tick(stock_name)))
+        return ticks
+
+    def to_price(self, stock_name, ticks):
+        """Convert integer number of ticks to decimal price for output
+
+        Arguments:
+            stock_name(str): Name of stock
+            ticks(int): Number of ticks
+
+        Returns:
+            float: Price, the closest float to exact decimal price
+        """
+        numerator, places = self.__scale(stock_name)
+        return ticks * numerator / 10 ** places
+
+    def __scale(self, stock_name):
+        """Tick size of particular stock as integer numerator over power of ten
+
+        Arguments:
+            stock_name(str): Name of stock
+
+        Returns:
+            int, int: Numerator and number of decimal digits
+        """
+        scale = self.__scales.get(stock_name)
+        if scale is None:
+            scale = self.__scales[stock_name] = _scale(self.tick(stock_name))
+        return scale
+
+
+# Tick sizes of stocks traded by this process
+TICK_SIZES = TickSizes()
@@ -0,0 +1,142 @@
+import functools
+import importlib
+import inspect
+import time
+
+from stock_exchange.shared.stats import STATS
+
+
+# Timed stages: (stage, module, class or None for module function, attribute).
+# Stages nest, parse includes validate of commands validated while parsing and
+# execute includes match, db and format of the same command.
+PROBES = (
+    ("parse", "stock_exchange.commands", None, "parse_command"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderPlaceMktRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderPlaceLmtRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderViewRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderQuoteRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderDepthRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderBarsRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderCancelRequestObject",
+     "from_dict"),
+    ("validate", "stock_exchange.use_cases.request_objects", "OrderAmendRequestObject",
+     "from_dict"),
+    ("execute", "stock_exchange.shared.use_case", "UseCase", "execute"),
+    ("execute", "stock_exchange.shared.use_case", "AsyncUseCase", "execute"),
+    ("match", "stock_exchange.domain.order_book", "OrderBook", "place"),
+    ("format", "stock_exchange.repository.book_repo", "BookRepo", "_placed_message"),
+    ("format", "stock_exchange.repository.book_repo", "BookRepo", "_get_quote"),
+    ("format", "stock_exchange.repository.book_repo", "BookRepo", "_quote_rows"),
+    ("format", "stock_exchange.repository.book_repo", "BookRepo", "_depth_rows"),
+    ("format", "stock_exchange.repository.book_repo", "BookRepo", "_bar_rows"),
+    ("journal_append", "stock_exchange.repository.journal", "Journal", "append"),
+    ("journal_append", "stock_exchange.repository.journal", "Journal", "append_amendment"),
+)
+# Stage -> counter of items in list returned by stage, one item per loop iteration
+COUNTERS = {
+    "match": "match_fills",
+}
+
+# Modules whose TIMER records database round trips as db_read and db_write stages.
+# Every round trip of both MongoDB repositories is one sample, timed by the client
+# from sending the command to receiving its reply.
+TIMERS = (
+    "stock_exchange.repository.mongo_monitoring",
+)
+
+# (owner, attribute, original) of installed probes
+_installed = []
+# Timers recording into stats
+_timers = []
+
+
+def enable(stats=STATS):
+    """Time every stage in PROBES and start recording
+
+    Probes replace instrumented functions with timing wrappers, so nothing but the
+    original functions runs while instrumentation is disabled. Probes of modules
+    whose dependencies are not installed are skipped. Database round trips are
+    timed by timers of TIMERS, which only see clients created after they are first
+    enabled.
+
+    Arguments:
+        stats(Stats): Statistics stages are recorded in
+    """
+    disable(stats)
+    for stage, module_name, class_name, attribute in PROBES:
+        try:
+            owner = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        if class_name is not None:
+            owner = getattr(owner, class_name)
+        original = vars(owner)[attribute]
+        setattr(owner, attribute, _probe(original, stage, stats))
+        _installed.append((owner, attribute, original))
+    for module_name in TIMERS:
+        try:
+            timer = importlib.import_module(module_name).TIMER
+        except ImportError:
+            continue
+        timer.stats = stats
+        _timers.append(timer)
+    stats.enabled = True
+
+
+def disable(stats=STATS):
+    """Restore instrumented functions and stop recording
+
+    Arguments:
+        stats(Stats): Statistics stages were recorded in
+    """
+    while _installed:
+        owner, attribute, original = _installed.pop()
+        setattr(owner, attribute, original)
+    while _timers:
+        _timers.pop().stats = None
+    stats.enabled = False
+
+
+def _probe(original, stage, stats):
+    """Timing wrapper of function, method, class method or coroutine function
+
+    Arguments:
+        original(object): Attribute as found in module or class dictionary
+        stage(str): Name of stage
+        stats(Stats): Statistics stage is recorded in
+
+    Returns:
+        object: Replacement of the same kind as original
+    """
+    if isinstance(original, classmethod):
+        return classmethod(_probe(original.__func__, stage, stats))
+    counter = COUNTERS.get(stage)
+    clock = time.perf_counter_ns
+
+    if inspect.iscoroutinefunction(original):
+        @functools.wraps(original)
+        async def timed_coroutine(*args, **kwargs):
+            start = clock()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                stats.record(stage, clock() - start)
+        return timed_coroutine
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            result = original(*args, **kwargs)
+        finally:
+            stats.record(stage, clock() - start)
+        if counter is not None:
+            stats.count(counter, len(result))
+        return result
+    return timed
@@ -1,7 +1,154 @@
+import argparse
+import atexit
+import sys
+
+from stock_exchange import instrumentation
 from stock_exchange.cli import ConsoleInterface
-from stock_exchange.repository.mongorepo import MongoRepo
+from stock_exchange.domain.ladder_book import LADDER_STOCKS
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.market_data import MarketDataBus, MarketDataFeed
+from stock_exchange.repository.journal import Journal
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+from stock_exchange.repository.mongo_client import MONGO_SETTINGS
+from stock_exchange.shared.stats import STATS
+
+
+def create_repo(name, shards=1, journal=None):
+    """Create repository selected on command line
+
+    Arguments:
+        name(str): mongo or memory
+        shards(int): Number of worker processes stocks are split between, 1 for none
+        journal(str): Journal directory of memory repository, None to keep no journal
+
+    Returns:
+        MongoRepo, InMemoryRepo or ShardedRepo: Repository class object
+    """
+    if journal is not None:
+        return InMemoryRepo(Journal(journal))
+    if name == "memory":
+        repo_class = InMemoryRepo
+    else:
+        from stock_exchange.repository.mongorepo import MongoRepo
+        repo_class = MongoRepo
+    if shards > 1:
+        from stock_exchange.repository.sharded_repo import ShardedRepo
+        return ShardedRepo(repo_class, shards)
+    return repo_class()
+
+
+def add_common_arguments(parser):
+    """Add arguments shared by CLI and order server
+
+    Arguments:
+        parser(argparse.ArgumentParser): Parser of command line
+    """
+    parser.add_argument("--default-tick", metavar="SIZE",
+                        help="Price increment of stocks without own tick size, 0.01 by default")
+    parser.add_argument("--tick-size", metavar="STOCK=SIZE", action="append", default=[],
+                        help="Price increment of particular stock, may be repeated")
+    parser.add_argument("--ladder", metavar="STOCK", action="append", default=[],
+                        help="Match stock in array-indexed price ladder, may be repeated")
+    parser.add_argument("--market-data", metavar="PATH",
+                        help="Stream level updates and trades to subscribers of Unix socket PATH")
+    parser.add_argument("--mongo-uri", metavar="URI",
+                        help="MongoDB connection string, mongodb://localhost:27017 by default")
+    parser.add_argument("--mongo-pool-size", metavar="N", type=int,
+                        help="Maximal number of MongoDB connections per server, 100 by default")
+    parser.add_argument("--mongo-w", metavar="W",
+                        help="Write concern of orders, number of members or majority")
+    parser.add_argument("--mongo-journal", action="store_true", default=None,
+                        help="Acknowledge orders once journaled by MongoDB")
+    parser.add_argument("--mongo-read-preference", metavar="MODE",
+                        help="Members VIEW ORDERS reads from, e.g. secondaryPreferred")
+    parser.add_argument("--mongo-compressors", metavar="LIST",
+                        help="Comma-separated MongoDB wire compressors, e.g. zstd,zlib")
+    parser.add_argument("--stats", action="store_true",
+                        help="Time processing stages, shown by STATS command")
+    parser.add_argument("--stats-json", metavar="FILE",
+                        help="Time processing stages and write them to FILE on exit")
+
+
+def configure(args):
+    """Configure tick sizes, ladder stocks, MongoDB settings and stats of the process
+
+    Arguments:
+        args(argparse.Namespace): Arguments of add_common_arguments
+
+    Raises:
+        ValueError: Tick size or MongoDB setting is invalid
+    """
+    TICK_SIZES.configure(args.default_tick, args.tick_size)
+    MONGO_SETTINGS.configure(args.mongo_uri, args.mongo_pool_size, args.mongo_w,
+                             args.mongo_journal, args.mongo_read_preference,
+                             args.mongo_compressors)
+    LADDER_STOCKS.update(args.ladder)
+    if args.stats or args.stats_json:
+        instrumentation.enable()
+    if args.stats_json:
+        atexit.register(STATS.dump, args.stats_json)
+
+
+def parse_args(argv=None):
+    """Parse command line and configure the process with it
+
+    Arguments:
+        argv(list): Command line arguments, None for sys.argv
+
+    Returns:
+        argparse.Namespace: Parsed arguments, exits on invalid ones
+    """
+    parser = argparse.ArgumentParser(description="Stock exchange CLI")
+    parser.add_argument("--repo", choices=["mongo", "memory"], default="mongo",
+                        help="Keep orders in MongoDB or in process memory")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Match stocks in this many worker processes")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Perform commands of FILE at full speed, - for standard input")
+    parser.add_argument("--summary", action="store_true",
+                        help="In batch mode only report number of commands and orders/sec")
+    parser.add_argument("--journal", metavar="DIR",
+                        help="Journal orders of memory repository to DIR and recover them")
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.journal and (args.repo != "memory" or args.shards > 1):
+        parser.error("--journal requires --repo memory without --shards")
+    if args.market_data and args.shards > 1:
+        parser.error("--market-data requires matching in this process without --shards")
+    try:
+        configure(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def run_batch(cli, batch, summary_only):
+    """Perform command lines of file or standard input and report throughput on stderr
+
+    Arguments:
+        cli(ConsoleInterface): Console interface
+        batch(str): Path of file with command lines, - for standard input
+        summary_only(bool): Do not write results, only count them
+    """
+    lines = sys.stdin if batch == "-" else open(batch)
+    with lines:
+        summary = cli.run_batch(lines, summary_only=summary_only)
+    print("{commands} commands, {orders} orders, {unknown} unknown lines in "
+          "{seconds:.3f}s: {orders_per_sec:.0f} orders/sec".format(**summary),
+          file=sys.stderr)
+
 
 if __name__ == '__main__':
-    repo = MongoRepo()
+    args = parse_args()
+    repo = create_repo(args.repo, args.shards, args.journal)
+    if args.market_data:
+        repo.attach_market_data(MarketDataBus())
+        MarketDataFeed(repo.market_data, args.market_data).start()
     cli = ConsoleInterface(repo)
-    cli.run()
+    batch = args.batch
+    if batch is None and not sys.stdin.isatty():
+        batch = "-"
+    if batch is None:
+        cli.run()
+    else:
+        run_batch(cli, batch, args.summary)
@@ -0,0 +1,247 @@
+import collections
+import os
+import socket
+import threading
+
+from stock_exchange.domain.ticks import TICK_SIZES
+
+
+# Aggregate remaining amount of resting LMT orders at price level after a change,
+# 0 once the level is empty
+LevelUpdate = collections.namedtuple('LevelUpdate', ['stock_name', 'side', 'price', 'size'])
+# Single trade of the matching engine
+TradePrint = collections.namedtuple('TradePrint', ['stock_name', 'price', 'amount', 'timestamp'])
+
+
+def format_message(message):
+    """Feed line of market data message with decimal price
+
+    Arguments:
+        message(LevelUpdate or TradePrint): Market data message, price in ticks
+
+    Returns:
+        str: L2 {STOCK} {SIDE} {PRICE} {SIZE} or TRADE {STOCK} {PRICE} {AMOUNT}
+            {TIMESTAMP} line ending with new line
+    """
+    price = TICK_SIZES.to_price(message.stock_name, message.price)
+    if type(message) is LevelUpdate:
+        return "L2 {} {} {} {}\n".format(message.stock_name, message.side, price, message.size)
+    return "TRADE {} {} {} {}\n".format(message.stock_name, price, message.amount,
+                                        message.timestamp)
+
+
+class MarketDataBus:
+    """In-process publish/subscribe bus of level updates and trade prints
+
+    The bus keeps the latest size of every price level, so a new subscriber first
+    receives the whole depth of all books and then only changes. Subscribers are
+    called in the publishing thread and must not block.
+    """
+    def __init__(self):
+        # (stock name, side, price) -> aggregate size of non-empty price levels
+        self.levels = {}
+        self.subscribers = []
+        self.__lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Deliver current depth and all later messages to callback
+
+        Arguments:
+            callback(callable): Accepts list of messages in publication order
+        """
+        with self.__lock:
+            callback([LevelUpdate(stock_name, side, price, size)
+                      for (stock_name, side, price), size in self.levels.items()])
+            self.subscribers = self.subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        """Stop delivering messages to callback
+
+        Arguments:
+            callback(callable): Subscribed callback
+        """
+        with self.__lock:
+            self.subscribers = [subscriber for subscriber in self.subscribers
+                                if subscriber is not callback]
+
+    def replace(self, stock_name, updates):
+        """Publish whole depth of stock, emptying its levels missing from updates
+
+        Arguments:
+            stock_name(str): Name of stock, None to empty levels of all stocks
+            updates(list): LevelUpdate of every non-empty level of stock
+        """
+        with self.__lock:
+            stale = [LevelUpdate(name, side, price, 0) for name, side, price in self.levels
+                     if stock_name is None or name == stock_name]
+            self.__publish(stale + list(updates))
+
+    def publish(self, messages):
+        """Deliver messages produced by one order to all subscribers
+
+        Arguments:
+            messages(list): LevelUpdate and TradePrint messages
+        """
+        with self.__lock:
+            self.__publish(messages)
+
+    def __publish(self, messages):
+        """Apply level updates to current depth and deliver messages, holding the lock
+
+        Arguments:
+            messages(list): LevelUpdate and TradePrint messages
+        """
+        for message in messages:
+            if type(message) is LevelUpdate:
+                key = message.stock_name, message.side, message.price
+                if message.size:
+                    self.levels[key] = message.size
+                else:
+                    self.levels.pop(key, None)
+        for subscriber in self.subscribers:
+            subscriber(messages)
+
+
+class ConflatingQueue:
+    """Queue of market data messages of one subscriber that never blocks the publisher
+
+    Level updates waiting for delivery are replaced by newer updates of the same
+    level, so a slow consumer gets the latest sizes instead of every change and its
+    depth never goes stale. Trade prints are never merged, but only the latest
+    max_pending of them wait and a consumer too slow even for that loses the oldest
+    ones. Level updates are never dropped, at most one waits per price level.
+
+    Args:
+        max_pending(int): Maximal number of trade prints waiting for delivery
+    """
+    def __init__(self, max_pending=100000):
+        self.max_pending = max_pending
+        # Number of trade prints dropped because consumer was too slow
+        self.dropped = 0
+        self.closed = False
+        # Level key or sequence number of trade print -> message, oldest first
+        self.__pending = collections.OrderedDict()
+        # Sequence numbers of waiting trade prints, oldest first
+        self.__trades = collections.deque()
+        self.__sequence = 0
+        self.__condition = threading.Condition()
+
+    def __call__(self, messages):
+        """Add published messages, used as bus subscriber
+
+        Arguments:
+            messages(list): LevelUpdate and TradePrint messages
+        """
+        with self.__condition:
+            pending = self.__pending
+            for message in messages:
+                if type(message) is LevelUpdate:
+                    key = message.stock_name, message.side, message.price
+                    pending.pop(key, None)
+                else:
+                    self.__sequence += 1
+                    key = self.__sequence
+                    self.__trades.append(key)
+                pending[key] = message
+            while len(self.__trades) > self.max_pending:
+                del pending[self.__trades.popleft()]
+                self.dropped += 1
+            self.__condition.notify()
+
+    def get(self, timeout=None):
+        """Take all waiting messages, waiting for some if there are none
+
+        Arguments:
+            timeout(float): Longest time to wait in seconds, None to wait until
+                messages arrive or queue is closed
+
+        Returns:
+            list: Messages oldest first, empty after timeout or once queue is closed
+        """
+        with self.__condition:
+            if not self.__pending and not self.closed:
+                self.__condition.wait(timeout)
+            messages = list(self.__pending.values())
+            self.__pending.clear()
+            self.__trades.clear()
+            return messages
+
+    def close(self):
+        """Wake up consumer waiting for messages"""
+        with self.__condition:
+            self.closed = True
+            self.__condition.notify()
+
+
+class MarketDataFeed:
+    """Local socket streaming market data of the bus to every connected subscriber
+
+    Every connection first receives current depth as L2 lines and then level
+    updates and trade prints as they are published, one line per message, see
+    format_message. Each connection has its own conflating queue and writer thread,
+    so a slow subscriber delays neither matching nor other subscribers.
+
+    Args:
+        bus(MarketDataBus): Bus of published messages
+        path(str): Path of Unix domain socket, replaced if it exists
+        max_pending(int): Maximal number of trade prints waiting per subscriber
+    """
+    def __init__(self, bus, path, max_pending=100000):
+        self.bus = bus
+        self.path = path
+        self.max_pending = max_pending
+        self.__listener = None
+        self.__queues = []
+
+    def start(self):
+        """Start accepting subscribers in background thread
+
+        Returns:
+            MarketDataFeed: Started feed
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.__listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__listener.bind(self.path)
+        self.__listener.listen()
+        threading.Thread(target=self.__accept, daemon=True).start()
+        return self
+
+    def close(self):
+        """Stop accepting subscribers and disconnect connected ones"""
+        self.__listener.close()
+        for queue in self.__queues:
+            queue.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __accept(self):
+        """Serve every accepted connection in its own writer thread"""
+        while True:
+            try:
+                connection, _ = self.__listener.accept()
+            except OSError:
+                break
+            queue = ConflatingQueue(self.max_pending)
+            self.__queues.append(queue)
+            self.bus.subscribe(queue)
+            threading.Thread(target=self.__write, args=(connection, queue), daemon=True).start()
+
+    def __write(self, connection, queue):
+        """Write messages of subscriber queue until subscriber disconnects
+
+        Arguments:
+            connection(socket): Connection of subscriber
+            queue(ConflatingQueue): Messages for subscriber
+        """
+        with connection:
+            while not queue.closed:
+                messages = queue.get()
+                if not messages:
+                    continue
+                try:
+                    connection.sendall("".join(map(format_message, messages)).encode())
+                except OSError:
+                    break
+        self.bus.unsubscribe(queue)
+        self.__queues.remove(queue)
@@ -0,0 +1,425 @@
+import asyncio
+import collections
+
+import pymongo
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from stock_exchange.domain.bars import CLOCK
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.book_repo import BookRepo
+from stock_exchange.repository.indexes import ensure_indexes
+from stock_exchange.repository.migrations import migrate_amount_strings, migrate_float_prices
+from stock_exchange.repository.mongo_client import MONGO_SETTINGS, shared_client
+from stock_exchange.repository.mongorepo import VIEW_PROJECTION
+from stock_exchange.repository import mongo_operations as ops
+from stock_exchange.repository.mongo_operations import StaleBookError
+
+
+class AsyncMongoRepo(BookRepo):
+    """Repository class for performing operations with MongoDB on asyncio
+
+    Has the same methods as MongoRepo as coroutines. Orders of different stocks are
+    placed concurrently, orders of the same stock one after another in call order.
+    Use create() to get a repository with loaded order books.
+
+    Arguments:
+        shard(int): Index of worker process of this repository, which only loads order
+            books of stocks it owns
+        shards(int): Number of worker processes
+    """
+    # Number of times order is matched against reloaded book before giving up
+    PLACE_ATTEMPTS = 3
+
+    def __init__(self, shard=0, shards=1):
+        super().__init__()
+        self.partition_ids(shard, shards)
+        # Motor client of the process to perform database operations on asyncio
+        self.client = shared_client(AsyncIOMotorClient)
+        # Multi-document transactions need replica set or sharded cluster
+        self.transactions = False
+        # MongoDB database
+        self.db = self.client[MONGO_SETTINGS.database]
+        # Collection of orders
+        self.collection = self.db.orders
+        # Collection of orders read by VIEW ORDERS with configured read preference
+        self.view_collection = self.collection.with_options(
+            read_preference=MONGO_SETTINGS.view_read_preference())
+        # History of transactions
+        self.history = self.db.history
+        # Book documents with version of order book of every stock
+        self.book_versions = self.db.book_versions
+        # Stock name -> version of book document its order book was loaded at
+        self.versions = {}
+        # Stock name -> lock serializing matching and persisting of its orders
+        self.__locks = collections.defaultdict(asyncio.Lock)
+
+    @classmethod
+    async def create(cls, shard=0, shards=1):
+        """Create repository, prepare database and load order books
+
+        Migrations and indexes are prepared by the helpers of MongoRepo on the
+        collections Motor wraps, in its executor.
+
+        Arguments:
+            shard(int): Index of worker process of repository
+            shards(int): Number of worker processes
+
+        Returns:
+            AsyncMongoRepo: Repository ready to use
+        """
+        repo = cls(shard, shards)
+        repo.transactions = ops.supports_transactions(
+            await repo.client.admin.command('hello'))
+        orders, history = repo.collection.delegate, repo.history.delegate
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, migrate_amount_strings, orders)
+        await loop.run_in_executor(None, migrate_float_prices, orders, history, TICK_SIZES)
+        await loop.run_in_executor(None, ensure_indexes, orders, history)
+        for stock_name in await repo.collection.distinct("stock_name",
+                                                         ops.active_orders_filter()):
+            if ops.owns(stock_name, repo.shard, repo.shards):
+                await repo.__load_book(stock_name)
+        await repo.__load_bars()
+        return repo
+
+    async def clear(self):
+        """Drop orders and history collections together with order books"""
+        await self.db.drop_collection("orders")
+        await self.db.drop_collection("history")
+        await self.db.drop_collection("book_versions")
+        self.versions = {}
+        self._clear_books()
+
+    async def view(self, stock_name=None, order_type=None, status=None, page=1, limit=None):
+        """View orders during client session, streamed from database in batches
+
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+            page(int): Number of page starting from 1
+            limit(int): Number of orders per page, None for all orders
+
+        Yields:
+            str: Batches of resulting rows
+        """
+        skip, limit = self._page_bounds(page, limit)
+        cursor = self.view_collection.find(
+            self._view_filter(stock_name, order_type, status),
+            projection=VIEW_PROJECTION,
+            skip=skip,
+            limit=limit or 0,
+            batch_size=self.VIEW_BATCH
+        )
+        batch = []
+        async for order in cursor:
+            batch.append(Order.from_dict(order))
+            if len(batch) == self.VIEW_BATCH:
+                for rows in self._stream_rows(batch, skip):
+                    yield rows
+                skip += len(batch)
+                batch = []
+        for rows in self._stream_rows(batch, skip):
+            yield rows
+
+    async def quote(self, stock_name):
+        """Get bid price, ask price and price of last transaction for particular stock
+
+        Arguments:
+            stock_name(str): Name of stock for which we want to see info
+
+        Returns:
+            str: Bid price, ask price and price of last transaction for particular stock
+        """
+        return self._get_quote(stock_name)
+
+    async def quote_many(self, stock_names):
+        """Get quotes of several stocks at once
+
+        Arguments:
+            stock_names(list): Names of stocks
+
+        Yields:
+            str: Batches of resulting rows, one quote per stock
+        """
+        for rows in self._quote_rows(stock_names):
+            yield rows
+
+    async def depth(self, stock_name, levels):
+        """Get aggregate amounts of best price levels of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            levels(int): Maximal number of price levels per side
+
+        Yields:
+            str: Batches of resulting rows
+        """
+        for rows in self._depth_rows(stock_name, levels):
+            yield rows
+
+    async def bars(self, stock_name, interval):
+        """Get OHLCV bars of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of bar interval, e.g. 1m
+
+        Yields:
+            str: Batches of resulting rows from oldest bar
+        """
+        for rows in self._bar_rows(stock_name, interval):
+            yield rows
+
+    async def place_mkt_buy(self, command):
+        """Place buy at market price order
+
+        Arguments:
+            command(dict): Dictionary with BUY MKT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "BUY", "MKT")
+        await self.__place(order)
+        return self._placed_message(order)
+
+    async def place_mkt_sell(self, command):
+        """Place sell at market price order
+
+        Arguments:
+            command(dict): Dictionary with SELL MKT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "SELL", "MKT")
+        await self.__place(order)
+        return self._placed_message(order)
+
+    async def place_lmt_buy(self, command):
+        """Place buy at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with BUY LMT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "BUY", "LMT")
+        await self.__place(order)
+        return self._placed_message(order)
+
+    async def place_lmt_sell(self, command):
+        """Place sell at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with SELL LMT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "SELL", "LMT")
+        await self.__place(order)
+        return self._placed_message(order)
+
+    async def cancel(self, order_id):
+        """Cancel remaining amount of resting order
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+
+        Returns:
+            str: Resulting user output
+        """
+        return await self.__change(order_id, 0)
+
+    async def amend(self, order_id, amount):
+        """Reduce total amount of resting order keeping its time priority
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount of order
+
+        Returns:
+            str: Resulting user output
+        """
+        return await self.__change(order_id, amount)
+
+    def _parse_order_id(self, order_id):
+        return ObjectId(order_id) if ObjectId.is_valid(order_id) else None
+
+    async def __change(self, order_id, amount):
+        """Cancel or amend resting order in database and in its order book
+
+        The order is looked up again once the lock of its stock is taken, as it may
+        have traded while waiting, see MongoRepo.
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount, 0 to cancel order
+
+        Returns:
+            str: Resulting user output
+        """
+        order = self._find_resting(order_id)
+        if order is None:
+            return self.NOT_RESTING.format(order_id)
+        async with self.__locks[order.stock_name]:
+            for _ in range(self.PLACE_ATTEMPTS):
+                order = self._find_resting(order_id)
+                refusal = self._change_refusal(order_id, order, amount)
+                if refusal is not None:
+                    return refusal
+                try:
+                    await self.__write(order.stock_name, ops.change_writes(order, amount))
+                except StaleBookError:
+                    await self.__load_book(order.stock_name)
+                    continue
+                self._change_resting(order, amount)
+                return self._changed_message(order)
+        raise StaleBookError("Order {} keeps changing".format(order_id))
+
+    async def __load_bars(self):
+        """Aggregate transactions of the last BARS_WINDOW into bars"""
+        query, sort = ops.recent_trades(CLOCK() - self.BARS_WINDOW)
+        self._aggregate_trades(await self.history.find(query, sort=sort).to_list(length=None))
+
+    async def __load_book(self, stock_name):
+        """Rebuild in-memory order book of particular stock from database
+
+        Pending writes of the book document are applied first, see MongoRepo.
+
+        Arguments:
+            stock_name(str): Name of stock
+        """
+        book = await self.book_versions.find_one({"_id": stock_name})
+        if book is not None and "pending" in book:
+            await self.__apply_pending(stock_name, book["version"], book["pending"])
+        active_orders = await self.collection.find(
+            **ops.book_orders(stock_name)).to_list(length=None)
+        last = await self.history.find_one(**ops.last_trade(stock_name))
+        self._rebuild_book(stock_name, map(Order.from_dict, active_orders),
+                           ops.last_trade_price(last))
+        self.versions[stock_name] = ops.book_version(book)
+
+    async def __place(self, order):
+        """Match order in order book and persist it with resulting trades
+
+        Arguments:
+            order(Order): Accepted order
+        """
+        order.order_id = ObjectId()
+        price = order.price
+        async with self.__locks[order.stock_name]:
+            if order.stock_name not in self.versions:
+                await self.__load_book(order.stock_name)
+            for _ in range(self.PLACE_ATTEMPTS):
+                fills = self._match_order(order)
+                try:
+                    await self.__write(order.stock_name, ops.order_writes(
+                        order, fills, self._trade_documents(order, fills)))
+                except StaleBookError:
+                    await self.__load_book(order.stock_name)
+                    self._unmatch_order(order, price)
+                    continue
+                except Exception:
+                    await self.__reload_book(order.stock_name)
+                    raise
+                self._publish_fills(order, fills)
+                return
+        raise StaleBookError("Order book of {} keeps changing".format(order.stock_name))
+
+    async def __reload_book(self, stock_name):
+        """Replace order book changed by a failed write with the stored one
+
+        Arguments:
+            stock_name(str): Name of stock
+        """
+        self._drop_book(stock_name)
+        self.versions.pop(stock_name, None)
+        await self.__load_book(stock_name)
+
+    async def __write(self, stock_name, writes):
+        """Store writes of an order book change at once, see MongoRepo
+
+        Arguments:
+            stock_name(str): Name of stock
+            writes(dict): Writes of ops.order_writes or ops.change_writes
+
+        Raises:
+            StaleBookError: Order book was changed by another client
+        """
+        version = self.versions[stock_name]
+        if self.transactions:
+            async with await self.client.start_session() as session:
+                await session.with_transaction(
+                    lambda s: self.__persist(stock_name, version, writes, session=s))
+            self.versions[stock_name] = version + 1
+            return
+        await self.__bump_version(stock_name, version, writes, session=None)
+        self.versions[stock_name] = version + 1
+        try:
+            await self.__apply_pending(stock_name, version + 1, writes)
+        except pymongo.errors.PyMongoError:
+            # Writes are committed, the next load of the book applies them
+            pass
+
+    async def __bump_version(self, stock_name, version, pending, session):
+        """Increment version of book document if order book is up to date
+
+        Arguments:
+            stock_name(str): Name of stock
+            version(int): Version order book was loaded at
+            pending(dict): Writes stored with new version, None to store none
+            session(AsyncIOMotorClientSession): Session of running transaction or None
+
+        Raises:
+            StaleBookError: Order book was changed by another client
+        """
+        try:
+            result = await self.book_versions.update_one(
+                **ops.version_bump(stock_name, version, pending), session=session)
+        except pymongo.errors.DuplicateKeyError:
+            result = None
+        ops.check_version_bump(stock_name, result)
+
+    async def __persist(self, stock_name, version, writes, session):
+        """Store writes of an order book change in running transaction
+
+        Arguments:
+            stock_name(str): Name of stock
+            version(int): Version order book was loaded at
+            writes(dict): Writes of ops.order_writes or ops.change_writes
+            session(AsyncIOMotorClientSession): Session of running transaction
+        """
+        await self.__bump_version(stock_name, version, None, session)
+        result = await self.collection.bulk_write(ops.order_operations(writes),
+                                                  ordered=True, session=session)
+        ops.check_persisted(stock_name, result, writes)
+        if writes["history"]:
+            await self.history.insert_many(writes["history"], ordered=True, session=session)
+
+    async def __apply_pending(self, stock_name, version, writes):
+        """Apply pending writes of book document and drop them from it, see MongoRepo
+
+        Arguments:
+            stock_name(str): Name of stock
+            version(int): Version of book document the writes were stored with
+            writes(dict): Pending writes
+        """
+        await self.__apply_once(self.collection.bulk_write, ops.order_operations(writes))
+        if writes["history"]:
+            await self.__apply_once(self.history.insert_many, writes["history"])
+        await self.book_versions.update_one(*ops.applied_pending(stock_name, version))
+
+    @staticmethod
+    async def __apply_once(write, requests):
+        """Apply bulk write skipping documents that are already stored
+
+        Arguments:
+            write(callable): Bulk write coroutine method of collection
+            requests(list): Write operations or documents to insert
+        """
+        try:
+            await write(requests, ordered=False)
+        except pymongo.errors.BulkWriteError as error:
+            ops.skip_duplicates(error)
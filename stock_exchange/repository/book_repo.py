@@ -0,0 +1,522 @@
+import time
+
+from stock_exchange.domain.bars import CLOCK, INTERVALS, BarAggregator
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.ladder_book import create_book
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.market_data import LevelUpdate, TradePrint
+from stock_exchange.repository.quote_cache import QuoteCache
+
+
+class BookRepo:
+    """Base class for repositories matching orders in in-memory order books
+
+    Subclasses only persist orders and trades produced by the books.
+    """
+    # Number of VIEW ORDERS rows yielded at once
+    VIEW_BATCH = 1000
+    # Stored orders are visible to every process creating the repository
+    SHARED_STORAGE = True
+    # History of this many nanoseconds before start is aggregated into bars
+    BARS_WINDOW = 24 * INTERVALS["1h"]
+    # Answer of CANCEL and AMEND of order that does not rest in any book
+    NOT_RESTING = "Order {} is not resting"
+
+    def __init__(self):
+        # In-memory order books by stock name, storage only persists their results
+        self.books = {}
+        # Order id -> resting order, index shared by all books
+        self.resting = {}
+        # Top of book of every stock, written through on every book change
+        self.quotes = QuoteCache()
+        # OHLCV bars of every stock, updated on every trade
+        self.bar_aggregator = BarAggregator()
+        # Bus of level updates and trade prints, None to publish no market data
+        self.market_data = None
+
+    def attach_market_data(self, bus):
+        """Publish level updates and trade prints to bus, starting with current depth
+
+        Arguments:
+            bus(MarketDataBus): Market data bus
+        """
+        self.market_data = bus
+        for stock_name in self.books:
+            self.__publish_depth(stock_name)
+
+    def _clear_books(self):
+        """Drop all order books, cached quotes and bars"""
+        self.books = {}
+        self.resting = {}
+        self.quotes = QuoteCache()
+        self.bar_aggregator = BarAggregator()
+        if self.market_data is not None:
+            self.market_data.replace(None, [])
+
+    def _get_quote(self, stock_name):
+        """Get bid price, ask price and price of last transaction for particular stock
+
+        Arguments:
+            stock_name(str): Name of stock for which we want to see info
+
+        Returns:
+            str: Bid price, ask price and price of last transaction for particular stock
+        """
+        quote = self.quotes.get(stock_name)
+        if quote is None:
+            quote = self._update_quote(stock_name)
+        bid_price, ask_price, last_price = (self._to_price(stock_name, ticks) if ticks else 0
+                                            for ticks in quote)
+        return "{} BID: {} ASK: {} LAST: {}".format(stock_name, bid_price, ask_price, last_price)
+
+    def _quote_rows(self, stock_names):
+        """Resulting rows of QUOTE command of several stocks read from quote cache
+
+        Arguments:
+            stock_names(list): Names of stocks
+        Returns:
+            list: Single batch of rows in the order of stock_names, every row ending
+                with new line
+        """
+        return ["".join(self._get_quote(stock_name) + "\n" for stock_name in stock_names)]
+
+    def _depth_rows(self, stock_name, levels):
+        """Resulting rows of DEPTH command read from order book
+
+        Arguments:
+            stock_name(str): Name of stock
+            levels(int): Maximal number of price levels per side
+        Returns:
+            list: Single batch of rows, bids then asks from the best price, every row
+                ending with new line, no batch for empty book
+        """
+        book = self.books.get(stock_name)
+        if book is None:
+            return []
+        rows = ["{} {} {} {}\n".format(stock_name, label, self._to_price(stock_name, price), size)
+                for side, label in (("BUY", "BID"), ("SELL", "ASK"))
+                for price, size in book.depth(side, levels)]
+        return ["".join(rows)] if rows else []
+
+    def _update_quote(self, stock_name):
+        """Write top of order book of particular stock through to quote cache
+
+        Cached prices stay in ticks and are converted only when a quote is output.
+
+        Arguments:
+            stock_name(str): Name of stock
+        Returns:
+            tuple: Bid price, ask price and last transaction price for stock
+        """
+        book = self.books.get(stock_name)
+        if book is None:
+            return self.quotes.update(stock_name, None, None, None)
+        return self.quotes.update(stock_name, book.best_bid(), book.best_ask(), book.last_price)
+
+    def _to_price(self, stock_name, ticks):
+        """Convert price in ticks to decimal price for output
+
+        Arguments:
+            stock_name(str): Name of stock
+            ticks(int): Price in ticks or None
+        Returns:
+            float: Decimal price, None if ticks are None
+        """
+        if ticks is None:
+            return None
+        return TICK_SIZES.to_price(stock_name, ticks)
+
+    def _get_book(self, stock_name):
+        """Get order book of particular stock, creating empty one if needed
+
+        Arguments:
+            stock_name(str): Name of stock
+        Returns:
+            OrderBook: Order book of stock, LadderBook if selected for it
+        """
+        book = self.books.get(stock_name)
+        if book is None:
+            book = self.books[stock_name] = create_book(stock_name, self.resting)
+        return book
+
+    def _rebuild_book(self, stock_name, active_orders, last_price):
+        """Replace order book of particular stock with one made of stored orders
+
+        Arguments:
+            stock_name(str): Name of stock
+            active_orders(iterable): Orders in time priority
+            last_price(int): Price of last transaction in ticks, None if there was none
+        """
+        self._drop_book(stock_name)
+        book = self.books[stock_name] = create_book(stock_name, self.resting)
+        for order in active_orders:
+            book.add(order)
+        book.last_price = last_price
+        self.quotes.invalidate(stock_name)
+        if self.market_data is not None:
+            self.__publish_depth(stock_name)
+
+    def _drop_book(self, stock_name):
+        """Forget order book of particular stock and its resting orders
+
+        Arguments:
+            stock_name(str): Name of stock
+        """
+        if self.books.pop(stock_name, None) is None:
+            return
+        stale = [order_id for order_id, order in self.resting.items()
+                 if order.stock_name == stock_name]
+        for order_id in stale:
+            del self.resting[order_id]
+        self.quotes.invalidate(stock_name)
+
+    def partition_ids(self, shard, shards):
+        """Give orders ids unique among repositories of all shards
+
+        Repositories call it on construction, before they load any order.
+
+        Arguments:
+            shard(int): Index of worker process of this repository
+            shards(int): Number of worker processes
+        """
+        self.shard = shard
+        self.shards = shards
+
+    def _parse_order_id(self, order_id):
+        """Order id as stored from order id typed by user
+
+        Arguments:
+            order_id(str): Order id as shown on placement
+
+        Returns:
+            any: Order id, None if it is no valid id of repository
+        """
+        return order_id
+
+    def _find_resting(self, order_id):
+        """Resting order of any stock with particular id
+
+        Arguments:
+            order_id(str): Order id as shown on placement
+
+        Returns:
+            Order: Resting order, None if there is no such order
+        """
+        order_id = self._parse_order_id(order_id)
+        if order_id is None:
+            return None
+        return self.resting.get(order_id)
+
+    def _amend_error(self, order, amount):
+        """Check new total amount of resting order
+
+        Only reductions are accepted, as they keep time priority of order.
+
+        Arguments:
+            order(Order): Resting order
+            amount(int): New total amount
+
+        Returns:
+            str: User output explaining why amount is refused, None if it is accepted
+        """
+        if order.filled_qty < amount < order.total_qty:
+            return None
+        return "Order {} can only be amended to more than {} and less than {} shares".format(
+            order.order_id, order.filled_qty, order.total_qty)
+
+    def _change_refusal(self, order_id, order, amount):
+        """Check that resting order may be cancelled or amended
+
+        Arguments:
+            order_id(str): Order id as typed by user
+            order(Order): Resting order found for it, None if there is none
+            amount(int): New total amount, 0 to cancel order
+
+        Returns:
+            str: User output explaining why change is refused, None if it is accepted
+        """
+        if order is None:
+            return self.NOT_RESTING.format(order_id)
+        if amount:
+            return self._amend_error(order, amount)
+        return None
+
+    def _change_resting(self, order, amount):
+        """Cancel or amend resting order in its book and publish changed top and level
+
+        Arguments:
+            order(Order): Resting order
+            amount(int): New total amount, 0 to cancel order
+        """
+        book = self.books[order.stock_name]
+        if amount:
+            book.amend(order.order_id, amount)
+        else:
+            book.cancel(order.order_id)
+        self._update_quote(order.stock_name)
+        if order.price_type == "LMT":
+            self._publish_market_data(order, [])
+
+    def _changed_message(self, order):
+        """Resulting user output for cancelled or amended order
+
+        Arguments:
+            order(Order): Changed order
+        Returns:
+            str: Resulting user output
+        """
+        if order.cancelled:
+            return "You have cancelled order {} for {} {} shares".format(
+                order.order_id, order.remaining, order.stock_name)
+        return "You have amended order {} to {} {} shares".format(
+            order.order_id, order.total_qty, order.stock_name)
+
+    def _match_order(self, order):
+        """Match order in order book of its stock
+
+        Arguments:
+            order(Order): Accepted order
+        Returns:
+            list: Trades produced by order book
+        """
+        fills = self._get_book(order.stock_name).place(order)
+        self._apply_fills(order, fills)
+        return fills
+
+    def _unmatch_order(self, order, price):
+        """Reset order matched against a stale order book before it is matched again
+
+        Arguments:
+            order(Order): Matched order
+            price(int): Price of order before matching, -1 for MKT order
+        """
+        order.filled_qty = 0
+        order.price = price
+
+    def _publish_fills(self, order, fills):
+        """Add stored trades of order to bars, quote and market data
+
+        Arguments:
+            order(Order): Matched order
+            fills(list): Trades produced by order book
+        """
+        self._aggregate_fills(order, fills)
+        self._update_quote(order.stock_name)
+        self._publish_market_data(order, fills)
+
+    def _apply_fills(self, order, fills):
+        """Set prices of matched MKT orders to prices they traded at
+
+        MKT taker shows price of its last trade, every MKT maker price of the trade
+        that filled it last.
+
+        Arguments:
+            order(Order): Incoming order after matching
+            fills(list): Trades produced by order book
+        """
+        if fills and order.price_type == "MKT":
+            order.price = fills[-1].price
+        for fill in fills:
+            if fill.maker.price_type == "MKT":
+                fill.maker.price = fill.price
+
+    def _create_order(self, command, order_type, price_type):
+        """Create order from command
+
+        Arguments:
+            command(dict): Dictionary with command info, LMT price in ticks
+            order_type(str): BUY or SELL order
+            price_type(str): LMT or MKT order price
+        Returns:
+            order(Order): Pending order accepted now
+        """
+        command = command['command']
+        if price_type == "MKT":
+            price = -1
+        else:
+            price = command['price']
+        return Order(command['stock_name'], price_type, order_type, price,
+                     int(command['amount']), timestamp=CLOCK())
+
+    def _trade_documents(self, order, fills):
+        """Transaction history entries of trades
+
+        Trades happen when their incoming order is accepted and carry its timestamp.
+
+        Arguments:
+            order(Order): Incoming order after matching
+            fills(list): Trades produced by order book
+        Returns:
+            list: History entries with stock name, price in ticks, amount and timestamp
+        """
+        return [{"stock_name": order.stock_name,
+                 "price": fill.price,
+                 "amount": fill.amount,
+                 "timestamp": order.timestamp} for fill in fills]
+
+    def _aggregate_fills(self, order, fills):
+        """Account stored trades of incoming order in bars
+
+        Arguments:
+            order(Order): Incoming order after matching
+            fills(list): Trades produced by order book
+        """
+        for fill in fills:
+            self.bar_aggregator.add(order.stock_name, fill.price, fill.amount, order.timestamp)
+
+    def _aggregate_trades(self, trades):
+        """Account history entries in bars, e.g. when recovering state
+
+        Arguments:
+            trades(iterable): History entries in the order trades happened
+        """
+        add = self.bar_aggregator.add
+        for trade in trades:
+            add(trade["stock_name"], trade["price"], trade["amount"], trade["timestamp"])
+
+    def _publish_market_data(self, order, fills):
+        """Publish trade prints and sizes of price levels changed by stored order
+
+        Arguments:
+            order(Order): Incoming order after matching
+            fills(list): Trades produced by order book
+        """
+        bus = self.market_data
+        if bus is None:
+            return
+        stock_name = order.stock_name
+        book = self.books[stock_name]
+        messages = [TradePrint(stock_name, fill.price, fill.amount, order.timestamp)
+                    for fill in fills]
+        levels = dict.fromkeys((fill.maker.order_type, fill.price) for fill in fills
+                               if fill.maker.price_type == "LMT")
+        if order.price_type == "LMT" and order.remaining > 0:
+            levels[order.order_type, order.price] = None
+        messages.extend(LevelUpdate(stock_name, side, price, book.level_size(side, price))
+                        for side, price in levels)
+        bus.publish(messages)
+
+    def __publish_depth(self, stock_name):
+        """Publish all price levels of stock replacing its previously published depth
+
+        Arguments:
+            stock_name(str): Name of stock
+        """
+        book = self.books[stock_name]
+        self.market_data.replace(stock_name, [
+            LevelUpdate(stock_name, side, price, size)
+            for side in ("BUY", "SELL") for price, size in book.level_sizes(side)])
+
+    def _bar_rows(self, stock_name, interval):
+        """Resulting rows of BARS command
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of bar interval, e.g. 1m
+        Returns:
+            list: Single batch of rows from oldest bar, every row ending with new line,
+                no batch without bars
+        """
+        rows = []
+        for bar in self.bar_aggregator.bars(stock_name, interval):
+            start = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(bar.start // 1000000000))
+            rows.append("{} {} {} OPEN: {} HIGH: {} LOW: {} CLOSE: {} VOLUME: {}\n".format(
+                stock_name, interval, start,
+                self._to_price(stock_name, bar.open),
+                self._to_price(stock_name, bar.high),
+                self._to_price(stock_name, bar.low),
+                self._to_price(stock_name, bar.close),
+                bar.volume))
+        return ["".join(rows)] if rows else []
+
+    def _placed_message(self, order):
+        """Resulting user output for placed order
+
+        Arguments:
+            order(Order): Placed order
+        Returns:
+            str: Resulting user output
+        """
+        if order.price_type == "MKT":
+            return "You have placed a MKT {} order for {} {} shares, order id {}".format(
+                order.order_type,
+                order.total_qty,
+                order.stock_name,
+                order.order_id
+            )
+        return "You have placed a LMT {} order for {} {} shares at {} each, order id {}".format(
+            order.order_type,
+            order.total_qty,
+            order.stock_name,
+            self._to_price(order.stock_name, order.price),
+            order.order_id
+        )
+
+    def _last_price(self, stock_name):
+        """Price of last transaction of particular stock
+
+        Unfilled MKT orders are stored with price -1 and show this price when read.
+
+        Arguments:
+            stock_name(str): Name of stock
+        Returns:
+            int: Last transaction price in ticks, -1 if stock was never traded
+        """
+        book = self.books.get(stock_name)
+        if book is None or book.last_price is None:
+            return -1
+        return book.last_price
+
+    def _view_filter(self, stock_name=None, order_type=None, status=None):
+        """Equality filter of orders to view
+
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+
+        Returns:
+            dict: Field -> required value
+        """
+        fields = (("stock_name", stock_name), ("order_type", order_type), ("status", status))
+        return {field: value for field, value in fields if value is not None}
+
+    def _page_bounds(self, page=1, limit=None):
+        """Number of orders to skip and to view for page of VIEW ORDERS command
+
+        Arguments:
+            page(int): Number of page starting from 1
+            limit(int): Number of orders per page, None for all orders
+
+        Returns:
+            int, int: Number of orders to skip and maximal number of orders, None for all
+        """
+        if limit is None:
+            return 0, None
+        return (page - 1) * limit, limit
+
+    def _stream_rows(self, orders, skip=0):
+        """Resulting rows of VIEW ORDERS command yielded in batches
+
+        Arguments:
+            orders(iterable): Stored orders
+            skip(int): Number of orders before the first one, used to number rows
+
+        Yields:
+            str: Up to VIEW_BATCH rows, every row ending with new line
+        """
+        batch = []
+        for number, order in enumerate(orders, skip + 1):
+            price = order.price
+            if price == -1:
+                price = self._last_price(order.stock_name)
+            if price != -1:
+                price = self._to_price(order.stock_name, price)
+            batch.append("{}. {} {} {} {} {}/{} {}\n".format(
+                number, order.stock_name, order.price_type, order.order_type, price,
+                order.filled_qty, order.total_qty, order.status))
+            if len(batch) == self.VIEW_BATCH:
+                yield "".join(batch)
+                batch = []
+        if batch:
+            yield "".join(batch)
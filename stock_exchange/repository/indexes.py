@@ -0,0 +1,89 @@
+import pymongo
+
+
+# Active orders of one side of a stock by price, then time priority
+ORDER_INDEXES = [
+    pymongo.IndexModel(
+        [
+            ("stock_name", pymongo.ASCENDING),
+            ("order_type", pymongo.ASCENDING),
+            ("status", pymongo.ASCENDING),
+            ("price", pymongo.ASCENDING),
+            ("_id", pymongo.ASCENDING)
+        ],
+        name="stock_side_status_price_id"
+    ),
+    pymongo.IndexModel(
+        [
+            ("status", pymongo.ASCENDING),
+            ("_id", pymongo.ASCENDING)
+        ],
+        name="status_id"
+    ),
+]
+
+# Transactions of a stock from newest to oldest
+HISTORY_INDEXES = [
+    pymongo.IndexModel(
+        [
+            ("stock_name", pymongo.ASCENDING),
+            ("_id", pymongo.DESCENDING)
+        ],
+        name="stock_id"
+    ),
+    # Recent transactions aggregated into bars on start
+    pymongo.IndexModel(
+        [
+            ("timestamp", pymongo.ASCENDING),
+            ("_id", pymongo.ASCENDING)
+        ],
+        name="timestamp_id"
+    ),
+]
+
+
+def ensure_indexes(collection, history):
+    """Create indexes of orders and history collections if they do not exist
+
+    Arguments:
+        collection(Collection): Collection of orders
+        history(Collection): History of transactions
+    """
+    collection.create_indexes(ORDER_INDEXES)
+    history.create_indexes(HISTORY_INDEXES)
+
+
+def winning_stages(explain):
+    """Collect stage names of the winning plan of explained query
+
+    Arguments:
+        explain(dict): Output of cursor explain()
+
+    Returns:
+        list: Stage names from root to leaves of the winning plan
+    """
+    stages = []
+    plans = [explain["queryPlanner"]["winningPlan"]]
+    while plans:
+        plan = plans.pop()
+        # Slot based engine wraps classic plan in queryPlan
+        plan = plan.get("queryPlan", plan)
+        stages.append(plan["stage"])
+        if "inputStage" in plan:
+            plans.append(plan["inputStage"])
+        plans.extend(plan.get("inputStages", []))
+    return stages
+
+
+def is_covered(explain):
+    """Check that explained query is served by an index instead of a collection scan
+
+    Arguments:
+        explain(dict): Output of cursor explain()
+
+    Returns:
+        bool: Query uses index and never scans collection
+    """
+    stages = winning_stages(explain)
+    return "COLLSCAN" not in stages and any(stage in ("IXSCAN", "IDHACK", "EXPRESS_IXSCAN")
+                                            for stage in stages)
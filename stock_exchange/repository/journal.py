@@ -0,0 +1,315 @@
+import collections
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+from stock_exchange.domain.order import Order
+
+
+class JournalError(Exception):
+    """Replayed journal does not reproduce trades it recorded"""
+
+
+# Payload length, CRC32 of payload and sequence number of journal record
+HEADER = struct.Struct("<IIQ")
+# Order id, timestamp, order type, price type, price in ticks, total amount, length of
+# stock name
+ORDER = struct.Struct("<QQBBqQH")
+# Number of trades of order
+FILL_COUNT = struct.Struct("<I")
+# Maker order id, price in ticks and amount of single trade
+FILL = struct.Struct("<QqQ")
+# Order id and new total amount of amended order, 0 for cancelled order. Records of
+# accepted orders are longer, so length of payload tells kinds of records apart
+AMENDMENT = struct.Struct("<QQ")
+
+# Cancellation or amendment of resting order replayed from journal
+Amendment = collections.namedtuple('Amendment', ['order_id', 'total_qty'])
+
+ORDER_TYPES = ("BUY", "SELL")
+PRICE_TYPES = ("LMT", "MKT")
+# Attributes of stored orders in the order they are kept in snapshots
+ORDER_FIELDS = ("order_id", "stock_name", "order_type", "price_type", "price",
+                "total_qty", "filled_qty", "timestamp", "cancelled")
+# Fields of transaction history entries in the order they are kept in snapshots
+HISTORY_FIELDS = ("stock_name", "price", "amount", "timestamp")
+
+
+def encode_record(sequence, order, fills):
+    """Encode accepted order and trades it produced as single journal record
+
+    Arguments:
+        sequence(int): Sequence number of record
+        order(Order): Accepted order, price of MKT order is journaled as -1
+        fills(list): Trades produced by order book
+
+    Returns:
+        bytes: Journal record
+    """
+    name = order.stock_name.encode()
+    price = -1 if order.price_type == "MKT" else order.price
+    parts = [
+        ORDER.pack(order.order_id, order.timestamp, ORDER_TYPES.index(order.order_type),
+                   PRICE_TYPES.index(order.price_type), price, order.total_qty, len(name)),
+        name,
+        FILL_COUNT.pack(len(fills)),
+    ]
+    parts.extend(FILL.pack(fill.maker.order_id, fill.price, fill.amount) for fill in fills)
+    payload = b"".join(parts)
+    return HEADER.pack(len(payload), zlib.crc32(payload), sequence) + payload
+
+
+def encode_amendment(sequence, order_id, total_qty):
+    """Encode cancellation or amendment of resting order as single journal record
+
+    Arguments:
+        sequence(int): Sequence number of record
+        order_id(int): Id of resting order
+        total_qty(int): New total amount of order, 0 for cancelled order
+
+    Returns:
+        bytes: Journal record
+    """
+    payload = AMENDMENT.pack(order_id, total_qty)
+    return HEADER.pack(len(payload), zlib.crc32(payload), sequence) + payload
+
+
+def decode_payload(payload):
+    """Decode payload of journal record
+
+    Arguments:
+        payload(bytes): Payload of journal record
+
+    Returns:
+        tuple: Order as it was accepted and list of (maker order id, price, amount)
+            trades, or Amendment
+    """
+    if len(payload) == AMENDMENT.size:
+        return Amendment(*AMENDMENT.unpack(payload))
+    order_id, timestamp, order_type, price_type, price, total_qty, name_length = \
+        ORDER.unpack_from(payload)
+    offset = ORDER.size
+    stock_name = payload[offset:offset + name_length].decode()
+    offset += name_length
+    count, = FILL_COUNT.unpack_from(payload, offset)
+    offset += FILL_COUNT.size
+    fills = [FILL.unpack_from(payload, offset + i * FILL.size) for i in range(count)]
+    order = Order(stock_name, PRICE_TYPES[price_type], ORDER_TYPES[order_type], price,
+                  total_qty, order_id=order_id, timestamp=timestamp)
+    return order, fills
+
+
+class Journal:
+    """Append-only binary journal of accepted orders with periodic snapshots
+
+    Every record holds one accepted order together with the trades it produced, or
+    one cancellation or amendment of a resting order.
+    Records are written to the operating system as they are appended, so a crashed
+    process loses nothing, and are fsynced in groups, so a lost machine loses at most
+    group_size records or group_interval seconds of them. Records of a group that is
+    not complete when appending stops are fsynced by a background thread once they
+    have waited group_interval. A torn record at the end of the journal is dropped on
+    recovery.
+
+    Args:
+        directory(str): Directory of journal and snapshot files, created if needed
+        group_size(int): Number of records fsynced together
+        group_interval(float): Longest time in seconds a record waits for fsync
+        snapshot_every(int): Number of records after which a snapshot is due,
+            None to never take snapshots
+    """
+    JOURNAL_FILE = "journal.bin"
+    SNAPSHOT_FILE = "snapshot.pickle"
+
+    def __init__(self, directory, group_size=64, group_interval=0.01, snapshot_every=100000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.journal_path = os.path.join(directory, self.JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_every = snapshot_every
+        # Sequence number of last appended record
+        self.sequence = 0
+        # Number of records appended since last snapshot
+        self.since_snapshot = 0
+        # Number of appended records waiting for fsync and time first of them waits
+        self.__unsynced = 0
+        self.__unsynced_since = None
+        self.__file = None
+        # Guards journal file and group of unsynced records shared with the flusher
+        self.__condition = threading.Condition()
+        # Thread fsyncing groups left incomplete by idle appender
+        self.__flusher = None
+
+    @property
+    def snapshot_due(self):
+        """Enough records were appended since last snapshot to take a new one"""
+        return self.snapshot_every is not None and self.since_snapshot >= self.snapshot_every
+
+    def load(self):
+        """Read latest snapshot and journal records appended after it
+
+        Torn or corrupted records at the end of the journal are truncated and
+        journal is opened for appending.
+
+        Returns:
+            dict, list: Snapshot state, None if there is no snapshot, and
+                (order, fills) tuples and Amendment of records to replay in order
+        """
+        if self.__file is not None:
+            # Reloaded after failed append, records are read from disk again
+            self.__close_file()
+        self.sequence = 0
+        self.since_snapshot = 0
+        state = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as snapshot:
+                state = pickle.load(snapshot)
+            self.sequence = state['sequence']
+
+        records = []
+        valid_length = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as journal:
+                data = journal.read()
+            while len(data) - valid_length >= HEADER.size:
+                length, crc, sequence = HEADER.unpack_from(data, valid_length)
+                start = valid_length + HEADER.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                valid_length = start + length
+                if sequence > self.sequence:
+                    records.append(decode_payload(payload))
+                    self.sequence = sequence
+                    self.since_snapshot += 1
+        self.__file = open(self.journal_path, "ab", buffering=0)
+        self.__file.truncate(valid_length)
+        self.__flusher = threading.Thread(target=self.__flush_idle, name="journal-flusher",
+                                          daemon=True)
+        self.__flusher.start()
+        return state, records
+
+    def append(self, order, fills):
+        """Append accepted order and trades it produced
+
+        Arguments:
+            order(Order): Accepted order
+            fills(list): Trades produced by order book
+        """
+        self.sequence += 1
+        self.__write(encode_record(self.sequence, order, fills))
+
+    def append_amendment(self, order_id, total_qty):
+        """Append cancellation or amendment of resting order
+
+        Arguments:
+            order_id(int): Id of resting order
+            total_qty(int): New total amount of order, 0 for cancelled order
+        """
+        self.sequence += 1
+        self.__write(encode_amendment(self.sequence, order_id, total_qty))
+
+    def __write(self, record):
+        """Write encoded record, fsyncing group of records once it is complete
+
+        Arguments:
+            record(bytes): Journal record
+        """
+        with self.__condition:
+            self.since_snapshot += 1
+            self.__file.write(record)
+            self.__unsynced += 1
+            now = time.monotonic()
+            if self.__unsynced_since is None:
+                self.__unsynced_since = now
+                self.__condition.notify()
+            complete = self.__unsynced >= self.group_size
+            if complete or now - self.__unsynced_since >= self.group_interval:
+                self.sync()
+
+    def sync(self):
+        """Fsync all appended records"""
+        with self.__condition:
+            if self.__unsynced:
+                os.fsync(self.__file.fileno())
+            self.__unsynced = 0
+            self.__unsynced_since = None
+
+    def snapshot(self, state):
+        """Atomically replace snapshot and start empty journal after it
+
+        Arguments:
+            state(dict): Compact state of repository, sequence number of last
+                record it contains is added to it
+        """
+        with self.__condition:
+            self.sync()
+            state = dict(state, sequence=self.sequence)
+            temporary_path = self.snapshot_path + ".tmp"
+            with open(temporary_path, "wb") as snapshot:
+                pickle.dump(state, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+            # The journal must not be truncated before the new snapshot survives power loss
+            self.__sync_directory()
+            # Records up to the snapshot sequence are skipped if we crash before truncating
+            self.__file.truncate(0)
+            os.fsync(self.__file.fileno())
+            self.since_snapshot = 0
+
+    def reset(self):
+        """Drop snapshot and all records"""
+        with self.__condition:
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
+                self.__sync_directory()
+            self.__file.truncate(0)
+            os.fsync(self.__file.fileno())
+            self.sequence = 0
+            self.since_snapshot = 0
+            self.__unsynced = 0
+            self.__unsynced_since = None
+
+    def close(self):
+        """Fsync appended records and close journal"""
+        if self.__file is not None:
+            self.sync()
+            self.__close_file()
+
+    def __close_file(self):
+        """Close journal file and stop flusher without fsyncing appended records"""
+        with self.__condition:
+            self.__file.close()
+            self.__file = None
+            self.__unsynced = 0
+            self.__unsynced_since = None
+            self.__condition.notify()
+        self.__flusher.join()
+        self.__flusher = None
+
+    def __sync_directory(self):
+        """Fsync journal directory, making renamed and removed files durable"""
+        descriptor = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def __flush_idle(self):
+        """Fsync group of records once its first record has waited group_interval"""
+        with self.__condition:
+            while self.__file is not None:
+                if self.__unsynced_since is None:
+                    self.__condition.wait()
+                    continue
+                delay = self.__unsynced_since + self.group_interval - time.monotonic()
+                if delay > 0:
+                    self.__condition.wait(delay)
+                else:
+                    self.sync()
@@ -0,0 +1,344 @@
+import copy
+import itertools
+
+from stock_exchange.repository.book_repo import BookRepo
+from stock_exchange.domain.order import Order
+from stock_exchange.repository.journal import (
+    HISTORY_FIELDS,
+    ORDER_FIELDS,
+    Amendment,
+    JournalError,
+)
+
+
+class InMemoryRepo(BookRepo):
+    """Repository class keeping orders and history in process memory
+
+    Produces the same order states and history as MongoRepo without a database, for
+    simulations, tests and benchmarks. With a journal every accepted order is
+    journaled before it is answered and state is recovered from the journal on start.
+
+    Arguments:
+        journal(Journal): Journal of accepted orders, None to keep orders only in memory
+        shard(int): Index of worker process of this repository
+        shards(int): Number of worker processes
+    """
+    SHARED_STORAGE = False
+
+    def __init__(self, journal=None, shard=0, shards=1):
+        super().__init__()
+        # Stored orders in insertion order
+        self.orders = []
+        # History of transactions
+        self.history = []
+        # Generator of order ids increasing like MongoDB ObjectIds
+        self.partition_ids(shard, shards)
+        self.journal = journal
+        if journal is not None:
+            self.__recover()
+
+    def clear(self):
+        """Drop all orders, history and order books"""
+        self._clear_books()
+        self.orders = []
+        self.history = []
+        if self.journal is not None:
+            self.journal.reset()
+
+    def view(self, stock_name=None, order_type=None, status=None, page=1, limit=None):
+        """View orders during client session in batches
+
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+            page(int): Number of page starting from 1
+            limit(int): Number of orders per page, None for all orders
+
+        Returns:
+            generator: Batches of resulting rows
+        """
+        skip, limit = self._page_bounds(page, limit)
+        query = self._view_filter(stock_name, order_type, status).items()
+        orders = (order for order in self.orders
+                  if all(getattr(order, field) == value for field, value in query))
+        stop = None if limit is None else skip + limit
+        return self._stream_rows(itertools.islice(orders, skip, stop), skip)
+
+    def find(self, stock_name=None, order_type=None, status=None, limit=None):
+        """Stored orders matching VIEW ORDERS filters with prices of MKT orders resolved
+
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+            limit(int): Maximal number of oldest orders found, None for all
+
+        Returns:
+            list: (position of order in insertion order, order) pairs
+        """
+        query = self._view_filter(stock_name, order_type, status).items()
+        found = []
+        for position, order in enumerate(self.orders):
+            if len(found) == limit:
+                break
+            if all(getattr(order, field) == value for field, value in query):
+                if order.price == -1:
+                    order = copy.copy(order)
+                    order.price = self._last_price(order.stock_name)
+                found.append((position, order))
+        return found
+
+    def quote(self, stock_name):
+        """Get bid price, ask price and price of last transaction for particular stock
+
+        Arguments:
+            stock_name(str): Name of stock for which we want to see info
+
+        Returns:
+            str: Bid price, ask price and price of last transaction for particular stock
+        """
+        return self._get_quote(stock_name)
+
+    def quote_many(self, stock_names):
+        """Get quotes of several stocks at once
+
+        Arguments:
+            stock_names(list): Names of stocks
+
+        Returns:
+            list: Batches of resulting rows, one quote per stock
+        """
+        return self._quote_rows(stock_names)
+
+    def depth(self, stock_name, levels):
+        """Get aggregate amounts of best price levels of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            levels(int): Maximal number of price levels per side
+
+        Returns:
+            list: Batches of resulting rows
+        """
+        return self._depth_rows(stock_name, levels)
+
+    def bars(self, stock_name, interval):
+        """Get OHLCV bars of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of bar interval, e.g. 1m
+
+        Returns:
+            list: Batches of resulting rows from oldest bar
+        """
+        return self._bar_rows(stock_name, interval)
+
+    def place_mkt_buy(self, command):
+        """Place buy at market price order
+
+        Arguments:
+            command(dict): Dictionary with BUY MKT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "BUY", "MKT")
+        self.__place(order)
+        return self._placed_message(order)
+
+    def place_mkt_sell(self, command):
+        """Place sell at market price order
+
+        Arguments:
+            command(dict): Dictionary with SELL MKT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "SELL", "MKT")
+        self.__place(order)
+        return self._placed_message(order)
+
+    def place_lmt_buy(self, command):
+        """Place buy at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with BUY LMT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "BUY", "LMT")
+        self.__place(order)
+        return self._placed_message(order)
+
+    def place_lmt_sell(self, command):
+        """Place sell at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with SELL LMT info
+        Returns:
+            str: Resulting user output
+        """
+        order = self._create_order(command, "SELL", "LMT")
+        self.__place(order)
+        return self._placed_message(order)
+
+    def cancel(self, order_id):
+        """Cancel remaining amount of resting order
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+
+        Returns:
+            str: Resulting user output
+        """
+        order = self._find_resting(order_id)
+        refusal = self._change_refusal(order_id, order, 0)
+        if refusal is not None:
+            return refusal
+        self.__change(order, 0)
+        return self._changed_message(order)
+
+    def amend(self, order_id, amount):
+        """Reduce total amount of resting order keeping its time priority
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount of order
+
+        Returns:
+            str: Resulting user output
+        """
+        order = self._find_resting(order_id)
+        refusal = self._change_refusal(order_id, order, amount)
+        if refusal is not None:
+            return refusal
+        self.__change(order, amount)
+        return self._changed_message(order)
+
+    def partition_ids(self, shard, shards):
+        super().partition_ids(shard, shards)
+        self.__ids = itertools.count(shard + 1, shards)
+
+    def _parse_order_id(self, order_id):
+        order_id = str(order_id)
+        return int(order_id) if order_id.isdigit() else None
+
+    def __change(self, order, amount):
+        """Journal cancellation or amendment of resting order, then apply it
+
+        Arguments:
+            order(Order): Resting order
+            amount(int): New total amount, 0 to cancel order
+        """
+        if self.journal is not None:
+            self.__journal(self.journal.append_amendment, order.order_id, amount)
+        self._change_resting(order, amount)
+        self.__snapshot_if_due()
+
+    def __place(self, order):
+        """Match order in order book and store it with resulting trades
+
+        The record of the order holds the trades it produced, so it is journaled right
+        after matching and before the order is answered. If it cannot be journaled,
+        state is recovered from the journal again, so no trade that is not journaled
+        stays in memory.
+
+        Arguments:
+            order(Order): Accepted order
+        """
+        order.order_id = next(self.__ids)
+        fills = self.__match(order)
+        if self.journal is not None:
+            self.__journal(self.journal.append, order, fills)
+            self.__snapshot_if_due()
+
+    def __journal(self, append, *args):
+        """Append record to journal, recovering journaled state if append fails
+
+        Arguments:
+            append(callable): Journal method appending the record
+            args(list): Arguments of append
+        """
+        try:
+            append(*args)
+        except Exception:
+            self._clear_books()
+            self.orders = []
+            self.history = []
+            self.__recover()
+            raise
+
+    def __snapshot_if_due(self):
+        """Take snapshot of journaled repository once enough records were appended"""
+        if self.journal is not None and self.journal.snapshot_due:
+            self.journal.snapshot(self.__snapshot_state())
+
+    def __match(self, order):
+        """Match order in order book and store it with resulting trades
+
+        Stored orders rest in the book themselves, so trades update them in place.
+
+        Arguments:
+            order(Order): Accepted order with id
+        Returns:
+            list: Trades produced by order book
+        """
+        fills = self._match_order(order)
+        self.orders.append(order)
+        self.history.extend(self._trade_documents(order, fills))
+        self._publish_fills(order, fills)
+        return fills
+
+    def __snapshot_state(self):
+        """Compact state of repository written to snapshots
+
+        Returns:
+            dict: Stored orders as tuples of ORDER_FIELDS, history as tuples of
+                HISTORY_FIELDS and last transaction price of every stock
+        """
+        return {
+            "orders": [tuple(getattr(order, field) for field in ORDER_FIELDS)
+                       for order in self.orders],
+            "history": [tuple(trade[field] for field in HISTORY_FIELDS)
+                        for trade in self.history],
+            "last_prices": {name: book.last_price for name, book in self.books.items()},
+        }
+
+    def __recover(self):
+        """Load latest snapshot and replay journal records appended after it
+
+        Raises:
+            JournalError: Replayed order does not produce trades it journaled or
+                replayed amendment finds no resting order
+        """
+        state, records = self.journal.load()
+        if state is not None:
+            self.orders = [Order(**dict(zip(ORDER_FIELDS, values))) for values in state["orders"]]
+            self.history = [dict(zip(HISTORY_FIELDS, values)) for values in state["history"]]
+            self._aggregate_trades(self.history)
+            active = {}
+            for order in self.orders:
+                if order.remaining > 0 and not order.cancelled:
+                    active.setdefault(order.stock_name, []).append(order)
+            for stock_name, last_price in state["last_prices"].items():
+                self._rebuild_book(stock_name, active.get(stock_name, ()), last_price)
+
+        for record in records:
+            if type(record) is Amendment:
+                order = self.resting.get(record.order_id)
+                if order is None:
+                    raise JournalError("Order {} is not resting".format(record.order_id))
+                self._change_resting(order, record.total_qty)
+                continue
+            order, journaled_fills = record
+            fills = self.__match(order)
+            if [(fill.maker.order_id, fill.price, fill.amount) for fill in fills] != \
+                    journaled_fills:
+                raise JournalError("Order {} does not replay its trades".format(order.order_id))
+        last_id = self.orders[-1].order_id if self.orders else 0
+        # Next id of this shard above recovered ones, ids of other shards stay free
+        first = self.shard + 1
+        if last_id >= first:
+            first += ((last_id - first) // self.shards + 1) * self.shards
+        self.__ids = itertools.count(first, self.shards)
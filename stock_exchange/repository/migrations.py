@@ -0,0 +1,103 @@
+# Orders stored by earlier versions keep fill state in a single "amount" string
+AMOUNT_STRING_FILTER = {
+    "amount": {
+        "$type": "string"
+    }
+}
+
+# Server side rewrite of "filled/total" amount string to numeric fill fields
+AMOUNT_STRING_PIPELINE = [
+    {
+        "$set": {
+            "filled_qty": {"$toInt": {"$arrayElemAt": [{"$split": ["$amount", "/"]}, 0]}},
+            "total_qty": {"$toInt": {"$arrayElemAt": [{"$split": ["$amount", "/"]}, 1]}}
+        }
+    },
+    {
+        "$unset": "amount"
+    }
+]
+
+
+def migrate_amount_strings(collection):
+    """Convert legacy "filled/total" amount strings to numeric fill fields
+
+    Orders are rewritten server side in one update to integer "filled_qty" and
+    "total_qty" fields, so running the migration again is a no-op.
+
+    Arguments:
+        collection(Collection): Collection of orders
+
+    Returns:
+        int: Number of migrated orders
+    """
+    result = collection.update_many(AMOUNT_STRING_FILTER, AMOUNT_STRING_PIPELINE)
+    return result.modified_count
+
+
+# Orders and trades stored by earlier versions keep prices as decimal floats
+FLOAT_PRICE_FILTER = {
+    "price": {
+        "$type": "double"
+    }
+}
+
+
+def float_price_pipeline(tick):
+    """Server side rewrite of decimal float price to integer ticks, -1 of MKT orders is kept
+
+    Arguments:
+        tick(Decimal): Tick size of migrated stocks
+
+    Returns:
+        list: Update pipeline
+    """
+    return [
+        {
+            "$set": {
+                "price": {
+                    "$cond": [
+                        {"$eq": ["$price", -1]},
+                        -1,
+                        {"$toLong": {"$round": [{"$divide": ["$price", float(tick)]}, 0]}}
+                    ]
+                }
+            }
+        }
+    ]
+
+
+def float_price_updates(tick_sizes):
+    """Filters and pipelines converting float prices of all stocks to ticks
+
+    Arguments:
+        tick_sizes(TickSizes): Tick sizes of stocks
+
+    Returns:
+        list: (filter, pipeline) pairs, stocks with own tick size first
+    """
+    updates = [(dict(FLOAT_PRICE_FILTER, stock_name=stock_name), float_price_pipeline(tick))
+               for stock_name, tick in tick_sizes.sizes.items()]
+    updates.append((dict(FLOAT_PRICE_FILTER, stock_name={"$nin": list(tick_sizes.sizes)}),
+                    float_price_pipeline(tick_sizes.default)))
+    return updates
+
+
+def migrate_float_prices(collection, history, tick_sizes):
+    """Convert decimal float prices of orders and history to integer ticks
+
+    Converted prices are stored as integers, so running the migration again is a no-op.
+
+    Arguments:
+        collection(Collection): Collection of orders
+        history(Collection): Collection of transactions
+        tick_sizes(TickSizes): Tick sizes of stocks
+
+    Returns:
+        int: Number of migrated documents
+    """
+    modified = 0
+    for target in (collection, history):
+        for query, pipeline in float_price_updates(tick_sizes):
+            modified += target.update_many(query, pipeline).modified_count
+    return modified
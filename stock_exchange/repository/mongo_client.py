@@ -0,0 +1,129 @@
+import os
+
+
+# Read preference names of connection strings -> attributes of pymongo.ReadPreference
+READ_PREFERENCES = {
+    "primary": "PRIMARY",
+    "primaryPreferred": "PRIMARY_PREFERRED",
+    "secondary": "SECONDARY",
+    "secondaryPreferred": "SECONDARY_PREFERRED",
+    "nearest": "NEAREST",
+}
+
+
+class MongoSettings:
+    """Settings of MongoDB clients of the process
+
+    Write concern trades durability against latency of every placed order: w=0 does
+    not wait for the server at all and then also skips detection of books changed by
+    other clients, w=majority with journal waits until a majority of members has
+    journaled the order.
+
+    Args:
+        uri(str): MongoDB connection string
+        database(str): Name of database with orders and history collections
+        max_pool_size(int): Maximal number of connections per server
+        w(int or str): Number of members acknowledging writes or majority, None for
+            server default
+        journal(bool): Acknowledge writes once journaled, None for server default
+        read_preference(str): Members VIEW ORDERS reads from, key of READ_PREFERENCES
+        compressors(str): Comma-separated wire compressors, e.g. zstd,zlib, None for none
+    """
+    def __init__(self, uri="mongodb://localhost:27017", database="orders_database",
+                 max_pool_size=100, w=None, journal=None, read_preference="primary",
+                 compressors=None):
+        self.uri = uri
+        self.database = database
+        self.max_pool_size = max_pool_size
+        self.w = w
+        self.journal = journal
+        self.read_preference = read_preference
+        self.compressors = compressors
+
+    def configure(self, uri=None, max_pool_size=None, w=None, journal=None,
+                  read_preference=None, compressors=None):
+        """Set settings given on command line, None keeps a setting
+
+        Arguments:
+            uri(str): MongoDB connection string
+            max_pool_size(int): Maximal number of connections per server
+            w(str): Number of members acknowledging writes or majority
+            journal(bool): Acknowledge writes once journaled
+            read_preference(str): Members VIEW ORDERS reads from
+            compressors(str): Comma-separated wire compressors
+
+        Raises:
+            ValueError: Pool size is not positive or read preference is unknown
+        """
+        if max_pool_size is not None and max_pool_size < 1:
+            raise ValueError("Pool size {} is not positive".format(max_pool_size))
+        if read_preference is not None and read_preference not in READ_PREFERENCES:
+            raise ValueError("Read preference {} is not one of {}".format(
+                read_preference, ", ".join(READ_PREFERENCES)))
+        if uri is not None:
+            self.uri = uri
+        if max_pool_size is not None:
+            self.max_pool_size = max_pool_size
+        if w is not None:
+            self.w = int(w) if w.isdigit() else w
+        if journal is not None:
+            self.journal = journal
+        if read_preference is not None:
+            self.read_preference = read_preference
+        if compressors is not None:
+            self.compressors = compressors
+
+    def client_options(self):
+        """Keyword arguments of MongoClient and AsyncIOMotorClient besides URI
+
+        Returns:
+            dict: Client options, server defaults are left out
+        """
+        options = {"maxPoolSize": self.max_pool_size}
+        if self.w is not None:
+            options["w"] = self.w
+        if self.journal is not None:
+            options["journal"] = self.journal
+        if self.compressors:
+            options["compressors"] = self.compressors
+        return options
+
+    def view_read_preference(self):
+        """Read preference of VIEW ORDERS queries
+
+        Returns:
+            pymongo.read_preferences.ServerMode: Read preference
+        """
+        import pymongo
+        return getattr(pymongo.ReadPreference, READ_PREFERENCES[self.read_preference])
+
+
+# Settings of MongoDB clients of this process
+MONGO_SETTINGS = MongoSettings()
+
+# (process id, client class) -> client shared by all repositories of the process
+_clients = {}
+
+
+def shared_client(client_class=None, settings=MONGO_SETTINGS):
+    """Client of the current process, created with settings on first use
+
+    Repositories and use cases of a process share the client and its connection
+    pool. Clients are not inherited across fork, so every shard worker process
+    connects with its own.
+
+    Arguments:
+        client_class(type): pymongo.MongoClient by default or AsyncIOMotorClient
+        settings(MongoSettings): Settings of a client not created yet
+
+    Returns:
+        MongoClient or AsyncIOMotorClient: Client of the process
+    """
+    if client_class is None:
+        import pymongo
+        client_class = pymongo.MongoClient
+    key = os.getpid(), client_class
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = client_class(settings.uri, **settings.client_options())
+    return client
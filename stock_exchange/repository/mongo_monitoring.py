@@ -0,0 +1,59 @@
+from pymongo import monitoring
+
+
+# Command name -> stage of its round trips, other commands, e.g. hello, are not timed
+COMMAND_STAGES = {
+    "find": "db_read",
+    "getMore": "db_read",
+    "distinct": "db_read",
+    "aggregate": "db_read",
+    "count": "db_read",
+    "insert": "db_write",
+    "update": "db_write",
+    "delete": "db_write",
+    "findAndModify": "db_write",
+    "commitTransaction": "db_write",
+    "abortTransaction": "db_write",
+}
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Records round trips of MongoDB commands as db_read and db_write stages
+
+    pymongo times every command from sending it to receiving its reply, for clients
+    of pymongo and Motor alike, VIEW cursors included. Listeners cannot be removed
+    once registered, so the timer only records while it is given stats.
+
+    Attributes:
+        stats(Stats): Statistics round trips are recorded in, None to record none
+    """
+    def __init__(self):
+        self.stats = None
+
+    def started(self, event):
+        """Commands are timed by pymongo, nothing to do when they start"""
+        pass
+
+    def succeeded(self, event):
+        """Record round trip of command answered by server"""
+        self.__record(event)
+
+    def failed(self, event):
+        """Record round trip of command failed by server or network"""
+        self.__record(event)
+
+    def __record(self, event):
+        """Record duration of finished command in stage of its name
+
+        Arguments:
+            event(CommandSucceededEvent or CommandFailedEvent): Finished command
+        """
+        stats = self.stats
+        stage = COMMAND_STAGES.get(event.command_name)
+        if stats is not None and stage is not None:
+            stats.record(stage, event.duration_micros * 1000)
+
+
+# Timer of commands of clients created once this module is imported
+TIMER = CommandTimer()
+monitoring.register(TIMER)
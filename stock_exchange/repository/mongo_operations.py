@@ -0,0 +1,375 @@
+import pymongo
+from bson import ObjectId
+
+from stock_exchange.repository.sharded_repo import shard_of
+
+
+# Status filter of orders resting in order book
+ACTIVE_STATUS = {'$in': ["PENDING", "PARTIAL"]}
+# Code of write errors of documents whose _id is already stored
+DUPLICATE_KEY = 11000
+
+
+class StaleBookError(Exception):
+    """Order book does not match orders stored in database"""
+    pass
+
+
+def owns(stock_name, shard, shards):
+    """Check if repository of shard loads order book of particular stock
+
+    Arguments:
+        stock_name(str): Name of stock
+        shard(int): Index of worker process of repository
+        shards(int): Number of worker processes
+
+    Returns:
+        bool: Order book of stock belongs to shard
+    """
+    return shard_of(stock_name, shards) == shard
+
+
+def active_orders_filter(stock_name=None):
+    """Filter of active orders, optionally of a single stock
+
+    Arguments:
+        stock_name(str): Name of stock, None for all stocks
+
+    Returns:
+        dict: Query filter
+    """
+    query = {"status": ACTIVE_STATUS}
+    if stock_name is not None:
+        query["stock_name"] = stock_name
+    return query
+
+
+def recent_trades(since):
+    """Query of transactions since particular time in the order they happened
+
+    Transactions stored without timestamp are never recent.
+
+    Arguments:
+        since(int): Time in nanoseconds since epoch
+
+    Returns:
+        dict, list: Query filter and sort
+    """
+    return {"timestamp": {"$gte": since}}, [('timestamp', pymongo.ASCENDING),
+                                            ('_id', pymongo.ASCENDING)]
+
+
+def supports_transactions(hello):
+    """Check if deployment supports multi-document transactions
+
+    Arguments:
+        hello(dict): Output of hello command
+
+    Returns:
+        bool: Deployment is a replica set or sharded cluster
+    """
+    return 'setName' in hello or hello.get('msg') == 'isdbgrid'
+
+
+def book_filter(stock_name, version):
+    """Filter matching book document of stock only at version order book was loaded at
+
+    Every write of orders of a stock increments the version of its book document, so
+    the filter stops matching as soon as another client has changed the book, e.g.
+    rested an order the in-memory book has not seen. Book documents with pending
+    writes never match until the writes are applied.
+
+    Arguments:
+        stock_name(str): Name of stock
+        version(int): Version order book was loaded at, 0 if there was no document
+
+    Returns:
+        dict: Query filter
+    """
+    return {"_id": stock_name, "version": version, "pending": {"$exists": False}}
+
+
+def book_update(pending=None):
+    """Build update incrementing version of book document
+
+    Arguments:
+        pending(dict): Writes stored with the new version, None to store none
+
+    Returns:
+        dict: Update document
+    """
+    update = {"$inc": {"version": 1}}
+    if pending is not None:
+        update["$set"] = {"pending": pending}
+    return update
+
+
+def version_bump(stock_name, version, pending=None):
+    """Build arguments of update incrementing version of book document if it is current
+
+    The book document is created by the first write of a stock, so two clients
+    creating it at once fail on its _id.
+
+    Arguments:
+        stock_name(str): Name of stock
+        version(int): Version order book was loaded at
+        pending(dict): Writes stored with the new version, None to store none
+
+    Returns:
+        dict: Keyword arguments of update_one
+    """
+    return {"filter": book_filter(stock_name, version), "update": book_update(pending),
+            "upsert": version == 0}
+
+
+def check_version_bump(stock_name, result):
+    """Check that update of version_bump found the order book current
+
+    Arguments:
+        stock_name(str): Name of stock
+        result(UpdateResult): Result of update, None if it failed on duplicate key
+
+    Raises:
+        StaleBookError: Order book was changed by another client
+    """
+    if result is not None and not result.acknowledged:
+        # Unacknowledged writes of w=0 report no counts to check the book against
+        return
+    if result is None or not (result.matched_count or result.upserted_id):
+        raise StaleBookError("Order book of {} was changed by another client".format(
+            stock_name))
+
+
+def check_persisted(stock_name, result, writes):
+    """Check that bulk write of order_operations changed every resting order it expects
+
+    Arguments:
+        stock_name(str): Name of stock
+        result(BulkWriteResult): Result of bulk write
+        writes(dict): Writes of order_writes or change_writes
+
+    Raises:
+        StaleBookError: Matched orders were changed by another client
+    """
+    if result.acknowledged and result.matched_count != len(writes["changes"]):
+        raise StaleBookError("Matched orders of {} were changed by another client".format(
+            stock_name))
+
+
+def skip_duplicates(error):
+    """Ignore error of bulk write applied again, re-raising any other error
+
+    Arguments:
+        error(BulkWriteError): Error of bulk write
+
+    Raises:
+        BulkWriteError: Some write failed on something else than an existing document
+    """
+    if not only_duplicates(error.details):
+        raise error
+
+
+def book_orders(stock_name):
+    """Build query of active orders of stock in the order they rest in order book
+
+    Arguments:
+        stock_name(str): Name of stock
+
+    Returns:
+        dict: Keyword arguments of find
+    """
+    return {"filter": active_orders_filter(stock_name), "sort": [('_id', pymongo.ASCENDING)]}
+
+
+def last_trade(stock_name):
+    """Build query of the last transaction of stock
+
+    Arguments:
+        stock_name(str): Name of stock
+
+    Returns:
+        dict: Keyword arguments of find_one
+    """
+    return {"filter": {"stock_name": stock_name}, "sort": [('_id', pymongo.DESCENDING)]}
+
+
+def last_trade_price(trade):
+    """Price of last transaction found by last_trade
+
+    Arguments:
+        trade(dict): History entry, None if stock has not traded
+
+    Returns:
+        int: Price in ticks, None without transaction
+    """
+    return None if trade is None else trade["price"]
+
+
+def book_version(book):
+    """Version of order book stored in book document
+
+    Arguments:
+        book(dict): Book document, None if stock has none yet
+
+    Returns:
+        int: Version, 0 without book document
+    """
+    return 0 if book is None else book["version"]
+
+
+def applied_pending(stock_name, version):
+    """Build filter and update dropping pending writes applied to orders and history
+
+    Arguments:
+        stock_name(str): Name of stock
+        version(int): Version of book document the writes were stored with
+
+    Returns:
+        dict, dict: Query filter and update
+    """
+    return {"_id": stock_name, "version": version}, {"$unset": {"pending": ""}}
+
+
+def order_writes(order, fills, trades):
+    """Writes of an order placed in order book
+
+    Writes are plain documents, so they can be stored as pending writes of a book
+    document. Order is inserted in its final state, trades get their ids upfront so
+    that writes can be applied more than once.
+
+    Arguments:
+        order(Order): Order after matching
+        fills(list): Trades produced by order book
+        trades(list): History entries of trades
+
+    Returns:
+        dict: Orders to insert, changes of resting orders and history entries
+    """
+    return {
+        "orders": [order.to_dict()],
+        "changes": [fill_change(fill) for fill in fills],
+        "history": [dict(trade, _id=ObjectId()) for trade in trades],
+    }
+
+
+def change_writes(order, amount):
+    """Writes of a resting order cancelled or amended
+
+    Arguments:
+        order(Order): Resting order
+        amount(int): New total amount, 0 to cancel order
+
+    Returns:
+        dict: Orders to insert, changes of resting orders and history entries
+    """
+    fields = {"total_qty": amount} if amount else {"status": "CANCELLED"}
+    return {"orders": [], "changes": [resting_change(order, fields)], "history": []}
+
+
+def order_operations(writes):
+    """Build bulk write of orders collection applying writes
+
+    Inserted orders come first. Every change of resting order only matches if the
+    order is still in the state order book expects, so callers can detect orders
+    changed by another client through the matched count, and changes already applied
+    are not applied again.
+
+    Arguments:
+        writes(dict): Writes of order_writes or change_writes
+
+    Returns:
+        list: Write operations
+    """
+    operations = [pymongo.InsertOne(order) for order in writes["orders"]]
+    operations.extend(change_operation(change) for change in writes["changes"])
+    return operations
+
+
+def only_duplicates(details):
+    """Check if bulk write of writes applied before only failed on existing documents
+
+    Arguments:
+        details(dict): Details of BulkWriteError
+
+    Returns:
+        bool: Every write error is a duplicate key error
+    """
+    if details.get("writeConcernErrors"):
+        return False
+    return all(error["code"] == DUPLICATE_KEY for error in details["writeErrors"])
+
+
+def resting_change(order, fields, fill=0):
+    """Change of resting order, applied only in its current state
+
+    Arguments:
+        order(Order): Resting order in the state before the change
+        fields(dict): Fields of order set by change
+        fill(int): Amount traded by change
+
+    Returns:
+        dict: Id and expected state of order, fields set and amount traded
+    """
+    return {
+        "_id": order.order_id,
+        "filled_qty": order.filled_qty,
+        "total_qty": order.total_qty,
+        "set": fields,
+        "fill": fill,
+    }
+
+
+def fill_change(fill):
+    """Change of maker order by a single trade
+
+    Maker is only updated in the state before the trade, so trading an order that
+    another client has cancelled or amended in the meantime leaves the book stale.
+
+    Arguments:
+        fill(Fill): Trade produced by order book
+
+    Returns:
+        dict: Change of maker order
+    """
+    maker = fill.maker
+    fields = {"status": maker.status}
+    if maker.price_type == "MKT":
+        fields["price"] = fill.price
+    change = resting_change(maker, fields, fill.amount)
+    change["filled_qty"] -= fill.amount
+    return change
+
+
+def change_operation(change):
+    """Build update of resting order applying change
+
+    Arguments:
+        change(dict): Change of resting_change or fill_change
+
+    Returns:
+        UpdateOne: Update of resting order
+    """
+    update = {"$set": change["set"]}
+    if change["fill"]:
+        update["$inc"] = {"filled_qty": change["fill"]}
+    return pymongo.UpdateOne(
+        {
+            "_id": change["_id"],
+            "filled_qty": change["filled_qty"],
+            "total_qty": change["total_qty"],
+            "status": ACTIVE_STATUS,
+        },
+        update
+    )
+
+
+def fill_operation(fill):
+    """Build update of maker order state after a single trade
+
+    Arguments:
+        fill(Fill): Trade produced by order book
+
+    Returns:
+        UpdateOne: Update of maker order
+    """
+    return change_operation(fill_change(fill))
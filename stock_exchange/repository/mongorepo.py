@@ -1,27 +1,97 @@
 import pymongo
-
-
-class MongoRepo:
-    """Repository class for performing operations with MongoDB"""
-    def __init__(self):
-        # MongoDB client to perform database operations in python
-        client = pymongo.MongoClient()
+from bson import ObjectId
+
+from stock_exchange.domain.bars import CLOCK
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.book_repo import BookRepo
+from stock_exchange.repository.indexes import ensure_indexes, is_covered
+from stock_exchange.repository.migrations import migrate_amount_strings, migrate_float_prices
+from stock_exchange.repository.mongo_client import MONGO_SETTINGS, shared_client
+from stock_exchange.repository import mongo_operations as ops
+from stock_exchange.repository.mongo_operations import StaleBookError
+
+
+# Order fields shown by VIEW ORDERS command
+VIEW_PROJECTION = {
+    "_id": False,
+    "stock_name": True,
+    "price_type": True,
+    "order_type": True,
+    "price": True,
+    "filled_qty": True,
+    "total_qty": True,
+    "status": True
+}
+
+
+class MongoRepo(BookRepo):
+    """Repository class for performing operations with MongoDB
+
+    Arguments:
+        shard(int): Index of worker process of this repository, which only loads order
+            books of stocks it owns
+        shards(int): Number of worker processes
+    """
+    # Number of times order is matched against reloaded book before giving up
+    PLACE_ATTEMPTS = 3
+
+    def __init__(self, shard=0, shards=1):
+        super().__init__()
+        self.partition_ids(shard, shards)
+        # MongoDB client of the process to perform database operations in python
+        self.client = shared_client()
+        # Multi-document transactions need replica set or sharded cluster
+        self.transactions = ops.supports_transactions(self.client.admin.command('hello'))
         # MongoDB database
-        self.db = client['orders_database']
+        self.db = self.client[MONGO_SETTINGS.database]
         # Collection of orders
         self.collection = self.db.orders
+        # Collection of orders read by VIEW ORDERS with configured read preference
+        self.view_collection = self.collection.with_options(
+            read_preference=MONGO_SETTINGS.view_read_preference())
         # History of transactions
         self.history = self.db.history
+        # Book documents with version of order book of every stock
+        self.book_versions = self.db.book_versions
+        # Stock name -> version of book document its order book was loaded at
+        self.versions = {}
+        migrate_amount_strings(self.collection)
+        migrate_float_prices(self.collection, self.history, TICK_SIZES)
+        ensure_indexes(self.collection, self.history)
+        self.__load_books()
+        self.__load_bars()
+
+    def clear(self):
+        """Drop orders and history collections together with order books"""
+        self.db.drop_collection("orders")
+        self.db.drop_collection("history")
+        self.db.drop_collection("book_versions")
+        self.versions = {}
+        self._clear_books()
+
+    def view(self, stock_name=None, order_type=None, status=None, page=1, limit=None):
+        """View orders during client session, streamed from database in batches
 
-    def view(self):
-        """View all orders during client session
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+            page(int): Number of page starting from 1
+            limit(int): Number of orders per page, None for all orders
 
         Returns:
-            result_string(str): All orders
+            generator: Batches of resulting rows
         """
-        orders = self.collection.find()
-        result_string = self.__get_result(orders)
-        return result_string
+        skip, limit = self._page_bounds(page, limit)
+        orders = self.view_collection.find(
+            self._view_filter(stock_name, order_type, status),
+            projection=VIEW_PROJECTION,
+            skip=skip,
+            limit=limit or 0,
+            batch_size=self.VIEW_BATCH
+        )
+        return self._stream_rows(map(Order.from_dict, orders), skip)
 
     def quote(self, stock_name):
         """Get bid price, ask price and price of last transaction for particular stock
@@ -32,8 +102,66 @@ class MongoRepo:
         Returns:
             str: Bid price, ask price and price of last transaction for particular stock
         """
-        bid_price, ask_price, last_price = self.__get_quote_prices(stock_name)
-        return "{} BID: {} ASK: {} LAST: {}".format(stock_name, bid_price, ask_price, last_price)
+        return self._get_quote(stock_name)
+
+    def quote_many(self, stock_names):
+        """Get quotes of several stocks at once
+
+        Arguments:
+            stock_names(list): Names of stocks
+
+        Returns:
+            list: Batches of resulting rows, one quote per stock
+        """
+        return self._quote_rows(stock_names)
+
+    def depth(self, stock_name, levels):
+        """Get aggregate amounts of best price levels of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            levels(int): Maximal number of price levels per side
+
+        Returns:
+            list: Batches of resulting rows
+        """
+        return self._depth_rows(stock_name, levels)
+
+    def bars(self, stock_name, interval):
+        """Get OHLCV bars of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of bar interval, e.g. 1m
+
+        Returns:
+            list: Batches of resulting rows from oldest bar
+        """
+        return self._bar_rows(stock_name, interval)
+
+    def index_report(self, stock_name):
+        """Check which repository queries are served by indexes
+
+        Arguments:
+            stock_name(str): Name of stock to explain queries for
+
+        Returns:
+            dict: Query name -> True iff query is served by an index without collection scan
+        """
+        queries = {
+            "active_orders": self.collection.find(
+                ops.active_orders_filter()
+            ),
+            "book_orders": self.collection.find(
+                ops.active_orders_filter(stock_name),
+                sort=[('_id', pymongo.ASCENDING)]
+            ),
+            "last_transaction": self.history.find(
+                {"stock_name": stock_name},
+                sort=[('_id', pymongo.DESCENDING)]
+            ).limit(1),
+        }
+        return {name: is_covered(cursor.explain()) for name, cursor in queries.items()}
 
     def place_mkt_buy(self, command):
         """Place buy at market price order
@@ -43,13 +171,9 @@ class MongoRepo:
         Returns:
             str: Resulting user output
         """
-        order = self.__create_buy_mkt_order(command)
-        self.__update_db_mkt_buy(order)
-        return "You have placed a MKT {} order for {} {} shares".format(
-            order['order_type'],
-            order['amount'],
-            order['stock_name']
-        )
+        order = self._create_order(command, "BUY", "MKT")
+        self.__place(order)
+        return self._placed_message(order)
 
     def place_mkt_sell(self, command):
         """Place sell at market price order
@@ -59,13 +183,9 @@ class MongoRepo:
         Returns:
             str: Resulting user output
         """
-        order = self.__create_sell_mkt_order(command)
-        self.__update_db_mkt_sell(order)
-        return "You have placed a MKT {} order for {} {} shares".format(
-            order['order_type'],
-            order['amount'],
-            order['stock_name']
-        )
+        order = self._create_order(command, "SELL", "MKT")
+        self.__place(order)
+        return self._placed_message(order)
 
     def place_lmt_buy(self, command):
         """Place buy at user defined price order
@@ -75,14 +195,9 @@ class MongoRepo:
         Returns:
             str: Resulting user output
         """
-        order = self.__create_buy_lmt_order(command)
-        self.__update_db_lmt_buy(order)
-        return "You have placed a LMT {} order for {} {} shares at {} each".format(
-            order['order_type'],
-            order['amount'],
-            order['stock_name'],
-            order['price']
-        )
+        order = self._create_order(command, "BUY", "LMT")
+        self.__place(order)
+        return self._placed_message(order)
 
     def place_lmt_sell(self, command):
         """Place sell at user defined price order
@@ -92,667 +207,235 @@ class MongoRepo:
         Returns:
             str: Resulting user output
         """
-        order = self.__create_sell_lmt_order(command)
-        self.__update_db_lmt_sell(order)
-        return "You have placed a LMT {} order for {} {} shares at {} each".format(
-            order['order_type'],
-            order['amount'],
-            order['stock_name'],
-            order['price']
-        )
+        order = self._create_order(command, "SELL", "LMT")
+        self.__place(order)
+        return self._placed_message(order)
 
-    def __get_result(self, orders):
-        """Resulting string for VIEW ORDERS command
+    def cancel(self, order_id):
+        """Cancel remaining amount of resting order
 
         Arguments:
-            orders(dict): Orders that belong to order DB collection
+            order_id(str): Id of order as returned on placement
 
         Returns:
-            str: Resulting string with all orders
+            str: Resulting user output
         """
-        i = 1
-        result_string = ""
-        for order in orders:
-            result_string += "{}. {} {} {} {} {} {}\n".format(i,
-                                                              order["stock_name"],
-                                                              order["price_type"],
-                                                              order["order_type"],
-                                                              order["price"],
-                                                              order["amount"],
-                                                              order["status"])
-            i += 1
-        return result_string
-
-    def __create_buy_mkt_order(self, command):
-        """Create BUY MKT dictionary from command
+        return self.__change(order_id, 0)
+
+    def amend(self, order_id, amount):
+        """Reduce total amount of resting order keeping its time priority
 
         Arguments:
-            command(dict): Dictionary with command info
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount of order
+
         Returns:
-            order(dict): Enriched dictionary with command info
+            str: Resulting user output
         """
-        order = command['command']
-        order['order_type'] = 'BUY'
-        order['price_type'] = 'MKT'
-        order['price'] = -1
-        order['status'] = 'PENDING'
-        order['amount'] = "0/{}".format(order['amount'])
-        return order
+        return self.__change(order_id, amount)
 
-    def __create_sell_mkt_order(self, command):
-        """Create SELL MKT dictionary from command
+    def _parse_order_id(self, order_id):
+        return ObjectId(order_id) if ObjectId.is_valid(order_id) else None
 
-        Arguments:
-            command(dict): Dictionary with command info
-        Returns:
-            order(dict): Enriched dictionary with command info
-        """
-        order = command['command']
-        order['order_type'] = 'SELL'
-        order['price_type'] = 'MKT'
-        order['price'] = -1
-        order['status'] = 'PENDING'
-        order['amount'] = "0/{}".format(order['amount'])
-        return order
+    def __change(self, order_id, amount):
+        """Cancel or amend resting order in database and in its order book
 
-    def __create_buy_lmt_order(self, command):
-        """Create BUY LMT dictionary from command
+        The order is looked up in the order books and changed in the database only if
+        the book is up to date, its book is reloaded and the lookup retried if another
+        client has changed the book in the meantime.
 
         Arguments:
-            command(dict): Dictionary with command info
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount, 0 to cancel order
+
         Returns:
-            order(dict): Enriched dictionary with command info
+            str: Resulting user output
         """
-        order = command['command']
-        order['order_type'] = 'BUY'
-        order['price_type'] = 'LMT'
-        order['price'] = float(order['price'].split('$')[-1])
-        order['status'] = 'PENDING'
-        order['amount'] = "0/{}".format(order['amount'])
-        return order
-
-    def __create_sell_lmt_order(self, command):
-        """Create SELL LMT dictionary from command
+        for _ in range(self.PLACE_ATTEMPTS):
+            order = self._find_resting(order_id)
+            refusal = self._change_refusal(order_id, order, amount)
+            if refusal is not None:
+                return refusal
+            try:
+                self.__write(order.stock_name, ops.change_writes(order, amount))
+            except StaleBookError:
+                self.__load_book(order.stock_name)
+                continue
+            self._change_resting(order, amount)
+            return self._changed_message(order)
+        raise StaleBookError("Order {} keeps changing".format(order_id))
+
+    def __load_books(self):
+        """Rebuild in-memory order books of owned stocks with active orders in database"""
+        for stock_name in self.collection.distinct("stock_name", ops.active_orders_filter()):
+            if ops.owns(stock_name, self.shard, self.shards):
+                self.__load_book(stock_name)
+
+    def __load_bars(self):
+        """Aggregate transactions of the last BARS_WINDOW into bars"""
+        query, sort = ops.recent_trades(CLOCK() - self.BARS_WINDOW)
+        self._aggregate_trades(self.history.find(query, sort=sort))
+
+    def __load_book(self, stock_name):
+        """Rebuild in-memory order book of particular stock from database
+
+        Pending writes of the book document are applied first. The version is read
+        before the orders, so orders written in between only make the next write of
+        the book stale.
 
         Arguments:
-            command(dict): Dictionary with command info
-        Returns:
-            order(dict): Enriched dictionary with command info
+            stock_name(str): Name of stock
         """
-        order = command['command']
-        order['order_type'] = 'SELL'
-        order['price_type'] = 'LMT'
-        order['price'] = float(order['price'].split('$')[-1])
-        order['status'] = 'PENDING'
-        order['amount'] = "0/{}".format(order['amount'])
-        return order
-
-    def __has_active_sell_orders(self, order):
-        return self.collection.count_documents({'stock_name': order['stock_name'],
-                                                'order_type': "SELL",
-                                                'status': {'$in': ["PENDING", "PARTIAL"]}}) > 0
-
-    def __get_curr_order(self):
-        curr_order = self.collection.find_one({}, sort=[('_id', pymongo.DESCENDING)])
-        curr_order_id = curr_order['_id']
-        curr_amount_buy = int(curr_order['amount'].split('/')[0])
-        return curr_order, curr_order_id, curr_amount_buy
-
-    def __update_db_mkt_buy(self, order):
-        """Perform database operations corresponding to BUY MKT command
+        book = self.book_versions.find_one({"_id": stock_name})
+        if book is not None and "pending" in book:
+            self.__apply_pending(stock_name, book["version"], book["pending"])
+        active_orders = self.collection.find(**ops.book_orders(stock_name))
+        last = self.history.find_one(**ops.last_trade(stock_name))
+        self._rebuild_book(stock_name, map(Order.from_dict, active_orders),
+                           ops.last_trade_price(last))
+        self.versions[stock_name] = ops.book_version(book)
+
+    def __place(self, order):
+        """Match order in order book and persist it with resulting trades
+
+        Matching is retried against a freshly loaded book if another client has
+        changed the book in the meantime. The book is reloaded after any other failed
+        write as well, so it never keeps trades that were not stored.
 
         Arguments:
-            order(dict): Dictionary with order info
+            order(Order): Accepted order
         """
-        self.collection.insert_one(order)
-        curr_order, curr_order_id, curr_amount_buy = self.__get_curr_order()
-        if self.__has_active_sell_orders(order):
-            amount_buy = int(order['amount'].split('/')[-1])
-            possible_transaction = self.collection.find_one({
-                "stock_name": order["stock_name"],
-                "order_type": "SELL",
-                "status": {'$in': ["PENDING", "PARTIAL"]},
-                "price": {'$gt': 0}
-            })
-            while possible_transaction is not None and amount_buy > 0:
-                total_sell_amount = int(possible_transaction['amount'].split('/')[-1])
-                curr_sell_amount = int(possible_transaction['amount'].split('/')[0])
-                residual = total_sell_amount - curr_sell_amount
-                amount_bought = min(amount_buy, residual)
-                curr_amount_buy += amount_bought
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "PARTIAL",
-                            "amount": "{}/{}".format(curr_amount_buy, amount_buy),
-                            "price": float(possible_transaction["price"])
-                        }
-                    }
-                )
-                if amount_bought == residual:
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "FILLED",
-                                "amount": "{}/{}".format(total_sell_amount, total_sell_amount)
-                            }
-                        }
-                    )
-                else:
-                    after_transaction_amount = curr_sell_amount + amount_bought
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "PARTIAL",
-                                "amount": "{}/{}".format(after_transaction_amount,
-                                                         total_sell_amount)
-                            }
-                        }
-                    )
-                self.history.insert_one({
-                    "stock_name": order["stock_name"],
-                    "price": float(possible_transaction['price'])
-                })
-                self.collection.update_many(
-                    {
-                        "stock_name": order['stock_name'],
-                        "order_type": "SELL",
-                        "price": -1
-                    },
-                    {
-                        "$set": {
-                            "price": float(possible_transaction['price'])
-                        }
-                    }
-                )
-                amount_buy -= amount_bought
-                last_price = possible_transaction["price"]
-                possible_transaction = self.collection.find_one(
-                    {
-                        "stock_name": order["stock_name"],
-                        "order_type": "SELL",
-                        "status": {
-                            '$in': ["PENDING", "PARTIAL"]
-                        },
-                        "price": {
-                            '$gt': 0
-                        }
-                    }
-                )
-            if amount_buy == 0:
-                total_amount_buy = curr_order['amount'].split('/')[-1]
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "FILLED",
-                            "amount": "{}/{}".format(total_amount_buy,
-                                                     total_amount_buy),
-                            "price": float(last_price)
-                        }
-                    }
-                )
-
-    def __has_active_buy_orders(self, order):
-        return self.collection.count_documents({'stock_name': order['stock_name'],
-                                                'order_type': "BUY",
-                                                'status': {'$in': ["PENDING", "PARTIAL"]}}) > 0
-
-    def __update_db_mkt_sell(self, order):
-        """Perform database operations corresponding to SELL MKT command
+        order.order_id = ObjectId()
+        price = order.price
+        if order.stock_name not in self.versions:
+            self.__load_book(order.stock_name)
+        for _ in range(self.PLACE_ATTEMPTS):
+            fills = self._match_order(order)
+            try:
+                self.__write(order.stock_name, ops.order_writes(
+                    order, fills, self._trade_documents(order, fills)))
+            except StaleBookError:
+                self.__load_book(order.stock_name)
+                self._unmatch_order(order, price)
+                continue
+            except Exception:
+                self.__reload_book(order.stock_name)
+                raise
+            self._publish_fills(order, fills)
+            return
+        raise StaleBookError("Order book of {} keeps changing".format(order.stock_name))
+
+    def __reload_book(self, stock_name):
+        """Replace order book changed by a failed write with the stored one
+
+        The book is dropped first, so it is loaded again on next use if database
+        cannot be read either.
 
         Arguments:
-            order(dict): Dictionary with order info
+            stock_name(str): Name of stock
         """
-        self.collection.insert_one(order)
-        curr_order, curr_order_id, curr_amount_sell = self.__get_curr_order()
-        if self.__has_active_buy_orders(order):
-            amount_sell = int(order['amount'].split('/')[-1])
-            possible_transaction = self.collection.find_one(
-                {
-                    "stock_name": order["stock_name"],
-                    "order_type": "BUY",
-                    "status": {
-                        '$in': ["PENDING", "PARTIAL"]
-                    },
-                    "price": {
-                        '$gt': 0
-                    }
-                }
-            )
-            while possible_transaction is not None and amount_sell > 0:
-                total_buy_amount = int(possible_transaction['amount'].split('/')[-1])
-                curr_buy_amount = int(possible_transaction['amount'].split('/')[0])
-                residual = total_buy_amount - curr_buy_amount
-                amount_bought = min(amount_sell, residual)
-                curr_amount_sell += amount_bought
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "PARTIAL",
-                            "amount": "{}/{}".format(curr_amount_sell, amount_sell),
-                            "price": float(possible_transaction["price"])
-                        }
-                    }
-                )
-                if amount_bought == residual:
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "FILLED",
-                                "amount": "{}/{}".format(total_buy_amount, total_buy_amount)
-                            }
-                        }
-                    )
-                else:
-                    total_sell_amount = curr_buy_amount + amount_bought
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "PARTIAL",
-                                "amount": "{}/{}".format(total_sell_amount, total_buy_amount)}})
-                self.history.insert_one({
-                    "stock_name": order["stock_name"],
-                    "price": float(possible_transaction['price'])
-                })
-                self.collection.update_many(
-                    {
-                        "stock_name": order['stock_name'],
-                        "order_type": "BUY",
-                        "price": -1
-                    },
-                    {
-                        "$set": {
-                            "price": float(possible_transaction['price'])
-                        }
-                    }
-                )
-                amount_sell -= amount_bought
-                last_price = possible_transaction["price"]
-                possible_transaction = self.collection.find_one(
-                    {
-                        "stock_name": order["stock_name"],
-                        "order_type": "BUY",
-                        "status": {
-                            '$in': ["PENDING", "PARTIAL"]
-                        },
-                        "price": {
-                            '$gt': 0
-                        }
-                    }
-                )
-            if amount_sell == 0:
-                total_amount = curr_order['amount'].split('/')[-1]
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "FILLED",
-                            "amount": "{}/{}".format(total_amount, total_amount),
-                            "price": float(last_price)
-                        }
-                    }
-                )
-
-    def __update_db_lmt_buy(self, order):
-        """Perform database operations corresponding to BUY LMT command
+        self._drop_book(stock_name)
+        self.versions.pop(stock_name, None)
+        self.__load_book(stock_name)
+
+    def __write(self, stock_name, writes):
+        """Store writes of an order book change at once
+
+        With transactions, the writes commit in one transaction together with a new
+        version of the book document of the stock. Without them, the writes are
+        stored as pending writes of the book document first, which commits them in
+        one document write, and then applied. Writes left pending by a failed client
+        are applied by the next client loading the book.
+
+        Either way nothing is written if another client has changed the book since
+        it was loaded.
 
         Arguments:
-            order(dict): Dictionary with order info
+            stock_name(str): Name of stock
+            writes(dict): Writes of ops.order_writes or ops.change_writes
+
+        Raises:
+            StaleBookError: Order book was changed by another client
         """
-        self.collection.insert_one(order)
-        curr_order, curr_order_id, curr_amount_buy = self.__get_curr_order()
-        if self.__has_active_sell_orders(order):
-            amount_buy = int(order['amount'].split('/')[-1])
-            possible_transaction = self.collection.find_one(
-                {
-                    "stock_name": order["stock_name"],
-                    "order_type": "SELL",
-                    "status": {
-                        '$in': ["PENDING", "PARTIAL"]
-                    },
-                    "$or": [
-                        {
-                            "price": {
-                                '$lte': float(order["price"])
-                            }
-                        },
-                        {
-                            "price": {
-                                '$eq': -1
-                            }
-                        }
-                    ]
-                }
-            )
-            while possible_transaction is not None and amount_buy > 0:
-                total_sell_amount = int(possible_transaction['amount'].split('/')[-1])
-                curr_sell_amount = int(possible_transaction['amount'].split('/')[0])
-                residual = total_sell_amount - curr_sell_amount
-                amount_bought = min(amount_buy, residual)
-                curr_amount_buy += amount_bought
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "PARTIAL",
-                            "amount": "{}/{}".format(curr_amount_buy,
-                                                     amount_buy),
-                            "price": order["price"]
-                        }
-                    }
-                )
-                if amount_bought == residual:
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "FILLED",
-                                "amount": "{}/{}".format(total_sell_amount,
-                                                         total_sell_amount)
-                            }
-                        }
-                    )
-                else:
-                    if possible_transaction["price_type"] == "LMT":
-                        sell_amount = curr_sell_amount + amount_bought
-                        self.collection.update_one(
-                            {
-                                "_id": possible_transaction['_id']
-                            },
-                            {
-                                "$set": {
-                                    "status": "PARTIAL",
-                                    "amount": "{}/{}".format(sell_amount,
-                                                             total_sell_amount)
-                                }
-                            }
-                        )
-                    else:
-                        self.collection.update_one(
-                            {
-                                "_id": possible_transaction['_id']
-                            },
-                            {
-                                "$set": {
-                                    "status": "PARTIAL",
-                                    "amount": "{}/{}".format(sell_amount, total_sell_amount),
-                                    "price": float(order["price"])
-                                }
-                            }
-                        )
-                self.history.insert_one({
-                    "stock_name": order["stock_name"],
-                    "price": float(order["price"])
-                })
-                self.collection.update_many(
-                    {
-                        "stock_name": order['stock_name'],
-                        "order_type": "SELL",
-                        "price": -1
-                    },
-                    {
-                        "$set": {
-                            "price": float(possible_transaction['price'])
-                        }
-                    }
-                )
-                amount_buy -= amount_bought
-                possible_transaction = self.collection.find_one(
-                    {
-                        "stock_name": order["stock_name"],
-                        "order_type": "SELL",
-                        "status": {
-                            '$in': ["PENDING", "PARTIAL"]
-                        },
-                        "$or": [
-                            {
-                                "price": {
-                                    '$lte': float(order["price"])
-                                }
-                            },
-                            {
-                                "price": {
-                                    '$eq': -1
-                                }
-                            }
-                        ]
-                    }
-                )
-            if amount_buy == 0:
-                total_amount_buy = curr_order['amount'].split('/')[-1]
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "FILLED",
-                            "amount": "{}/{}".format(total_amount_buy,
-                                                     total_amount_buy)
-                        }
-                    }
-                )
-
-    def __update_db_lmt_sell(self, order):
-        """Perform database operations corresponding to SELL LMT command
+        version = self.versions[stock_name]
+        if self.transactions:
+            with self.client.start_session() as session:
+                session.with_transaction(
+                    lambda s: self.__persist(stock_name, version, writes, session=s))
+            self.versions[stock_name] = version + 1
+            return
+        self.__bump_version(stock_name, version, writes, session=None)
+        self.versions[stock_name] = version + 1
+        try:
+            self.__apply_pending(stock_name, version + 1, writes)
+        except pymongo.errors.PyMongoError:
+            # Writes are committed, the next load of the book applies them
+            pass
+
+    def __bump_version(self, stock_name, version, pending, session):
+        """Increment version of book document if order book is up to date
 
         Arguments:
-            order(dict): Dictionary with order info
+            stock_name(str): Name of stock
+            version(int): Version order book was loaded at
+            pending(dict): Writes stored with new version, None to store none
+            session(ClientSession): Session of running transaction, None without one
+
+        Raises:
+            StaleBookError: Order book was changed by another client
         """
-        self.collection.insert_one(order)
-        curr_order, curr_order_id, curr_amount_sell = self.__get_curr_order()
-        if self.__has_active_buy_orders(order):
-            amount_sell = int(order['amount'].split('/')[-1])
-            curr_amount_sell = int(curr_order['amount'].split('/')[0])
-            possible_transaction = self.collection.find_one(
-                {
-                    "stock_name": order["stock_name"],
-                    "order_type": "BUY",
-                    "status": {
-                        '$in': ["PENDING", "PARTIAL"]
-                    },
-                    "$or": [
-                        {
-                            "price": {
-                                '$gte': float(order["price"])
-                            }
-                        },
-                        {
-                            "price": {
-                                '$eq': -1
-                            }
-                        }
-                    ]
-                }
-            )
-            while possible_transaction is not None and amount_sell > 0:
-                total_buy_amount = int(possible_transaction['amount'].split('/')[-1])
-                curr_buy_amount = int(possible_transaction['amount'].split('/')[0])
-                residual = total_buy_amount - curr_buy_amount
-                amount_bought = min(amount_sell, residual)
-                curr_amount_sell += amount_bought
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "PARTIAL",
-                            "amount": "{}/{}".format(curr_amount_sell, amount_sell)
-                        }
-                    }
-                )
-                if amount_bought == residual:
-                    self.collection.update_one(
-                        {
-                            "_id": possible_transaction['_id']
-                        },
-                        {
-                            "$set": {
-                                "status": "FILLED",
-                                "amount": "{}/{}".format(total_buy_amount,
-                                                         total_buy_amount),
-                                "price": float(order['price'])
-                            }
-                        }
-                    )
-                else:
-                    if possible_transaction["price_type"] == "LMT":
-                        total_amount_sell = curr_buy_amount + amount_bought
-                        self.collection.update_one(
-                            {
-                                "_id": possible_transaction['_id']
-                            },
-                            {
-                                "$set": {
-                                    "status": "PARTIAL",
-                                    "amount": "{}/{}".format(total_amount_sell,
-                                                             total_buy_amount)
-                                }
-                            }
-                        )
-                    else:
-                        self.collection.update_one(
-                            {
-                                "_id": possible_transaction['_id']
-                            },
-                            {
-                                "$set": {
-                                    "status": "PARTIAL",
-                                    "amount": "{}/{}".format(total_amount_sell,
-                                                             total_buy_amount),
-                                    "price": float(order["price"])
-                                }
-                            }
-                        )
-                self.history.insert_one({
-                    "stock_name": order["stock_name"],
-                    "price": float(order["price"])
-                })
-                self.collection.update_many(
-                    {
-                        "stock_name": order['stock_name'],
-                        "order_type": "BUY",
-                        "price": -1
-                    },
-                    {
-                        "$set": {
-                            "price": float(possible_transaction['price'])
-                        }
-                    }
-                )
-                amount_sell -= amount_bought
-                possible_transaction = self.collection.find_one(
-                    {
-                        "stock_name": order["stock_name"],
-                        "order_type": "BUY",
-                        "status": {
-                            '$in': ["PENDING", "PARTIAL"]
-                        },
-                        "$or": [
-                            {
-                                "price": {
-                                    '$gte': float(order["price"])
-                                }
-                            },
-                            {
-                                "price": {
-                                    '$eq': -1
-                                }
-                            }
-                        ]
-                    }
-                )
-            if amount_sell == 0:
-                total_sell_amount = curr_order['amount'].split('/')[-1]
-                self.collection.update_one(
-                    {
-                        "_id": curr_order_id
-                    },
-                    {
-                        "$set": {
-                            "status": "FILLED",
-                            "amount": "{}/{}".format(total_sell_amount,
-                                                     total_sell_amount)
-                        }
-                    }
-                )
-
-    def __get_quote_prices(self, stock_name):
-        """Get ask price, bid price and last transaction price for particular stock
+        try:
+            result = self.book_versions.update_one(
+                **ops.version_bump(stock_name, version, pending), session=session)
+        except pymongo.errors.DuplicateKeyError:
+            result = None
+        ops.check_version_bump(stock_name, result)
+
+    def __persist(self, stock_name, version, writes, session):
+        """Store writes of an order book change in running transaction
+
+        All writes are sent as one ordered bulk write on orders and one insert on
+        history, independently of number of trades.
 
         Arguments:
-            stock_name(str): Name of stock to get info
-        Returns:
-            float, float, float: Bid price, ask price and last transaction price for stock
+            stock_name(str): Name of stock
+            version(int): Version order book was loaded at
+            writes(dict): Writes of ops.order_writes or ops.change_writes
+            session(ClientSession): Session of running transaction
         """
-        bid = self.collection.find_one(
-            {
-                "stock_name": stock_name,
-                "order_type": "BUY",
-                "status": {
-                    '$in': ["PENDING", "PARTIAL"]
-                }
-            },
-            sort=[("price", pymongo.ASCENDING)]
-        )
-        ask = self.collection.find_one(
-            {
-                "stock_name": stock_name,
-                "order_type": "SELL",
-                "status": {
-                    '$in': ["PENDING", "PARTIAL"]
-                }
-            },
-            sort=[("price", pymongo.ASCENDING)]
-        )
-        last = self.history.find_one(
-            {
-                "stock_name": stock_name
-            },
-            sort=[('_id', pymongo.DESCENDING)]
-        )
+        self.__bump_version(stock_name, version, None, session)
+        result = self.collection.bulk_write(ops.order_operations(writes),
+                                            ordered=True, session=session)
+        ops.check_persisted(stock_name, result, writes)
+        if writes["history"]:
+            self.history.insert_many(writes["history"], ordered=True, session=session)
 
-        if bid is None or bid["price"] == -1:
-            bid_price = 0
-        else:
-            bid_price = bid["price"]
+    def __apply_pending(self, stock_name, version, writes):
+        """Apply pending writes of book document and drop them from it
 
-        if ask is None or ask["price"] == -1:
-            ask_price = 0
-        else:
-            ask_price = ask["price"]
+        Writes may have been applied in part or completely by another client, so
+        already stored orders and trades are skipped and changes of resting orders
+        only match orders in their state before the change.
 
-        if last is None:
-            last_price = 0
-        else:
-            last_price = last["price"]
+        Arguments:
+            stock_name(str): Name of stock
+            version(int): Version of book document the writes were stored with
+            writes(dict): Pending writes
+        """
+        self.__apply_once(self.collection.bulk_write, ops.order_operations(writes))
+        if writes["history"]:
+            self.__apply_once(self.history.insert_many, writes["history"])
+        self.book_versions.update_one(*ops.applied_pending(stock_name, version))
 
-        return bid_price, ask_price, last_price
+    @staticmethod
+    def __apply_once(write, requests):
+        """Apply bulk write skipping documents that are already stored
+
+        Arguments:
+            write(callable): Bulk write method of collection
+            requests(list): Write operations or documents to insert
+        """
+        try:
+            write(requests, ordered=False)
+        except pymongo.errors.BulkWriteError as error:
+            ops.skip_duplicates(error)
@@ -0,0 +1,60 @@
+class QuoteCache:
+    """Top of book cache with bid price, ask price and last transaction price per stock
+
+    Entries are written through by the matching path every time an order changes the
+    book, so QUOTE is answered without touching the database.
+    """
+    def __init__(self):
+        # Stock name -> (bid price, ask price, last transaction price)
+        self._quotes = {}
+        # Number of quotes served from cache
+        self.hits = 0
+        # Number of quotes that had to be computed
+        self.misses = 0
+
+    def get(self, stock_name):
+        """Get cached quote of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+
+        Returns:
+            tuple: Bid price, ask price and last transaction price, None if not cached
+        """
+        quote = self._quotes.get(stock_name)
+        if quote is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return quote
+
+    def update(self, stock_name, bid_price, ask_price, last_price):
+        """Store quote of particular stock, missing prices are stored as 0
+
+        Arguments:
+            stock_name(str): Name of stock
+            bid_price(int): Best bid price in ticks or None
+            ask_price(int): Best ask price in ticks or None
+            last_price(int): Last transaction price in ticks or None
+
+        Returns:
+            tuple: Stored bid price, ask price and last transaction price
+        """
+        quote = self._quotes[stock_name] = (bid_price or 0, ask_price or 0, last_price or 0)
+        return quote
+
+    def invalidate(self, stock_name):
+        """Drop cached quote of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+        """
+        self._quotes.pop(stock_name, None)
+
+    def stats(self):
+        """Cache hit and miss counters
+
+        Returns:
+            dict: Number of hits and misses
+        """
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,435 @@
+import array
+import collections
+import concurrent.futures
+import functools
+import heapq
+import itertools
+import multiprocessing
+import operator
+import threading
+import types
+import zlib
+
+from stock_exchange import instrumentation
+from stock_exchange.domain.ladder_book import LADDER_STOCKS
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.book_repo import BookRepo
+from stock_exchange.repository.mongo_client import MONGO_SETTINGS
+from stock_exchange.shared.stats import STATS
+
+
+def shard_of(stock_name, shards):
+    """Index of worker process owning order book of particular stock
+
+    Arguments:
+        stock_name(str): Name of stock
+        shards(int): Number of worker processes
+
+    Returns:
+        int: Index of worker process
+    """
+    return zlib.crc32(stock_name.encode()) % shards
+
+
+class WorkerSettings:
+    """Settings of the process configured on command line that its workers match with
+
+    Worker processes started by spawn or forkserver import modules afresh instead of
+    inheriting them, so settings are taken from the router process and applied to the
+    same module objects in every worker.
+    """
+    def __init__(self):
+        self.tick_sizes = TICK_SIZES
+        self.ladder_stocks = LADDER_STOCKS
+        self.mongo_settings = MONGO_SETTINGS
+        self.instrumented = STATS.enabled
+
+    def apply(self):
+        """Configure worker process with settings of its router process"""
+        vars(TICK_SIZES).update(vars(self.tick_sizes))
+        LADDER_STOCKS.update(self.ladder_stocks)
+        vars(MONGO_SETTINGS).update(vars(self.mongo_settings))
+        if self.instrumented:
+            instrumentation.enable()
+
+
+def serve_shard(repo_factory, requests, replies, shard=0, shards=1, settings=None):
+    """Perform repository calls received from router until it sends None
+
+    Generators, e.g. VIEW ORDERS rows, are read to the end before sending them back.
+
+    Arguments:
+        repo_factory(callable): Creates repository of worker process given its shard
+            and shards keywords
+        requests(Connection): Receiving end of (method name, args) calls
+        replies(Connection): Sending end of (succeeded, result or exception) replies
+        shard(int): Index of worker process
+        shards(int): Number of worker processes
+        settings(WorkerSettings): Settings of router process, None to keep settings
+    """
+    if settings is not None:
+        settings.apply()
+    repo = repo_factory(shard=shard, shards=shards)
+    while True:
+        call = requests.recv()
+        if call is None:
+            break
+        method, args = call
+        try:
+            result = getattr(repo, method)(*args)
+            if isinstance(result, types.GeneratorType):
+                result = list(result)
+        except Exception as exc:
+            replies.send((False, exc))
+        else:
+            replies.send((True, result))
+    replies.close()
+
+
+class ShardedRepo(BookRepo):
+    """Repository routing every stock to one of worker processes owning its order book
+
+    Every worker process runs its own repository created by repo_factory. Commands
+    are forwarded over pipes and performed in submission order per worker, so orders
+    of one stock keep their matching order while stocks of different workers are
+    matched in parallel. Calls can be pipelined through submit. Workers are started
+    with tick sizes, ladder stocks, MongoDB settings and instrumentation of this
+    process whatever the start method of multiprocessing is.
+
+    Arguments:
+        repo_factory(callable): Picklable factory of worker repository taking shard and
+            shards keywords, e.g. InMemoryRepo
+        shards(int): Number of worker processes
+        start_method(str): Start method of worker processes, e.g. spawn, None for the
+            default of the platform
+    """
+    def __init__(self, repo_factory, shards, start_method=None):
+        super().__init__()
+        self.shards = shards
+        self.__context = multiprocessing.get_context(start_method)
+        # Workers share storage, e.g. database, and any of them can view all orders
+        self.__shared_storage = getattr(repo_factory, "SHARED_STORAGE", True)
+        # Index of worker of every placed order, used to merge VIEW ORDERS of workers
+        self.__placements = array.array('H')
+        self.__lock = threading.Lock()
+        self.__workers = []
+        settings = WorkerSettings()
+        for shard in range(shards):
+            self.__workers.append(self.__start_worker(repo_factory, shard, settings))
+
+    def submit(self, method, *args):
+        """Forward repository call to worker owning the stock it trades
+
+        Arguments:
+            method(str): Name of repository method trading or reading single stock,
+                e.g. place_lmt_buy, quote or bars
+            args(list): Positional arguments of method
+
+        Returns:
+            concurrent.futures.Future: Future resolved with result of call
+        """
+        if method in ("quote", "bars", "depth"):
+            stock_name = args[0]
+        else:
+            stock_name = args[0]['command']['stock_name']
+        shard = shard_of(stock_name, self.shards)
+        with self.__lock:
+            future = self.__send(shard, method, args)
+            if method.startswith("place_") and not self.__shared_storage:
+                future.add_done_callback(
+                    functools.partial(self.__record_placement, self.__placements, shard))
+            return future
+
+    def clear(self):
+        """Drop all orders, history and order books of every worker"""
+        with self.__lock:
+            futures = [self.__send(shard, "clear", ()) for shard in range(self.shards)]
+            self.__placements = array.array('H')
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Stop worker processes after they perform all submitted calls"""
+        for requests, _, process, _ in self.__workers:
+            requests.send(None)
+            process.join()
+        self.__workers = []
+
+    def view(self, stock_name=None, order_type=None, status=None, page=1, limit=None):
+        """View orders during client session in batches
+
+        Orders of single stock are viewed by its worker. Otherwise all workers are
+        asked for their orders which are merged in the order they were placed.
+
+        Arguments:
+            stock_name(str): Name of stock, None for all stocks
+            order_type(str): BUY or SELL, None for both
+            status(str): PENDING, PARTIAL or FILLED, None for all
+            page(int): Number of page starting from 1
+            limit(int): Number of orders per page, None for all orders
+
+        Returns:
+            list: Batches of resulting rows
+        """
+        filters = (stock_name, order_type, status, page, limit)
+        if stock_name is not None:
+            with self.__lock:
+                future = self.__send(shard_of(stock_name, self.shards), "view", filters)
+            return future.result()
+        if self.__shared_storage:
+            # Orders placed by other workers must be stored before they are viewed
+            with self.__lock:
+                pending = [future for _, queue, _, _ in self.__workers for future in tuple(queue)]
+                future = self.__send(0, "view", filters)
+            concurrent.futures.wait(pending)
+            return future.result()
+
+        # Page may consist of the oldest orders of any worker, none needs to send more
+        skip, limit = self._page_bounds(page, limit)
+        stop = None if limit is None else skip + limit
+        with self.__lock:
+            futures = [self.__send(shard, "find", (None, order_type, status, stop))
+                       for shard in range(self.shards)]
+            placements = self.__placements
+        results = [future.result() for future in futures]
+        # Placements submitted before find are recorded once their workers answered it
+        positions = [[] for _ in range(self.shards)]
+        for number, shard in enumerate(placements):
+            positions[shard].append(number)
+        found = [self.__numbered(positions[shard], result)
+                 for shard, result in enumerate(results)]
+        orders = map(operator.itemgetter(1), heapq.merge(*found, key=operator.itemgetter(0)))
+        return list(self._stream_rows(itertools.islice(orders, skip, stop), skip))
+
+    def quote(self, stock_name):
+        """Get bid price, ask price and price of last transaction for particular stock
+
+        Arguments:
+            stock_name(str): Name of stock for which we want to see info
+
+        Returns:
+            str: Bid price, ask price and price of last transaction for particular stock
+        """
+        return self.submit("quote", stock_name).result()
+
+    def quote_many(self, stock_names):
+        """Get quotes of several stocks at once
+
+        Every worker is asked once for quotes of all requested stocks it owns.
+
+        Arguments:
+            stock_names(list): Names of stocks
+
+        Returns:
+            list: Batches of resulting rows, one quote per stock
+        """
+        owned = collections.defaultdict(list)
+        for stock_name in stock_names:
+            owned[shard_of(stock_name, self.shards)].append(stock_name)
+        with self.__lock:
+            futures = {shard: self.__send(shard, "quote_many", (names,))
+                       for shard, names in owned.items()}
+        quotes = {}
+        for shard, future in futures.items():
+            rows = "".join(future.result())
+            quotes.update(zip(owned[shard], rows.splitlines(keepends=True)))
+        return ["".join(quotes[stock_name] for stock_name in stock_names)]
+
+    def depth(self, stock_name, levels):
+        """Get aggregate amounts of best price levels of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            levels(int): Maximal number of price levels per side
+
+        Returns:
+            list: Batches of resulting rows
+        """
+        return self.submit("depth", stock_name, levels).result()
+
+    def bars(self, stock_name, interval):
+        """Get OHLCV bars of particular stock
+
+        Arguments:
+            stock_name(str): Name of stock
+            interval(str): Name of bar interval, e.g. 1m
+
+        Returns:
+            list: Batches of resulting rows from oldest bar
+        """
+        return self.submit("bars", stock_name, interval).result()
+
+    def place_mkt_buy(self, command):
+        """Place buy at market price order
+
+        Arguments:
+            command(dict): Dictionary with BUY MKT info
+        Returns:
+            str: Resulting user output
+        """
+        return self.submit("place_mkt_buy", command).result()
+
+    def place_mkt_sell(self, command):
+        """Place sell at market price order
+
+        Arguments:
+            command(dict): Dictionary with SELL MKT info
+        Returns:
+            str: Resulting user output
+        """
+        return self.submit("place_mkt_sell", command).result()
+
+    def place_lmt_buy(self, command):
+        """Place buy at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with BUY LMT info
+        Returns:
+            str: Resulting user output
+        """
+        return self.submit("place_lmt_buy", command).result()
+
+    def place_lmt_sell(self, command):
+        """Place sell at user defined price order
+
+        Arguments:
+            command(dict): Dictionary with SELL LMT info
+        Returns:
+            str: Resulting user output
+        """
+        return self.submit("place_lmt_sell", command).result()
+
+    def cancel(self, order_id):
+        """Cancel remaining amount of resting order
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+
+        Returns:
+            str: Resulting user output
+        """
+        return self.__change("cancel", order_id)
+
+    def amend(self, order_id, amount):
+        """Reduce total amount of resting order keeping its time priority
+
+        Arguments:
+            order_id(str): Id of order as returned on placement
+            amount(int): New total amount of order
+
+        Returns:
+            str: Resulting user output
+        """
+        return self.__change("amend", order_id, amount)
+
+    def __change(self, method, order_id, *args):
+        """Ask all workers to cancel or amend order, only its owner knows it
+
+        Order ids do not tell the stock of order, but are unique among all workers.
+
+        Arguments:
+            method(str): cancel or amend
+            order_id(str): Id of order as returned on placement
+            args(list): Further positional arguments of method
+
+        Returns:
+            str: Resulting user output of owner of order, NOT_RESTING without one
+        """
+        with self.__lock:
+            futures = [self.__send(shard, method, (order_id,) + args)
+                       for shard in range(self.shards)]
+        not_resting = self.NOT_RESTING.format(order_id)
+        replies = [future.result() for future in futures]
+        return next((reply for reply in replies if reply != not_resting), not_resting)
+
+    def __start_worker(self, repo_factory, shard, settings):
+        """Start worker process and thread resolving futures with its replies
+
+        Arguments:
+            repo_factory(callable): Factory of worker repository
+            shard(int): Index of worker
+            settings(WorkerSettings): Settings of this process
+
+        Returns:
+            tuple: Request connection, futures waiting for reply, process and thread
+        """
+        requests_out, requests_in = self.__context.Pipe(duplex=False)
+        replies_out, replies_in = self.__context.Pipe(duplex=False)
+        process = self.__context.Process(target=serve_shard,
+                                         args=(repo_factory, requests_out, replies_in,
+                                               shard, self.shards, settings),
+                                         daemon=True)
+        process.start()
+        requests_out.close()
+        replies_in.close()
+        pending = collections.deque()
+        receiver = threading.Thread(target=self.__receive, args=(replies_out, pending),
+                                    daemon=True)
+        receiver.start()
+        return requests_in, pending, process, receiver
+
+    def __send(self, shard, method, args):
+        """Send call to worker, callers hold the lock so futures keep the order of calls
+
+        Arguments:
+            shard(int): Index of worker
+            method(str): Name of repository method
+            args(tuple): Positional arguments of method
+
+        Returns:
+            concurrent.futures.Future: Future resolved with result of call
+        """
+        requests, pending, _, _ = self.__workers[shard]
+        future = concurrent.futures.Future()
+        pending.append(future)
+        requests.send((method, args))
+        return future
+
+    @staticmethod
+    def __numbered(numbers, found):
+        """Replace positions of orders in worker by their numbers among all placed orders
+
+        Arguments:
+            numbers(list): Position in worker -> number among all placed orders
+            found(list): (position in worker, order dictionary) pairs
+
+        Returns:
+            generator: (number among all placed orders, order dictionary) pairs
+        """
+        return ((numbers[position], order) for position, order in found)
+
+    @staticmethod
+    def __record_placement(placements, shard, future):
+        """Number order placed by worker once it is stored, so failed placements get none
+
+        Callbacks of one worker run in the order of its replies, which keeps numbers in
+        the order orders are stored by the worker.
+
+        Arguments:
+            placements(array): Worker of every placed order since last clear
+            shard(int): Index of worker placing order
+            future(concurrent.futures.Future): Resolved future of placement
+        """
+        if future.exception() is None:
+            placements.append(shard)
+
+    @staticmethod
+    def __receive(replies, pending):
+        """Resolve futures of worker in the order its replies arrive
+
+        Arguments:
+            replies(Connection): Receiving end of worker replies
+            pending(deque): Futures waiting for reply, oldest first
+        """
+        while True:
+            try:
+                succeeded, result = replies.recv()
+            except (EOFError, OSError):
+                break
+            future = pending.popleft()
+            if succeeded:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+        while pending:
+            pending.popleft().set_exception(EOFError("Worker process exited"))
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+
+from stock_exchange import commands
+from stock_exchange.main import add_common_arguments, configure
+from stock_exchange.market_data import MarketDataBus, MarketDataFeed
+from stock_exchange.shared import response_object as res
+from stock_exchange.shared.pipeline import CommandPipeline
+from stock_exchange.shared.stats import STATS
+from stock_exchange.use_cases.async_order_use_case import (
+    OrderAmendAsyncUseCase,
+    OrderBarsAsyncUseCase,
+    OrderCancelAsyncUseCase,
+    OrderDepthAsyncUseCase,
+    OrderPlaceMktBuyAsyncUseCase,
+    OrderPlaceMktSellAsyncUseCase,
+    OrderPlaceLmtBuyAsyncUseCase,
+    OrderPlaceLmtSellAsyncUseCase,
+    OrderQuoteAsyncUseCase,
+    OrderViewAsyncUseCase,
+)
+
+
+class ConnectionOrder:
+    """Order of commands of one connection that are not keyed by a single stock
+
+    CANCEL and AMEND only know the stock of order once they find it, and VIEW ORDERS
+    and QUOTE of several stocks read many stocks, so they cannot be keyed by stock.
+    They start after all earlier commands of the connection completed, and commands
+    of a stock sent after them start once they completed.
+    """
+    def __init__(self):
+        # Last command of connection spanning stocks, None before the first one
+        self.barrier = None
+        # Commands of single stock sent after barrier
+        self.pending = []
+
+    def earlier(self, stock_name):
+        """Earlier commands of connection a command has to wait for
+
+        Arguments:
+            stock_name(str): Name of stock of command, None for commands spanning stocks
+
+        Returns:
+            list: Futures of earlier commands
+        """
+        earlier = [] if self.barrier is None else [self.barrier]
+        if stock_name is None:
+            earlier.extend(self.pending)
+        return earlier
+
+    def add(self, stock_name, future):
+        """Record command submitted after earlier ones
+
+        Arguments:
+            stock_name(str): Name of stock of command, None for commands spanning stocks
+            future(asyncio.Future): Future resolved with response object
+        """
+        if stock_name is None:
+            self.barrier = future
+            self.pending = []
+        else:
+            self.pending.append(future)
+
+
+class OrderServer:
+    """Asyncio TCP server accepting console interface commands, one per line
+
+    Every connection may send commands without waiting for responses, responses are
+    written back in the order commands were received. Commands of all connections
+    are performed concurrently across stocks and in arrival order per stock, commands
+    spanning stocks in arrival order per connection, see ConnectionOrder. Every
+    response is a single line, except rows of VIEW ORDERS, BARS, DEPTH, STATS and QUOTE
+    of several stocks which are streamed as they are read and terminated by an empty
+    line.
+
+    Attributes:
+        repo(AsyncMongoRepo): Repository class object for interacting with database
+        pipeline(CommandPipeline): Pipeline performing commands of all connections
+    """
+    # Command name -> use case performing it
+    USE_CASES = {
+        commands.PLACE_MKT_BUY: OrderPlaceMktBuyAsyncUseCase,
+        commands.PLACE_MKT_SELL: OrderPlaceMktSellAsyncUseCase,
+        commands.PLACE_LMT_BUY: OrderPlaceLmtBuyAsyncUseCase,
+        commands.PLACE_LMT_SELL: OrderPlaceLmtSellAsyncUseCase,
+        commands.VIEW: OrderViewAsyncUseCase,
+        commands.QUOTE: OrderQuoteAsyncUseCase,
+        commands.BARS: OrderBarsAsyncUseCase,
+        commands.QUOTES: OrderQuoteAsyncUseCase,
+        commands.DEPTH: OrderDepthAsyncUseCase,
+        commands.CANCEL: OrderCancelAsyncUseCase,
+        commands.AMEND: OrderAmendAsyncUseCase,
+    }
+    UNKNOWN_COMMAND = "Unknown command"
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.pipeline = CommandPipeline()
+
+    async def start(self, host, port):
+        """Start listening for connections
+
+        Arguments:
+            host(str): Interface to listen on
+            port(int): Port to listen on, 0 for any free port
+
+        Returns:
+            asyncio.Server: Running server
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        """Serve single client connection until it sends QUIT or disconnects
+
+        Arguments:
+            reader(asyncio.StreamReader): Stream of client commands
+            writer(asyncio.StreamWriter): Stream of responses
+        """
+        responses = asyncio.Queue()
+        order = ConnectionOrder()
+        responder = asyncio.ensure_future(self.__respond(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = commands.parse_command(line.decode().split())
+                if command is not None and command.name == commands.QUIT:
+                    break
+                responses.put_nowait(self.__dispatch(command, order))
+        finally:
+            responses.put_nowait(None)
+            await responder
+            writer.close()
+
+    def __dispatch(self, command, order):
+        """Submit command to pipeline
+
+        Arguments:
+            command(Command): Parsed client command, None if it is unknown
+            order(ConnectionOrder): Order of commands of connection
+
+        Returns:
+            asyncio.Future: Future resolved with response object
+        """
+        if command is None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(res.ResponseFailure.build_parameters_error(self.UNKNOWN_COMMAND))
+            return future
+        if command.name == commands.STATS:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(res.ResponseSuccess(self.__stats_rows()))
+            return future
+        use_case = self.USE_CASES[command.name](self.repo)
+        future = self.pipeline.submit(command.stock_name, self.__after,
+                                      order.earlier(command.stock_name), use_case.execute,
+                                      command.request)
+        order.add(command.stock_name, future)
+        return future
+
+    @staticmethod
+    async def __after(earlier, execute, request):
+        """Perform command once earlier commands of its connection completed
+
+        Arguments:
+            earlier(list): Futures of earlier commands
+            execute(coroutine function): Performs command
+            request(ValidRequestObject): Request object of command, invalid one is refused
+
+        Returns:
+            ResponseObject: Response of command
+        """
+        if earlier:
+            await asyncio.wait(earlier)
+        return await execute(request)
+
+    @staticmethod
+    async def __stats_rows():
+        """Stage statistics of server process as rows of STATS command"""
+        yield "{}\n".format(STATS.report())
+
+    async def __respond(self, responses, writer):
+        """Write responses back in command order as they complete
+
+        Arguments:
+            responses(asyncio.Queue): Futures of responses, None marks end of connection
+            writer(asyncio.StreamWriter): Stream of responses
+        """
+        while True:
+            future = await responses.get()
+            if future is None:
+                break
+            result = await future
+            if result and hasattr(result.value, "__aiter__"):
+                async for rows in result.value:
+                    writer.write(rows.encode())
+                writer.write(b"\n")
+            else:
+                writer.write("{}\n".format(str(result.value).rstrip("\n")).encode())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                break
+
+
+async def serve(host, port, market_data=None):
+    """Run order server backed by MongoDB until cancelled
+
+    Arguments:
+        host(str): Interface to listen on
+        port(int): Port to listen on
+        market_data(str): Path of Unix socket streaming market data, None for none
+    """
+    from stock_exchange.repository.async_mongorepo import AsyncMongoRepo
+
+    repo = await AsyncMongoRepo.create()
+    if market_data is not None:
+        repo.attach_market_data(MarketDataBus())
+        MarketDataFeed(repo.market_data, market_data).start()
+    server = await OrderServer(repo).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stock exchange order entry server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    try:
+        configure(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    asyncio.run(serve(args.host, args.port, args.market_data))
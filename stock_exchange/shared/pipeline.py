@@ -0,0 +1,58 @@
+import asyncio
+
+
+class CommandPipeline:
+    """Runs commands concurrently across keys and one by one in submission order per key
+
+    Commands are coroutine functions, e.g. execute of async use cases, keyed by name
+    of stock they trade so orders of one stock keep their matching order.
+    """
+    def __init__(self):
+        # Key -> queue of commands waiting to be run
+        self.__queues = {}
+        # Key -> task running commands of its queue
+        self.__workers = {}
+
+    def submit(self, key, command, *args):
+        """Schedule command after all commands submitted earlier with the same key
+
+        Arguments:
+            key(hashable): Serialization key, e.g. stock name
+            command(coroutine function): Command to run
+            args(list): Positional arguments of command
+
+        Returns:
+            asyncio.Future: Future resolved with result of command
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self.__queues.get(key)
+        if queue is None:
+            queue = self.__queues[key] = asyncio.Queue()
+            self.__workers[key] = loop.create_task(self.__work(queue))
+        queue.put_nowait((command, args, future))
+        return future
+
+    async def close(self):
+        """Wait for all submitted commands and stop workers"""
+        for queue in list(self.__queues.values()):
+            await queue.join()
+        for worker in self.__workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.__workers.values(), return_exceptions=True)
+        self.__queues.clear()
+        self.__workers.clear()
+
+    async def __work(self, queue):
+        while True:
+            command, args, future = await queue.get()
+            try:
+                result = await command(*args)
+            except Exception as exc:
+                if not future.cancelled():
+                    future.set_exception(exc)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                queue.task_done()
@@ -0,0 +1,162 @@
+import json
+import threading
+
+
+class Histogram:
+    """HDR-style histogram of non-negative integer values, e.g. nanoseconds
+
+    Values below 2 ** (SUB_BITS + 1) are counted exactly, larger values in buckets
+    of 2 ** SUB_BITS per power of two, so every value is known within 1 / 2 ** SUB_BITS
+    of itself whatever its magnitude while memory stays logarithmic in the range.
+    """
+    SUB_BITS = 5
+
+    def __init__(self):
+        # Lowest value of bucket -> number of recorded values in bucket
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """Count single value
+
+        Arguments:
+            value(int): Non-negative value
+        """
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        shift = value.bit_length() - self.SUB_BITS - 1
+        if shift > 0:
+            value = value >> shift << shift
+        self.counts[value] = self.counts.get(value, 0) + 1
+
+    def percentile(self, fraction):
+        """Highest value equivalent to the value at percentile
+
+        Arguments:
+            fraction(float): Percentile as fraction, e.g. 0.99
+
+        Returns:
+            int: Value, 0 if nothing was recorded
+        """
+        rank = max(1, fraction * self.count)
+        seen = 0
+        for lowest in sorted(self.counts):
+            seen += self.counts[lowest]
+            if seen >= rank:
+                return min(self.__highest_equivalent(lowest), self.max)
+        return 0
+
+    def to_dict(self, unit=1000):
+        """Count, mean, max and p50/p99/p999 values
+
+        Arguments:
+            unit(int): Values are divided by unit, e.g. 1000 for microseconds of
+                nanoseconds
+
+        Returns:
+            dict: Histogram statistics
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count / unit if self.count else 0.0,
+            "p50": self.percentile(0.50) / unit,
+            "p99": self.percentile(0.99) / unit,
+            "p999": self.percentile(0.999) / unit,
+            "max": self.max / unit,
+        }
+
+    def __highest_equivalent(self, lowest):
+        shift = lowest.bit_length() - self.SUB_BITS - 1
+        return lowest + (1 << shift) - 1 if shift > 0 else lowest
+
+
+class Stats:
+    """Timing histograms and counters of processing stages
+
+    Stages are timed by probes of stock_exchange.instrumentation, which are only
+    installed while the stats are enabled. Database round trips are recorded from
+    threads of MongoDB clients, so recording is serialized.
+    """
+    DISABLED = "Stats are disabled, start with --stats"
+
+    def __init__(self):
+        self.enabled = False
+        self.__lock = threading.Lock()
+        # Stage name -> Histogram of durations in nanoseconds
+        self.stages = {}
+        # Counter name -> number of events
+        self.counters = {}
+
+    def record(self, stage, nanoseconds):
+        """Count single duration of stage
+
+        Arguments:
+            stage(str): Name of stage, e.g. parse
+            nanoseconds(int): Duration
+        """
+        with self.__lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.record(nanoseconds)
+
+    def count(self, counter, events=1):
+        """Add events to counter
+
+        Arguments:
+            counter(str): Name of counter, e.g. match_fills
+            events(int): Number of events
+        """
+        with self.__lock:
+            self.counters[counter] = self.counters.get(counter, 0) + events
+
+    def reset(self):
+        """Drop all recorded durations and counters"""
+        with self.__lock:
+            self.stages = {}
+            self.counters = {}
+
+    def to_dict(self):
+        """Recorded statistics, durations in microseconds
+
+        Returns:
+            dict: Stage statistics and counters
+        """
+        return {
+            "stages": {stage: histogram.to_dict() for stage, histogram in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def report(self):
+        """Recorded statistics as output of STATS command
+
+        Returns:
+            str: One row per stage with durations in microseconds, then one row per
+                counter
+        """
+        if not self.enabled:
+            return self.DISABLED
+        rows = ["STAGE COUNT MEAN_US P50_US P99_US P999_US MAX_US"]
+        for stage, histogram in sorted(self.stages.items()):
+            rows.append("{} {count} {mean:.2f} {p50:.2f} {p99:.2f} {p999:.2f} {max:.2f}".format(
+                stage, **histogram.to_dict()))
+        for counter, events in sorted(self.counters.items()):
+            rows.append("{} {}".format(counter, events))
+        return "\n".join(rows)
+
+    def dump(self, path):
+        """Write recorded statistics as JSON file
+
+        Arguments:
+            path(str): Path of JSON file
+        """
+        with open(path, "w") as output:
+            json.dump(self.to_dict(), output, indent=2)
+
+
+# Stage statistics of this process, enabled by stock_exchange.instrumentation
+STATS = Stats()
@@ -0,0 +1,230 @@
+from stock_exchange.shared import response_object as res
+from stock_exchange.shared.use_case import AsyncUseCase
+
+
+class OrderViewAsyncUseCase(AsyncUseCase):
+    """Use case performing VIEW ORDERS command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to VIEW ORDERS request object
+
+        Arguments:
+            request_object(OrderViewRequestObject): Request object corresponding to VIEW ORDERS
+
+        Returns:
+            ResponseSucess: Response handling successful result of the VIEW ORDERS command
+        """
+        domain_order = self.repo.view(**request_object.filters)
+        return res.ResponseSuccess(domain_order)
+
+
+class OrderPlaceMktBuyAsyncUseCase(AsyncUseCase):
+    """Use case performing BUY MKT command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to BUY MKT request object
+
+        Arguments:
+            request_object(OrderPlaceMktRequestObject): Request object corresponding to BUY MKT
+
+        Returns:
+            ResponseSucess: Response handling successful result of the BUY MKT command
+        """
+        order_place = await self.repo.place_mkt_buy(command={"command": request_object.command})
+        return res.ResponseSuccess(order_place)
+
+
+class OrderPlaceMktSellAsyncUseCase(AsyncUseCase):
+    """Use case performing SELL MKT command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to SELL MKT request object
+
+        Arguments:
+            request_object(OrderPlaceMktRequestObject): Request object corresponding to SELL MKT
+
+        Returns:
+            ResponseSucess: Response handling successful result of the SELL MKT command
+        """
+        order_place = await self.repo.place_mkt_sell(command={"command": request_object.command})
+        return res.ResponseSuccess(order_place)
+
+
+class OrderPlaceLmtBuyAsyncUseCase(AsyncUseCase):
+    """Use case performing BUY LMT command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to BUY LMT request object
+
+        Arguments:
+            request_object(OrderPlaceLmtRequestObject): Request object corresponding to BUY LMT
+
+        Returns:
+            ResponseSucess: Response handling successful result of the BUY LMT command
+        """
+        order_place = await self.repo.place_lmt_buy(command={"command": request_object.command})
+        return res.ResponseSuccess(order_place)
+
+
+class OrderPlaceLmtSellAsyncUseCase(AsyncUseCase):
+    """Use case performing SELL LMT command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to SELL LMT request object
+
+        Arguments:
+            request_object(OrderPlaceLmtRequestObject): Request object corresponding to SELL LMT
+
+        Returns:
+            ResponseSucess: Response handling successful result of the SELL LMT command
+        """
+        order_place = await self.repo.place_lmt_sell(command={"command": request_object.command})
+        return res.ResponseSuccess(order_place)
+
+
+class OrderQuoteAsyncUseCase(AsyncUseCase):
+    """Use case performing QUOTE command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to QUOTE request object
+
+        Arguments:
+            request_object(OrderQuoteRequestObject): Request object corresponding to QUOTE
+
+        Several stocks are quoted at once in a single batch of rows.
+
+        Returns:
+            ResponseSucess: Response handling successful result of the QUOTE command
+        """
+        if len(request_object.stock_names) > 1:
+            order_quotes = self.repo.quote_many(stock_names=request_object.stock_names)
+            return res.ResponseSuccess(order_quotes)
+        order_quote = await self.repo.quote(stock_name=request_object.stock_name)
+        return res.ResponseSuccess(order_quote)
+
+
+class OrderBarsAsyncUseCase(AsyncUseCase):
+    """Use case performing BARS command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Read precomputed bars corresponding to BARS request object
+
+        Arguments:
+            request_object(OrderBarsRequestObject): Request object corresponding to BARS
+
+        Returns:
+            ResponseSucess: Response handling successful result of the BARS command
+        """
+        bars = self.repo.bars(stock_name=request_object.stock_name,
+                              interval=request_object.interval)
+        return res.ResponseSuccess(bars)
+
+
+class OrderDepthAsyncUseCase(AsyncUseCase):
+    """Use case performing DEPTH command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Read order book levels corresponding to DEPTH request object
+
+        Arguments:
+            request_object(OrderDepthRequestObject): Request object corresponding to DEPTH
+
+        Returns:
+            ResponseSucess: Response handling successful result of the DEPTH command
+        """
+        depth = self.repo.depth(stock_name=request_object.stock_name,
+                                levels=request_object.levels)
+        return res.ResponseSuccess(depth)
+
+
+class OrderCancelAsyncUseCase(AsyncUseCase):
+    """Use case performing CANCEL command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to CANCEL request object
+
+        Arguments:
+            request_object(OrderCancelRequestObject): Request object corresponding to CANCEL
+
+        Returns:
+            ResponseSucess: Response handling successful result of the CANCEL command
+        """
+        order_cancel = await self.repo.cancel(order_id=request_object.order_id)
+        return res.ResponseSuccess(order_cancel)
+
+
+class OrderAmendAsyncUseCase(AsyncUseCase):
+    """Use case performing AMEND command on asyncio
+
+    Arguments:
+        repo(AsyncMongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def process_request(self, request_object):
+        """Perform database operations corresponding to AMEND request object
+
+        Arguments:
+            request_object(OrderAmendRequestObject): Request object corresponding to AMEND
+
+        Returns:
+            ResponseSucess: Response handling successful result of the AMEND command
+        """
+        order_amend = await self.repo.amend(order_id=request_object.order_id,
+                                            amount=request_object.amount)
+        return res.ResponseSuccess(order_amend)
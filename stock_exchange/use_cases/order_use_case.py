@@ -20,7 +20,7 @@ class OrderViewUseCase(UseCase):
         Returns:
             ResponseSucess: Response handling successful result of the VIEW ORDERS command
         """
-        domain_order = self.repo.view()
+        domain_order = self.repo.view(**request_object.filters)
         return res.ResponseSuccess(domain_order)
 
 
@@ -42,7 +42,7 @@ class OrderPlaceMktBuyUseCase(UseCase):
         Returns:
             ResponseSucess: Response handling successful result of the BUY MKT command
         """
-        order_place = self.repo.place_mkt_buy(command=request_object.command)
+        order_place = self.repo.place_mkt_buy(command={"command": request_object.command})
         return res.ResponseSuccess(order_place)
 
 
@@ -64,7 +64,7 @@ class OrderPlaceMktSellUseCase(UseCase):
         Returns:
             ResponseSucess: Response handling successful result of the SELL MKT command
         """
-        order_place = self.repo.place_mkt_sell(command=request_object.command)
+        order_place = self.repo.place_mkt_sell(command={"command": request_object.command})
         return res.ResponseSuccess(order_place)
 
 
@@ -86,7 +86,7 @@ class OrderPlaceLmtBuyUseCase(UseCase):
         Returns:
             ResponseSucess: Response handling successful result of the BUY LMT command
         """
-        order_place = self.repo.place_lmt_buy(command=request_object.command)
+        order_place = self.repo.place_lmt_buy(command={"command": request_object.command})
         return res.ResponseSuccess(order_place)
 
 
@@ -108,7 +108,7 @@ class OrderPlaceLmtSellUseCase(UseCase):
         Returns:
             ResponseSucess: Response handling successful result of the SELL LMT command
         """
-        order_place = self.repo.place_lmt_sell(command=request_object.command)
+        order_place = self.repo.place_lmt_sell(command={"command": request_object.command})
         return res.ResponseSuccess(order_place)
 
 
@@ -127,8 +127,104 @@ class OrderQuoteUseCase(UseCase):
         Arguments:
             request_object(OrderQuoteRequestObject): Request object corresponding to QUOTE
 
+        Several stocks are quoted at once in a single batch of rows.
+
         Returns:
             ResponseSucess: Response handling successful result of the QUOTE command
         """
+        if len(request_object.stock_names) > 1:
+            order_quotes = self.repo.quote_many(stock_names=request_object.stock_names)
+            return res.ResponseSuccess(order_quotes)
         order_quote = self.repo.quote(stock_name=request_object.stock_name)
         return res.ResponseSuccess(order_quote)
+
+
+class OrderBarsUseCase(UseCase):
+    """Use case performing BARS command
+
+    Arguments:
+        repo(MongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    def process_request(self, request_object):
+        """Read precomputed bars corresponding to BARS request object
+
+        Arguments:
+            request_object(OrderBarsRequestObject): Request object corresponding to BARS
+
+        Returns:
+            ResponseSucess: Response handling successful result of the BARS command
+        """
+        bars = self.repo.bars(stock_name=request_object.stock_name,
+                              interval=request_object.interval)
+        return res.ResponseSuccess(bars)
+
+
+class OrderDepthUseCase(UseCase):
+    """Use case performing DEPTH command
+
+    Arguments:
+        repo(MongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    def process_request(self, request_object):
+        """Read order book levels corresponding to DEPTH request object
+
+        Arguments:
+            request_object(OrderDepthRequestObject): Request object corresponding to DEPTH
+
+        Returns:
+            ResponseSucess: Response handling successful result of the DEPTH command
+        """
+        depth = self.repo.depth(stock_name=request_object.stock_name,
+                                levels=request_object.levels)
+        return res.ResponseSuccess(depth)
+
+
+class OrderCancelUseCase(UseCase):
+    """Use case performing CANCEL command
+
+    Arguments:
+        repo(MongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    def process_request(self, request_object):
+        """Perform database operations corresponding to CANCEL request object
+
+        Arguments:
+            request_object(OrderCancelRequestObject): Request object corresponding to CANCEL
+
+        Returns:
+            ResponseSucess: Response handling successful result of the CANCEL command
+        """
+        order_cancel = self.repo.cancel(order_id=request_object.order_id)
+        return res.ResponseSuccess(order_cancel)
+
+
+class OrderAmendUseCase(UseCase):
+    """Use case performing AMEND command
+
+    Arguments:
+        repo(MongoRepo): Repository class object to perform database operations
+    """
+    def __init__(self, repo):
+        self.repo = repo
+
+    def process_request(self, request_object):
+        """Perform database operations corresponding to AMEND request object
+
+        Arguments:
+            request_object(OrderAmendRequestObject): Request object corresponding to AMEND
+
+        Returns:
+            ResponseSucess: Response handling successful result of the AMEND command
+        """
+        order_amend = self.repo.amend(order_id=request_object.order_id,
+                                      amount=request_object.amount)
+        return res.ResponseSuccess(order_amend)
@@ -1,11 +1,17 @@
-import collections
+import collections.abc
 
+from stock_exchange.domain.bars import INTERVALS
+from stock_exchange.domain.ticks import TICK_SIZES
 from stock_exchange.shared.request_objects import (
     ValidRequestObject,
     InvalidRequestObject
 )
 
 
+# Largest amount and price in ticks, stored as 64-bit integers by MongoDB and journal
+MAX_QUANTITY = 2 ** 63 - 1
+
+
 class OrderPlaceMktRequestObject(ValidRequestObject):
     """Request object corresponding to BUY/SELL MKT command
 
@@ -40,11 +46,18 @@ class OrderPlaceMktRequestObject(ValidRequestObject):
             invalid_req.add_error('command', 'Is incomplete')
             return invalid_req
 
-        if amount_is_negative(input_dict):
-            invalid_req.add_error('command: amount', 'Is negative')
+        amount = parse_amount(input_dict)
+
+        if amount is None:
+            invalid_req.add_error('command: amount', 'Is not an integer')
+            return invalid_req
+
+        error = quantity_error(amount)
+        if error is not None:
+            invalid_req.add_error('command: amount', error)
             return invalid_req
 
-        return OrderPlaceMktRequestObject(command=input_dict.get('command', None))
+        return OrderPlaceMktRequestObject(command=dict(input_dict['command'], amount=amount))
 
     def __is_incomplete(input_dict):
         return not all(k in input_dict['command'] for k in ("stock_name", "amount"))
@@ -57,7 +70,7 @@ class OrderPlaceLmtRequestObject(ValidRequestObject):
     """Request object corresponding to BUY/SELL LMT command
 
     Arguments:
-        command(dict): Dictionary with BUY/SELL LMT command info
+        command(dict): Dictionary with BUY/SELL LMT command info, price in integer ticks
     """
     def __init__(self, command):
         self.command = command
@@ -87,15 +100,30 @@ class OrderPlaceLmtRequestObject(ValidRequestObject):
             invalid_req.add_error('command', 'Is incomplete')
             return invalid_req
 
-        if price_is_negative(input_dict):
-            invalid_req.add_error('command: price', 'Is negative')
+        command = input_dict['command']
+        try:
+            price = TICK_SIZES.to_ticks(command['stock_name'], command['price'])
+        except ValueError as error:
+            invalid_req.add_error('command: price', str(error))
+            return invalid_req
+
+        error = quantity_error(price)
+        if error is not None:
+            invalid_req.add_error('command: price', error)
+            return invalid_req
+
+        amount = parse_amount(input_dict)
+
+        if amount is None:
+            invalid_req.add_error('command: amount', 'Is not an integer')
             return invalid_req
 
-        if amount_is_negative(input_dict):
-            invalid_req.add_error('command: amount', 'Is negative')
+        error = quantity_error(amount)
+        if error is not None:
+            invalid_req.add_error('command: amount', error)
             return invalid_req
 
-        return OrderPlaceLmtRequestObject(command=input_dict.get('command', None))
+        return OrderPlaceLmtRequestObject(command=dict(command, price=price, amount=amount))
 
     def __is_incomplete(input_dict):
         return not all(k in input_dict['command'] for k in ("stock_name",
@@ -111,9 +139,14 @@ class OrderViewRequestObject(ValidRequestObject):
 
     Arguments:
         command(dict): Dictionary with VIEW ORDERS command info
+        filters(dict, optional): Filters and page of orders to view
     """
-    def __init__(self, command):
+    # Filters of VIEW ORDERS command
+    FILTERS = ("stock_name", "order_type", "status", "page", "limit")
+
+    def __init__(self, command, filters=None):
         self.command = command
+        self.filters = filters or {}
 
     @classmethod
     def from_dict(cls, input_dict):
@@ -140,18 +173,37 @@ class OrderViewRequestObject(ValidRequestObject):
             invalid_req.add_error('command', 'Must be VIEW ORDERS')
             return invalid_req
 
-        return OrderViewRequestObject(command=input_dict['command'])
+        filters = input_dict.get('filters', {})
+
+        if cls.__has_unknown_filters(filters):
+            invalid_req.add_error('filters', 'Unknown filter')
+            return invalid_req
+
+        if cls.__page_is_not_positive(filters):
+            invalid_req.add_error('filters: page', 'Must be positive integer with limit')
+            return invalid_req
+
+        return OrderViewRequestObject(command=input_dict['command'], filters=filters)
 
     def __is_empty(input_dict):
         return 'command' not in input_dict.keys()
 
     def __is_not_iterable(input_dict):
         return ('command' in input_dict.keys()
-                and not isinstance(input_dict, collections.Mapping))
+                and not isinstance(input_dict, collections.abc.Mapping))
 
     def __wrong_command(input_dict):
         return input_dict['command'] != "VIEW ORDERS"
 
+    def __has_unknown_filters(filters):
+        return any(k not in OrderViewRequestObject.FILTERS for k in filters)
+
+    def __page_is_not_positive(filters):
+        page = filters.get('page', 1)
+        limit = filters.get('limit', 1)
+        return (not isinstance(page, int) or not isinstance(limit, int)
+                or page <= 0 or limit <= 0 or ('page' in filters and 'limit' not in filters))
+
     def __nonzero__(self):
         return True
 
@@ -160,17 +212,20 @@ class OrderQuoteRequestObject(ValidRequestObject):
     """Request object corresponding to QUOTE command
 
     Arguments:
-        stock_name(str): Name of stock to quote
+        stock_name(str): Name of stock to quote, the first one of several
+        stock_names(list): Names of all stocks to quote, None for stock_name only
     """
-    def __init__(self, stock_name):
+    def __init__(self, stock_name, stock_names=None):
         self.stock_name = stock_name
+        self.stock_names = stock_names or [stock_name]
 
     @classmethod
     def from_dict(cls, input_dict):
         """Generate request from QUOTE command dictionary
 
         Arguments:
-            input_dict(dict): QUOTE command dictionary with command info
+            input_dict(dict): QUOTE command dictionary with stock_name or list of
+                stock_names
 
         Returns:
             OrderPlaceLmtRequestObject: Valid request object iff command is correct
@@ -190,10 +245,210 @@ class OrderQuoteRequestObject(ValidRequestObject):
             invalid_req.add_error('command', 'Stock name not defined')
             return invalid_req
 
+        stock_names = input_dict['command'].get('stock_names')
+        if stock_names:
+            return OrderQuoteRequestObject(stock_name=stock_names[0],
+                                           stock_names=list(stock_names))
         return OrderQuoteRequestObject(stock_name=input_dict['command']['stock_name'])
 
     def __no_stock_name(input_dict):
-        return "stock_name" not in input_dict['command'].keys()
+        return ("stock_name" not in input_dict['command'].keys()
+                and not input_dict['command'].get('stock_names'))
+
+    def __nonzero__(self):
+        return True
+
+
+class OrderDepthRequestObject(ValidRequestObject):
+    """Request object corresponding to DEPTH command
+
+    Arguments:
+        stock_name(str): Name of stock
+        levels(int): Maximal number of price levels per side
+    """
+    def __init__(self, stock_name, levels):
+        self.stock_name = stock_name
+        self.levels = levels
+
+    @classmethod
+    def from_dict(cls, input_dict):
+        """Generate request from DEPTH command dictionary
+
+        Arguments:
+            input_dict(dict): DEPTH command dictionary with command info
+
+        Returns:
+            OrderDepthRequestObject: Valid request object iff command is correct
+            InvalidRequestObject: Invalid request iff command is incorrect
+        """
+        invalid_req = InvalidRequestObject()
+
+        if is_empty(input_dict):
+            invalid_req.add_error('command', 'Empty dict')
+            return invalid_req
+
+        if is_not_iterable(input_dict):
+            invalid_req.add_error('command', 'Is not iterable')
+            return invalid_req
+
+        if cls.__is_incomplete(input_dict):
+            invalid_req.add_error('command', 'Is incomplete')
+            return invalid_req
+
+        if input_dict['command']['levels'] <= 0:
+            invalid_req.add_error('command: levels', 'Is not positive')
+            return invalid_req
+
+        return OrderDepthRequestObject(stock_name=input_dict['command']['stock_name'],
+                                       levels=input_dict['command']['levels'])
+
+    def __is_incomplete(input_dict):
+        return not all(k in input_dict['command'] for k in ("stock_name", "levels"))
+
+    def __nonzero__(self):
+        return True
+
+
+class OrderBarsRequestObject(ValidRequestObject):
+    """Request object corresponding to BARS command
+
+    Arguments:
+        stock_name(str): Name of stock
+        interval(str): Name of bar interval, e.g. 1m
+    """
+    def __init__(self, stock_name, interval):
+        self.stock_name = stock_name
+        self.interval = interval
+
+    @classmethod
+    def from_dict(cls, input_dict):
+        """Generate request from BARS command dictionary
+
+        Arguments:
+            input_dict(dict): BARS command dictionary with command info
+
+        Returns:
+            OrderBarsRequestObject: Valid request object iff command is correct
+            InvalidRequestObject: Invalid request iff command is incorrect
+        """
+        invalid_req = InvalidRequestObject()
+
+        if is_empty(input_dict):
+            invalid_req.add_error('command', 'Empty dict')
+            return invalid_req
+
+        if is_not_iterable(input_dict):
+            invalid_req.add_error('command', 'Is not iterable')
+            return invalid_req
+
+        if cls.__is_incomplete(input_dict):
+            invalid_req.add_error('command', 'Is incomplete')
+            return invalid_req
+
+        if input_dict['command']['interval'] not in INTERVALS:
+            invalid_req.add_error('command: interval',
+                                  'Is not one of {}'.format(", ".join(INTERVALS)))
+            return invalid_req
+
+        return OrderBarsRequestObject(stock_name=input_dict['command']['stock_name'],
+                                      interval=input_dict['command']['interval'])
+
+    def __is_incomplete(input_dict):
+        return not all(k in input_dict['command'] for k in ("stock_name", "interval"))
+
+    def __nonzero__(self):
+        return True
+
+
+class OrderCancelRequestObject(ValidRequestObject):
+    """Request object corresponding to CANCEL command
+
+    Arguments:
+        order_id(str): Id of resting order as returned on placement
+    """
+    def __init__(self, order_id):
+        self.order_id = order_id
+
+    @classmethod
+    def from_dict(cls, input_dict):
+        """Generate request from CANCEL command dictionary
+
+        Arguments:
+            input_dict(dict): CANCEL command dictionary with command info
+
+        Returns:
+            OrderCancelRequestObject: Valid request object iff command is correct
+            InvalidRequestObject: Invalid request iff command is incorrect
+        """
+        invalid_req = InvalidRequestObject()
+
+        if is_empty(input_dict):
+            invalid_req.add_error('command', 'Empty dict')
+            return invalid_req
+
+        if is_not_iterable(input_dict):
+            invalid_req.add_error('command', 'Is not iterable')
+            return invalid_req
+
+        if "order_id" not in input_dict['command']:
+            invalid_req.add_error('command', 'Is incomplete')
+            return invalid_req
+
+        return OrderCancelRequestObject(order_id=input_dict['command']['order_id'])
+
+    def __nonzero__(self):
+        return True
+
+
+class OrderAmendRequestObject(ValidRequestObject):
+    """Request object corresponding to AMEND command
+
+    Arguments:
+        order_id(str): Id of resting order as returned on placement
+        amount(int): New total amount of order
+    """
+    def __init__(self, order_id, amount):
+        self.order_id = order_id
+        self.amount = amount
+
+    @classmethod
+    def from_dict(cls, input_dict):
+        """Generate request from AMEND command dictionary
+
+        Arguments:
+            input_dict(dict): AMEND command dictionary with command info
+
+        Returns:
+            OrderAmendRequestObject: Valid request object iff command is correct
+            InvalidRequestObject: Invalid request iff command is incorrect
+        """
+        invalid_req = InvalidRequestObject()
+
+        if is_empty(input_dict):
+            invalid_req.add_error('command', 'Empty dict')
+            return invalid_req
+
+        if is_not_iterable(input_dict):
+            invalid_req.add_error('command', 'Is not iterable')
+            return invalid_req
+
+        if cls.__is_incomplete(input_dict):
+            invalid_req.add_error('command', 'Is incomplete')
+            return invalid_req
+
+        if input_dict['command']['amount'] <= 0:
+            invalid_req.add_error('command: amount', 'Is not positive')
+            return invalid_req
+
+        if input_dict['command']['amount'] > MAX_QUANTITY:
+            invalid_req.add_error('command: amount', 'Is too large')
+            return invalid_req
+
+        return OrderAmendRequestObject(order_id=input_dict['command']['order_id'],
+                                       amount=input_dict['command']['amount'])
+
+    def __is_incomplete(input_dict):
+        return not all(k in input_dict['command'] for k in ("order_id", "amount"))
 
     def __nonzero__(self):
         return True
@@ -205,12 +460,19 @@ def is_empty(input_dict):
 
 def is_not_iterable(input_dict):
     return ('command' in input_dict
-            and not isinstance(input_dict['command'], collections.Mapping))
+            and not isinstance(input_dict['command'], collections.abc.Mapping))
 
 
-def amount_is_negative(input_dict):
-    return input_dict['command']['amount'] <= 0
+def parse_amount(input_dict):
+    """Amount of command as typed by user or given as integer, None if it is no integer"""
+    amount = str(input_dict['command']['amount'])
+    return int(amount) if amount.lstrip('-').isdecimal() else None
 
 
-def price_is_negative(input_dict):
-    return input_dict['command']['price'] <= 0
+def quantity_error(quantity):
+    """Error of parsed amount or price in ticks, None if it fits stored orders"""
+    if quantity <= 0:
+        return 'Is negative'
+    if quantity > MAX_QUANTITY:
+        return 'Is too large'
+    return None
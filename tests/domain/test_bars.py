@@ -0,0 +1,55 @@
+from stock_exchange.domain.bars import INTERVALS, BarAggregator, MonotonicClock
+
+SECOND = INTERVALS["1s"]
+START = 1700000000 * SECOND
+
+
+def ohlcv(bar):
+    return bar.open, bar.high, bar.low, bar.close, bar.volume
+
+
+def test_bar_aggregator_updates_bar_of_interval():
+    aggregator = BarAggregator()
+    aggregator.add("FB", 2000, 5, START)
+    aggregator.add("FB", 2100, 3, START + SECOND // 2)
+    aggregator.add("FB", 1900, 2, START + SECOND // 2)
+    aggregator.add("FB", 2050, 1, START + SECOND + 1)
+
+    assert [(bar.start, ohlcv(bar)) for bar in aggregator.bars("FB", "1s")] == [
+        (START, (2000, 2100, 1900, 1900, 10)),
+        (START + SECOND, (2050, 2050, 2050, 2050, 1)),
+    ]
+    minute, = aggregator.bars("FB", "1m")
+    assert ohlcv(minute) == (2000, 2100, 1900, 2050, 11)
+    assert minute.start % INTERVALS["1m"] == 0
+    assert [ohlcv(bar) for bar in aggregator.bars("FB", "1h")] == [ohlcv(minute)]
+    assert ohlcv(aggregator.bars("FB", "1m")[0]) == ohlcv(minute)
+    assert aggregator.bars("AAPL", "1m") == []
+
+
+def test_bar_aggregator_starts_longer_bar_after_its_interval():
+    aggregator = BarAggregator()
+    aggregator.add("FB", 2000, 5, START)
+    aggregator.add("FB", 2100, 3, START + INTERVALS["1m"])
+    aggregator.add("FB", 2200, 1, START + INTERVALS["1m"] + SECOND)
+
+    assert [ohlcv(bar) for bar in aggregator.bars("FB", "1m")] == [
+        (2000, 2000, 2000, 2000, 5),
+        (2100, 2200, 2100, 2200, 4),
+    ]
+
+
+def test_bar_aggregator_keeps_latest_bars():
+    aggregator = BarAggregator(max_bars=2)
+    for second in range(3):
+        aggregator.add("FB", 2000 + second, 1, START + second * SECOND)
+
+    assert [bar.open for bar in aggregator.bars("FB", "1s")] == [2001, 2002]
+
+
+def test_monotonic_clock_never_goes_backwards(monkeypatch):
+    clock = MonotonicClock()
+    times = iter([200, 100, 300])
+    monkeypatch.setattr("time.time_ns", lambda: next(times))
+
+    assert [clock(), clock(), clock()] == [200, 200, 300]
@@ -0,0 +1,105 @@
+import random
+
+from stock_exchange.domain import ladder_book
+from stock_exchange.domain.ladder_book import LadderBook, create_book
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.order_book import OrderBook
+
+
+def lmt(order_id, order_type, price, total):
+    return Order("FB", "LMT", order_type, price, total, order_id=order_id)
+
+
+def test_ladder_book_grows_to_prices_outside_initial_ladder():
+    book = LadderBook("FB", width=4)
+    book.place(lmt(1, "BUY", 1000, 5))
+    book.place(lmt(2, "BUY", 990, 5))
+    book.place(lmt(3, "SELL", 1100, 5))
+
+    assert book.best_bid() == 1000
+    assert book.best_ask() == 1100
+
+    fills = book.place(lmt(4, "SELL", 990, 8))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == [(1, 1000, 5), (2, 990, 3)]
+    assert book.best_bid() == 990
+
+
+def test_ladder_book_finds_best_prices_after_levels_empty():
+    book = LadderBook("FB")
+    for order_id, price in enumerate([1003, 1001, 1002]):
+        book.place(lmt(order_id, "SELL", price, 1))
+
+    book.place(lmt(10, "BUY", 1001, 1))
+    assert book.best_ask() == 1002
+
+    book.place(lmt(11, "BUY", 1003, 2))
+    assert book.best_ask() is None
+    assert book.best_bid() is None
+
+
+def test_create_book_selects_ladder_per_stock(monkeypatch):
+    monkeypatch.setattr(ladder_book, "LADDER_STOCKS", {"FB"})
+
+    assert type(create_book("FB")) is LadderBook
+    assert type(create_book("AAPL")) is OrderBook
+
+
+def test_ladder_book_trades_like_order_book_on_random_flow():
+    rng = random.Random(7)
+    tree, ladder = OrderBook("FB"), LadderBook("FB", width=64)
+    for order_id in range(2000):
+        order_type = rng.choice(["BUY", "SELL"])
+        price = rng.randint(900, 1100)
+        amount = rng.randint(1, 20)
+        tree_fills = tree.place(lmt(order_id, order_type, price, amount))
+        ladder_fills = ladder.place(lmt(order_id, order_type, price, amount))
+
+        assert [(f.maker.order_id, f.price, f.amount) for f in ladder_fills] == \
+            [(f.maker.order_id, f.price, f.amount) for f in tree_fills]
+        if order_id % 3 == 0:
+            cancelled = rng.randrange(order_id + 1)
+            assert (ladder.cancel(cancelled) is None) == (tree.cancel(cancelled) is None)
+        assert (ladder.best_bid(), ladder.best_ask()) == (tree.best_bid(), tree.best_ask())
+    for side in ("BUY", "SELL"):
+        assert ladder.depth(side, 300) == tree.depth(side, 300)
+
+
+def test_ladder_book_keeps_prices_out_of_band_in_sorted_levels():
+    book = LadderBook("FB", width=64, max_width=128)
+    book.place(lmt(1, "BUY", 1000, 5))
+    book.place(lmt(2, "BUY", 10 ** 9, 5))
+    book.place(lmt(3, "BUY", 1, 5))
+    book.place(lmt(4, "SELL", 10 ** 12, 5))
+
+    assert len(book._ladder["BUY"]) <= 128
+    assert book.best_bid() == 10 ** 9
+    assert book.best_ask() == 10 ** 12
+    assert book.depth("BUY", 5) == [(10 ** 9, 5), (1000, 5), (1, 5)]
+
+    fills = book.place(lmt(5, "SELL", 1, 12))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == \
+        [(2, 10 ** 9, 5), (1, 1000, 5), (3, 1, 2)]
+    assert book.depth("BUY", 5) == [(1, 3)]
+
+
+def test_capped_ladder_book_trades_like_order_book_on_wide_flow():
+    rng = random.Random(11)
+    tree, ladder = OrderBook("FB"), LadderBook("FB", width=64, max_width=256)
+    for order_id in range(2000):
+        order_type = rng.choice(["BUY", "SELL"])
+        price = rng.randint(500, 1500)
+        amount = rng.randint(1, 20)
+        tree_fills = tree.place(lmt(order_id, order_type, price, amount))
+        ladder_fills = ladder.place(lmt(order_id, order_type, price, amount))
+
+        assert [(f.maker.order_id, f.price, f.amount) for f in ladder_fills] == \
+            [(f.maker.order_id, f.price, f.amount) for f in tree_fills]
+        if order_id % 3 == 0:
+            cancelled = rng.randrange(order_id + 1)
+            assert (ladder.cancel(cancelled) is None) == (tree.cancel(cancelled) is None)
+        assert (ladder.best_bid(), ladder.best_ask()) == (tree.best_bid(), tree.best_ask())
+    assert len(ladder._ladder["BUY"]) == 256
+    for side in ("BUY", "SELL"):
+        assert ladder.depth(side, 1000) == tree.depth(side, 1000)
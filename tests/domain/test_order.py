@@ -7,13 +7,15 @@ def test_order_model_init():
         price_type="LMT",
         order_type="BUY",
         price=20.00,
-        amount="10/20",
+        total_qty=20,
+        filled_qty=10,
     )
     assert order.stock_name == "FB"
     assert order.price_type == "LMT"
     assert order.order_type == "BUY"
     assert order.price == float(20.00)
-    assert order.amount == "10/20"
+    assert order.total_qty == 20
+    assert order.filled_qty == 10
 
 
 def test_order_model_from_dict():
@@ -23,11 +25,43 @@ def test_order_model_from_dict():
             'price_type': "LMT",
             'order_type': "BUY",
             'price': 20.00,
-            'amount': "10/20",
+            'total_qty': 20,
+            'filled_qty': 10,
         }
     )
     assert order.stock_name == "FB"
     assert order.price_type == "LMT"
     assert order.order_type == "BUY"
     assert order.price == float(20.00)
-    assert order.amount == "10/20"
+    assert order.total_qty == 20
+    assert order.filled_qty == 10
+
+
+def test_order_model_to_dict():
+    order = Order(
+        stock_name="FB",
+        price_type="LMT",
+        order_type="BUY",
+        price=20.00,
+        total_qty=20,
+    )
+    assert order.to_dict() == {
+        'stock_name': "FB",
+        'price_type': "LMT",
+        'order_type': "BUY",
+        'price': 20.00,
+        'total_qty': 20,
+        'filled_qty': 0,
+        'status': "PENDING",
+        'timestamp': 0,
+    }
+
+
+def test_order_model_fill_state_and_stored_dict():
+    order = Order("FB", "MKT", "SELL", -1, 20, filled_qty=5, order_id=7, timestamp=123)
+
+    assert order.remaining == 15
+    assert order.status == "PARTIAL"
+    assert Order.from_dict(order.to_dict()).to_dict() == order.to_dict()
+    assert order.to_dict()["_id"] == 7
+    assert not hasattr(order, "__dict__")
@@ -0,0 +1,190 @@
+import pytest
+
+from stock_exchange.domain.ladder_book import LadderBook
+from stock_exchange.domain.order import Order
+from stock_exchange.domain.order_book import OrderBook
+
+
+@pytest.fixture(params=[OrderBook, LadderBook])
+def book_class(request):
+    return request.param
+
+
+def lmt(order_id, order_type, price, total):
+    return Order("FB", "LMT", order_type, price, total, order_id=order_id)
+
+
+def mkt(order_id, order_type, total):
+    return Order("FB", "MKT", order_type, -1, total, order_id=order_id)
+
+
+def test_order_book_rests_non_crossing_orders(book_class):
+    book = book_class("FB")
+
+    assert book.place(lmt(1, "BUY", 1000, 5)) == []
+    assert book.place(lmt(2, "SELL", 1100, 5)) == []
+    assert book.best_bid() == 1000
+    assert book.best_ask() == 1100
+
+
+def test_order_book_matches_best_price_first(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "SELL", 1200, 5))
+    book.place(lmt(2, "SELL", 1000, 5))
+    book.place(lmt(3, "SELL", 1100, 5))
+
+    taker = lmt(4, "BUY", 1150, 8)
+    fills = book.place(taker)
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == [(2, 1000, 5), (3, 1100, 3)]
+    assert taker.status == "FILLED"
+    assert fills[-1].maker.status == "PARTIAL"
+    assert book.best_ask() == 1100
+    assert book.last_price == 1100
+
+
+def test_order_book_matches_oldest_first_within_price_level(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "BUY", 1000, 5))
+    book.place(lmt(2, "BUY", 1000, 5))
+
+    fills = book.place(lmt(3, "SELL", 1000, 7))
+
+    assert [(f.maker.order_id, f.amount) for f in fills] == [(1, 5), (2, 2)]
+
+
+def test_order_book_rests_unfilled_part_of_limit_order(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "SELL", 1000, 5))
+
+    taker = lmt(2, "BUY", 1000, 8)
+    book.place(taker)
+
+    assert taker.status == "PARTIAL"
+    assert book.best_ask() is None
+    assert book.best_bid() == 1000
+
+
+def test_order_book_market_order_rests_and_trades_at_incoming_limit_price(book_class):
+    book = book_class("FB")
+    resting = mkt(1, "SELL", 5)
+    assert book.place(resting) == []
+
+    fills = book.place(lmt(2, "BUY", 950, 5))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == [(1, 950, 5)]
+    assert resting.status == "FILLED"
+
+
+def test_order_book_market_orders_trade_at_last_price_only(book_class):
+    book = book_class("FB")
+    book.place(mkt(1, "BUY", 5))
+
+    assert book.place(mkt(2, "SELL", 5)) == []
+
+    book.last_price = 2000
+    fills = book.place(mkt(3, "SELL", 3))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == [(1, 2000, 3)]
+
+
+def test_order_book_better_limit_levels_trade_before_resting_market_orders(book_class):
+    book = book_class("FB")
+    book.place(mkt(1, "SELL", 5))
+    book.place(lmt(2, "SELL", 1000, 5))
+    book.place(lmt(3, "SELL", 900, 5))
+
+    fills = book.place(lmt(4, "BUY", 1000, 12))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == \
+        [(3, 900, 5), (1, 1000, 5), (2, 1000, 2)]
+
+
+def test_order_book_resting_sell_market_order_ranks_at_incoming_limit_price(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "BUY", 1000, 5))
+    book.place(mkt(2, "BUY", 5))
+    book.place(lmt(3, "BUY", 1100, 5))
+
+    fills = book.place(lmt(4, "SELL", 1000, 15))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == \
+        [(3, 1100, 5), (2, 1000, 5), (1, 1000, 5)]
+
+
+def test_order_book_keeps_aggregate_level_sizes(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "SELL", 1000, 5))
+    book.place(lmt(2, "SELL", 1000, 7))
+    book.place(lmt(3, "SELL", 1100, 4))
+
+    book.place(lmt(4, "BUY", 1000, 6))
+
+    assert book.level_size("SELL", 1000) == 6
+    assert book.level_size("SELL", 1100) == 4
+
+    book.place(lmt(5, "BUY", 1100, 8))
+
+    assert book.level_size("SELL", 1000) == 0
+    assert book.level_size("SELL", 1100) == 2
+    assert book.level_size("BUY", 1100) == 0
+
+
+def test_order_book_depth_from_best_level(book_class):
+    book = book_class("FB")
+    for order_id, price in enumerate([1000, 990, 1000, 980]):
+        book.place(lmt(order_id, "BUY", price, 5))
+    book.place(lmt(10, "SELL", 1010, 2))
+
+    assert book.depth("BUY", 2) == [(1000, 10), (990, 5)]
+    assert book.depth("SELL", 5) == [(1010, 2)]
+
+
+def test_order_book_cancel_skips_order_and_drops_emptied_level(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "SELL", 1000, 5))
+    book.place(lmt(2, "SELL", 1000, 7))
+    book.place(lmt(3, "SELL", 1100, 4))
+
+    assert book.cancel(1).status == "CANCELLED"
+    assert book.level_size("SELL", 1000) == 7
+    assert book.cancel(2).remaining == 7
+    assert book.level_size("SELL", 1000) == 0
+    assert book.best_ask() == 1100
+    assert book.cancel(2) is None
+
+    fills = book.place(lmt(4, "BUY", 1100, 6))
+
+    assert [(f.maker.order_id, f.price, f.amount) for f in fills] == [(3, 1100, 4)]
+    assert list(book.orders) == [4]
+
+
+def test_order_book_skips_cancelled_orders_within_level(book_class):
+    book = book_class("FB")
+    for order_id in (1, 2, 3):
+        book.place(lmt(order_id, "BUY", 1000, 5))
+    book.place(mkt(4, "BUY", 5))
+    book.cancel(2)
+    book.cancel(4)
+
+    fills = book.place(lmt(5, "SELL", 1000, 20))
+
+    assert [(f.maker.order_id, f.amount) for f in fills] == [(1, 5), (3, 5)]
+    assert book.best_bid() is None
+    assert list(book.orders) == [5]
+
+
+def test_order_book_amend_keeps_time_priority(book_class):
+    book = book_class("FB")
+    book.place(lmt(1, "SELL", 1000, 5))
+    book.place(lmt(2, "SELL", 1000, 5))
+    book.place(lmt(3, "BUY", 1000, 1))
+
+    assert book.amend(1, 3).remaining == 2
+    assert book.level_size("SELL", 1000) == 7
+    assert book.amend(9, 3) is None
+
+    fills = book.place(lmt(4, "BUY", 1000, 4))
+
+    assert [(f.maker.order_id, f.amount) for f in fills] == [(1, 2), (2, 2)]
+    assert 1 not in book.orders
@@ -0,0 +1,23 @@
+import pytest
+
+from stock_exchange.domain.ticks import TickSizes
+
+
+def test_tick_sizes_convert_prices_exactly():
+    ticks = TickSizes(default="0.01", sizes={"BRK": "0.05"})
+
+    assert ticks.to_ticks("FB", "$20.07") == 2007
+    assert ticks.to_ticks("FB", 0.29) == 29
+    assert ticks.to_ticks("BRK", "$20.05") == 401
+    assert ticks.to_price("FB", 2007) == 20.07
+    assert ticks.to_price("BRK", 401) == 20.05
+
+
+def test_tick_sizes_reject_prices_between_ticks():
+    ticks = TickSizes()
+    ticks.set("BRK", "0.05")
+
+    with pytest.raises(ValueError):
+        ticks.to_ticks("BRK", "$20.07")
+    with pytest.raises(ValueError):
+        ticks.to_ticks("FB", "$abc")
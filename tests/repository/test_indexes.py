@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from stock_exchange.repository.indexes import is_covered, winning_stages  # noqa: E402
+
+
+def explain(plan):
+    return {"queryPlanner": {"winningPlan": plan}}
+
+
+def test_winning_stages_walks_nested_plan():
+    plan = {"stage": "LIMIT",
+            "inputStage": {"stage": "FETCH",
+                           "inputStage": {"stage": "IXSCAN"}}}
+
+    assert winning_stages(explain(plan)) == ["LIMIT", "FETCH", "IXSCAN"]
+
+
+def test_index_scan_is_covered():
+    plan = {"stage": "SORT_MERGE",
+            "inputStages": [{"stage": "IXSCAN"}, {"stage": "IXSCAN"}]}
+
+    assert is_covered(explain(plan)) is True
+
+
+def test_collection_scan_is_not_covered():
+    plan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+
+    assert is_covered(explain(plan)) is False
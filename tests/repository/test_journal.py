@@ -0,0 +1,150 @@
+import os
+import struct
+import threading
+
+import pytest
+
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.journal import Journal
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+def mkt(stock_name, amount):
+    return {"command": {"stock_name": stock_name, "amount": amount}}
+
+
+def lmt(stock_name, price, amount):
+    return {"command": {"stock_name": stock_name, "price": TICK_SIZES.to_ticks(stock_name, price),
+                        "amount": amount}}
+
+
+def place_flow(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_mkt_sell(mkt("FB", "3"))
+    repo.place_lmt_buy(lmt("FB", "$21.00", "4"))
+    repo.place_lmt_buy(lmt("AAPL", "$5.00", "2"))
+    repo.place_lmt_buy(lmt("FB", "$19.00", "12"))
+
+
+def trades(history):
+    return [(trade["stock_name"], trade["price"], trade["amount"]) for trade in history]
+
+
+def assert_same_state(recovered, repo):
+    assert "".join(recovered.view()) == "".join(repo.view())
+    assert trades(recovered.history) == trades(repo.history)
+    for stock_name in ("FB", "AAPL"):
+        assert recovered.quote(stock_name) == repo.quote(stock_name)
+
+
+@pytest.mark.parametrize("snapshot_every", [None, 2, 100])
+def test_journal_recovers_state(tmpdir, snapshot_every):
+    journaled = InMemoryRepo(Journal(str(tmpdir), snapshot_every=snapshot_every))
+    place_flow(journaled)
+    journaled.journal.close()
+    repo = InMemoryRepo()
+    place_flow(repo)
+
+    recovered = InMemoryRepo(Journal(str(tmpdir), snapshot_every=snapshot_every))
+
+    assert_same_state(recovered, repo)
+    assert recovered.history == journaled.history
+    assert recovered.bars("FB", "1s") == journaled.bars("FB", "1s")
+    recovered.place_mkt_sell(mkt("FB", "1"))
+    repo.place_mkt_sell(mkt("FB", "1"))
+    assert_same_state(recovered, repo)
+
+
+def change_flow(repo):
+    place_flow(repo)
+    repo.amend("5", 8)
+    repo.cancel("4")
+
+
+@pytest.mark.parametrize("snapshot_every", [None, 3, 6])
+def test_journal_recovers_cancelled_and_amended_orders(tmpdir, snapshot_every):
+    journaled = InMemoryRepo(Journal(str(tmpdir), snapshot_every=snapshot_every))
+    change_flow(journaled)
+    journaled.journal.close()
+    repo = InMemoryRepo()
+    change_flow(repo)
+
+    recovered = InMemoryRepo(Journal(str(tmpdir), snapshot_every=snapshot_every))
+
+    assert_same_state(recovered, repo)
+    assert [order.status for order in recovered.orders][-2:] == ["CANCELLED", "PARTIAL"]
+    assert recovered.orders[-1].total_qty == 8
+    assert recovered.place_mkt_sell(mkt("FB", "9")) == repo.place_mkt_sell(mkt("FB", "9"))
+    assert_same_state(recovered, repo)
+
+
+def test_journal_drops_torn_record(tmpdir):
+    repo = InMemoryRepo(Journal(str(tmpdir), snapshot_every=None))
+    place_flow(repo)
+    repo.journal.close()
+    path = os.path.join(str(tmpdir), Journal.JOURNAL_FILE)
+    size = os.path.getsize(path)
+    with open(path, "ab") as journal:
+        journal.write(b"\x10\x00\x00")
+
+    recovered = InMemoryRepo(Journal(str(tmpdir), snapshot_every=None))
+
+    assert_same_state(recovered, repo)
+    assert os.path.getsize(path) == size
+
+
+def test_journal_is_reset_by_clear(tmpdir):
+    repo = InMemoryRepo(Journal(str(tmpdir), snapshot_every=2))
+    place_flow(repo)
+    repo.clear()
+    repo.journal.close()
+
+    recovered = InMemoryRepo(Journal(str(tmpdir)))
+
+    assert list(recovered.view()) == []
+    assert recovered.quote("FB") == "FB BID: 0 ASK: 0 LAST: 0"
+
+
+def order_id(placed):
+    return int(placed.rsplit(" ", 1)[-1])
+
+
+def test_journal_recovers_ids_of_shard(tmpdir):
+    repo = InMemoryRepo(Journal(str(tmpdir)), shard=1, shards=2)
+    placed = [order_id(repo.place_lmt_sell(lmt("FB", "$20.00", "1"))) for _ in range(2)]
+    repo.journal.close()
+
+    recovered = InMemoryRepo(Journal(str(tmpdir)), shard=1, shards=2)
+
+    assert placed == [2, 4]
+    assert order_id(recovered.place_lmt_sell(lmt("FB", "$20.00", "1"))) == 6
+
+
+def test_order_failing_to_be_journaled_leaves_no_trades(tmpdir):
+    repo = InMemoryRepo(Journal(str(tmpdir), snapshot_every=None))
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+
+    with pytest.raises(struct.error):
+        repo.place_mkt_buy(mkt("FB", str(2 ** 64)))
+
+    assert "".join(repo.view()) == "1. FB LMT SELL 20.0 0/5 PENDING\n"
+    repo.place_mkt_buy(mkt("FB", "2"))
+    repo.journal.close()
+    assert_same_state(InMemoryRepo(Journal(str(tmpdir), snapshot_every=None)), repo)
+
+
+def test_idle_journal_fsyncs_incomplete_group(tmpdir, monkeypatch):
+    journal = Journal(str(tmpdir), group_size=64, group_interval=0.01, snapshot_every=None)
+    repo = InMemoryRepo(journal)
+    synced = threading.Event()
+    fsync = os.fsync
+
+    def recording_fsync(descriptor):
+        fsync(descriptor)
+        synced.set()
+
+    monkeypatch.setattr(os, "fsync", recording_fsync)
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+
+    assert synced.wait(1)
+    journal.close()
@@ -0,0 +1,175 @@
+import pytest
+
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+def mkt(stock_name, amount):
+    return {"command": {"stock_name": stock_name, "amount": amount}}
+
+
+def lmt(stock_name, price, amount):
+    return {"command": {"stock_name": stock_name, "price": TICK_SIZES.to_ticks(stock_name, price),
+                        "amount": amount}}
+
+
+@pytest.fixture
+def repo():
+    return InMemoryRepo()
+
+
+def test_memory_repo_place_messages(repo):
+    assert repo.place_mkt_buy(mkt("FB", "10")) == \
+        "You have placed a MKT BUY order for 10 FB shares, order id 1"
+    assert repo.place_lmt_sell(lmt("FB", "$20.00", "5")) == \
+        "You have placed a LMT SELL order for 5 FB shares at 20.0 each, order id 2"
+
+
+def test_memory_repo_fills_resting_orders(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_buy(lmt("FB", "$21.00", "4"))
+
+    assert "".join(repo.view()) == (
+        "1. FB LMT SELL 20.0 4/10 PARTIAL\n"
+        "2. FB LMT BUY 21.0 4/4 FILLED\n"
+    )
+    assert repo.history == [{"stock_name": "FB", "price": 2000, "amount": 4,
+                             "timestamp": repo.orders[1].timestamp}]
+    assert repo.quote("FB") == "FB BID: 0 ASK: 20.0 LAST: 20.0"
+
+
+def test_memory_repo_market_order_takes_last_fill_price(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_sell(lmt("FB", "$21.00", "5"))
+    repo.place_mkt_buy(mkt("FB", "8"))
+
+    assert "".join(repo.view()).splitlines()[-1] == "3. FB MKT BUY 21.0 8/8 FILLED"
+    assert [fill["price"] for fill in repo.history] == [2000, 2100]
+
+
+def test_memory_repo_stamps_last_price_on_resting_market_orders(repo):
+    repo.place_mkt_sell(mkt("FB", "5"))
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_buy(lmt("FB", "$19.00", "5"))
+
+    assert "".join(repo.view()).splitlines() == [
+        "1. FB MKT SELL 19.0 5/5 FILLED",
+        "2. FB LMT SELL 20.0 0/5 PENDING",
+        "3. FB LMT BUY 19.0 5/5 FILLED",
+    ]
+
+
+def test_memory_repo_quote_unknown_stock(repo):
+    assert repo.quote("SNAP") == "SNAP BID: 0 ASK: 0 LAST: 0"
+
+
+def test_memory_repo_clear(repo):
+    repo.place_lmt_buy(lmt("FB", "$20.00", "5"))
+    repo.clear()
+
+    assert "".join(repo.view()) == ""
+    assert repo.quote("FB") == "FB BID: 0 ASK: 0 LAST: 0"
+
+
+def test_memory_repo_view_filters_orders(repo):
+    repo.place_lmt_buy(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_sell(lmt("SNAP", "$5.00", "5"))
+    repo.place_lmt_sell(lmt("FB", "$21.00", "5"))
+
+    assert "".join(repo.view(stock_name="FB", order_type="SELL")) == \
+        "1. FB LMT SELL 21.0 0/5 PENDING\n"
+
+
+def test_memory_repo_view_pages_orders(repo):
+    for price in ("$20.00", "$19.00", "$18.00"):
+        repo.place_lmt_buy(lmt("FB", price, "5"))
+
+    assert "".join(repo.view(page=2, limit=2)) == "3. FB LMT BUY 18.0 0/5 PENDING\n"
+
+
+def test_memory_repo_view_yields_rows_in_batches(repo):
+    repo.VIEW_BATCH = 2
+    for price in ("$20.00", "$19.00", "$18.00"):
+        repo.place_lmt_buy(lmt("FB", price, "5"))
+
+    assert [rows.count("\n") for rows in repo.view()] == [2, 1]
+
+
+def test_memory_repo_resolves_resting_market_order_price_on_read(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.place_mkt_buy(mkt("FB", "5"))
+    repo.place_mkt_sell(mkt("FB", "5"))
+
+    assert repo.orders[-1].price == -1
+    assert "".join(repo.view()).splitlines()[-1] == "3. FB MKT SELL 20.0 0/5 PENDING"
+
+
+def test_memory_repo_shows_unresolved_market_order_price_before_first_trade(repo):
+    repo.place_mkt_buy(mkt("FB", "5"))
+
+    assert "".join(repo.view()) == "1. FB MKT BUY -1 0/5 PENDING\n"
+
+
+def test_memory_repo_bars_of_trades(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_sell(lmt("FB", "$20.50", "10"))
+    repo.place_lmt_buy(lmt("FB", "$21.00", "12"))
+
+    rows = "".join(repo.bars("FB", "1h"))
+
+    assert rows.startswith("FB 1h ")
+    assert rows.endswith(" OPEN: 20.0 HIGH: 20.5 LOW: 20.0 CLOSE: 20.5 VOLUME: 12\n")
+    assert repo.bars("AAPL", "1h") == []
+
+
+def test_memory_repo_quotes_several_stocks_in_one_batch(repo):
+    repo.place_lmt_buy(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_sell(lmt("AAPL", "$30.00", "5"))
+
+    assert repo.quote_many(["AAPL", "FB", "GOOG"]) == [
+        "AAPL BID: 0 ASK: 30.0 LAST: 0\n"
+        "FB BID: 20.0 ASK: 0 LAST: 0\n"
+        "GOOG BID: 0 ASK: 0 LAST: 0\n"
+    ]
+
+
+def test_memory_repo_depth_of_best_levels(repo):
+    repo.place_lmt_buy(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_buy(lmt("FB", "$19.50", "3"))
+    repo.place_lmt_buy(lmt("FB", "$20.00", "2"))
+    repo.place_lmt_sell(lmt("FB", "$21.00", "4"))
+
+    assert repo.depth("FB", 1) == ["FB BID 20.0 12\nFB ASK 21.0 4\n"]
+    assert repo.depth("AAPL", 1) == []
+
+
+def test_memory_repo_cancels_resting_order(repo):
+    repo.place_lmt_buy(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_buy(lmt("FB", "$19.00", "5"))
+    repo.place_lmt_sell(lmt("FB", "$20.00", "2"))
+
+    assert repo.cancel("1") == "You have cancelled order 1 for 3 FB shares"
+    assert repo.quote("FB") == "FB BID: 19.0 ASK: 0 LAST: 20.0"
+    assert "".join(repo.view(status="CANCELLED")) == "1. FB LMT BUY 20.0 2/5 CANCELLED\n"
+    assert repo.cancel("1") == "Order 1 is not resting"
+    assert repo.cancel("3") == "Order 3 is not resting"
+    assert repo.cancel("x") == "Order x is not resting"
+
+
+def test_memory_repo_amends_resting_order(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.place_lmt_buy(lmt("FB", "$20.00", "1"))
+
+    assert repo.amend("1", 5) == \
+        "Order 1 can only be amended to more than 1 and less than 5 shares"
+    assert repo.amend("1", 1) == \
+        "Order 1 can only be amended to more than 1 and less than 5 shares"
+    assert repo.amend("1", 3) == "You have amended order 1 to 3 FB shares"
+    assert "".join(repo.depth("FB", 1)) == "FB ASK 20.0 7\n"
+    repo.place_mkt_buy(mkt("FB", "3"))
+    assert "".join(repo.view(status="FILLED")) == (
+        "1. FB LMT SELL 20.0 3/3 FILLED\n"
+        "2. FB LMT BUY 20.0 1/1 FILLED\n"
+        "3. FB MKT BUY 20.0 3/3 FILLED\n"
+    )
@@ -0,0 +1,48 @@
+import pytest
+
+from stock_exchange.repository.mongo_client import MongoSettings, shared_client
+
+
+class RecordingClient:
+    def __init__(self, uri, **options):
+        self.uri = uri
+        self.options = options
+
+
+def test_default_client_options_leave_write_concern_to_server():
+    assert MongoSettings().client_options() == {"maxPoolSize": 100}
+
+
+def test_configure_client_options():
+    settings = MongoSettings()
+
+    settings.configure(uri="mongodb://db1,db2/?replicaSet=rs", max_pool_size=10, w="2",
+                       journal=True, read_preference="secondaryPreferred",
+                       compressors="zstd,zlib")
+
+    assert settings.uri == "mongodb://db1,db2/?replicaSet=rs"
+    assert settings.read_preference == "secondaryPreferred"
+    assert settings.client_options() == {"maxPoolSize": 10, "w": 2, "journal": True,
+                                         "compressors": "zstd,zlib"}
+    settings.configure(w="majority")
+    assert settings.client_options()["w"] == "majority"
+
+
+@pytest.mark.parametrize("options", [{"max_pool_size": 0}, {"read_preference": "any"}])
+def test_configure_rejects_invalid_settings(options):
+    settings = MongoSettings()
+
+    with pytest.raises(ValueError):
+        settings.configure(**options)
+
+    assert settings.client_options() == {"maxPoolSize": 100}
+    assert settings.read_preference == "primary"
+
+
+def test_shared_client_is_created_once_per_process():
+    settings = MongoSettings(uri="mongodb://db", max_pool_size=5)
+
+    client = shared_client(RecordingClient, settings)
+
+    assert shared_client(RecordingClient) is client
+    assert (client.uri, client.options) == ("mongodb://db", {"maxPoolSize": 5})
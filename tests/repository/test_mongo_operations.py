@@ -0,0 +1,86 @@
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+from stock_exchange.domain.order import Order  # noqa: E402
+from stock_exchange.domain.order_book import Fill  # noqa: E402
+from stock_exchange.repository import mongo_operations as ops  # noqa: E402
+
+
+def test_fill_only_updates_maker_still_resting_as_before_trade():
+    maker = Order("FB", "LMT", "SELL", 2000, 10, filled_qty=7, order_id="m")
+
+    operation = ops.fill_operation(Fill(maker, 2000, 3))
+
+    assert operation._filter == {"_id": "m", "filled_qty": 4, "total_qty": 10,
+                                 "status": ops.ACTIVE_STATUS}
+    assert operation._doc == {"$set": {"status": "PARTIAL"}, "$inc": {"filled_qty": 3}}
+
+
+def test_order_writes_can_be_stored_and_applied_again():
+    maker = Order("FB", "MKT", "SELL", 2000, 5, filled_qty=5, order_id="m")
+    order = Order("FB", "LMT", "BUY", 2000, 8, filled_qty=5, order_id="t", timestamp=7)
+    trades = [{"stock_name": "FB", "price": 2000, "amount": 5, "timestamp": 7}]
+
+    writes = ops.order_writes(order, [Fill(maker, 2000, 5)], trades)
+
+    assert writes["orders"] == [order.to_dict()]
+    assert writes["changes"] == [{"_id": "m", "filled_qty": 0, "total_qty": 5,
+                                  "set": {"status": "FILLED", "price": 2000}, "fill": 5}]
+    assert [trade.pop("_id") is not None for trade in writes["history"]] == [True]
+    assert writes["history"] == trades
+    assert [type(operation).__name__ for operation in ops.order_operations(writes)] == \
+        ["InsertOne", "UpdateOne"]
+
+
+def test_change_writes_only_match_order_as_resting():
+    order = Order("FB", "LMT", "BUY", 2000, 8, filled_qty=3, order_id="o")
+
+    cancel, = ops.order_operations(ops.change_writes(order, 0))
+    amend, = ops.order_operations(ops.change_writes(order, 5))
+
+    resting = {"_id": "o", "filled_qty": 3, "total_qty": 8, "status": ops.ACTIVE_STATUS}
+    assert cancel._filter == amend._filter == resting
+    assert cancel._doc == {"$set": {"status": "CANCELLED"}}
+    assert amend._doc == {"$set": {"total_qty": 5}}
+
+
+def test_book_filter_only_matches_version_without_pending_writes():
+    assert ops.book_filter("FB", 3) == {"_id": "FB", "version": 3,
+                                        "pending": {"$exists": False}}
+    assert ops.book_update() == {"$inc": {"version": 1}}
+    assert ops.book_update({"orders": []}) == {"$inc": {"version": 1},
+                                               "$set": {"pending": {"orders": []}}}
+    assert ops.book_version(None) == 0
+    assert ops.book_version({"_id": "FB", "version": 4}) == 4
+
+
+def test_only_duplicates_of_applied_writes_are_skipped():
+    duplicate = {"code": ops.DUPLICATE_KEY}
+
+    assert ops.only_duplicates({"writeErrors": [duplicate, duplicate]})
+    assert not ops.only_duplicates({"writeErrors": [duplicate, {"code": 121}]})
+    assert not ops.only_duplicates({"writeErrors": [], "writeConcernErrors": [{"code": 64}]})
+
+
+def test_version_bump_is_checked_against_changed_book():
+    stale = pymongo.results.UpdateResult({"n": 0, "nModified": 0}, acknowledged=True)
+    bumped = pymongo.results.UpdateResult({"n": 1, "nModified": 1}, acknowledged=True)
+    unacknowledged = pymongo.results.UpdateResult(None, acknowledged=False)
+
+    assert ops.version_bump("FB", 0)["upsert"]
+    assert ops.version_bump("FB", 2, {"orders": []})["update"] == \
+        {"$inc": {"version": 1}, "$set": {"pending": {"orders": []}}}
+    ops.check_version_bump("FB", bumped)
+    ops.check_version_bump("FB", unacknowledged)
+    for result in (stale, None):
+        with pytest.raises(ops.StaleBookError):
+            ops.check_version_bump("FB", result)
+
+
+def test_skip_duplicates_reraises_other_write_errors():
+    ops.skip_duplicates(pymongo.errors.BulkWriteError(
+        {"writeErrors": [{"code": ops.DUPLICATE_KEY}]}))
+
+    with pytest.raises(pymongo.errors.BulkWriteError):
+        ops.skip_duplicates(pymongo.errors.BulkWriteError({"writeErrors": [{"code": 121}]}))
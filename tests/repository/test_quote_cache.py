@@ -0,0 +1,30 @@
+from stock_exchange.repository.quote_cache import QuoteCache
+
+
+def test_quote_cache_counts_miss_for_unknown_stock():
+    quotes = QuoteCache()
+
+    assert quotes.get("FB") is None
+    assert quotes.stats() == {"hits": 0, "misses": 1}
+
+
+def test_quote_cache_serves_updated_quote():
+    quotes = QuoteCache()
+    quotes.update("FB", 20.0, 21.0, 20.5)
+
+    assert quotes.get("FB") == (20.0, 21.0, 20.5)
+    assert quotes.stats() == {"hits": 1, "misses": 0}
+
+
+def test_quote_cache_stores_missing_prices_as_zero():
+    quotes = QuoteCache()
+
+    assert quotes.update("FB", None, 21.0, None) == (0, 21.0, 0)
+
+
+def test_quote_cache_invalidate_drops_quote():
+    quotes = QuoteCache()
+    quotes.update("FB", 20.0, 21.0, 20.5)
+    quotes.invalidate("FB")
+
+    assert quotes.get("FB") is None
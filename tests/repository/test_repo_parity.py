@@ -0,0 +1,70 @@
+"""Parity of MongoRepo and InMemoryRepo, needs MongoDB running on localhost
+
+Orders and history collections of the database are dropped by these tests.
+"""
+import re
+
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+from stock_exchange import commands  # noqa: E402
+from stock_exchange.cli import ConsoleInterface  # noqa: E402
+from stock_exchange.repository.memoryrepo import InMemoryRepo  # noqa: E402
+
+
+COMMAND_STREAM = [
+    "SELL FB MKT 5",
+    "BUY FB LMT $19.50 3",
+    "SELL FB LMT $20.00 10",
+    "SELL FB LMT $20.50 10",
+    "BUY FB LMT $20.00 4",
+    "BUY FB MKT 12",
+    "QUOTE FB",
+    "BUY SNAP MKT 7",
+    "SELL SNAP LMT $5.00 3",
+    "SELL SNAP MKT 2",
+    "BUY SNAP LMT $5.10 6",
+    "SELL SNAP LMT $4.90 6",
+    "QUOTE SNAP",
+    "VIEW ORDERS",
+]
+
+
+@pytest.fixture
+def mongo_repo():
+    try:
+        pymongo.MongoClient(serverSelectionTimeoutMS=500).admin.command('ping')
+    except pymongo.errors.PyMongoError:
+        pytest.skip("MongoDB is not running")
+    from stock_exchange.repository.mongorepo import MongoRepo
+
+    repo = MongoRepo()
+    repo.clear()
+    yield repo
+    repo.clear()
+
+
+def run(repo):
+    outputs = []
+    for line in COMMAND_STREAM:
+        command = commands.parse_command(line.split())
+        use_case = ConsoleInterface.USE_CASES[command.name](repo)
+        value = use_case.process_request(command.request).value
+        outputs.append(value if isinstance(value, str) else "".join(value))
+    # Memory repository numbers orders, MongoDB gives them ObjectIds
+    return [re.sub(r", order id \w+$", "", output) for output in outputs]
+
+
+def without_id(documents):
+    return [{key: value for key, value in document.items() if key not in ("_id", "timestamp")}
+            for document in documents]
+
+
+def test_repositories_produce_identical_outputs_orders_and_history(mongo_repo):
+    memory_repo = InMemoryRepo()
+
+    assert run(mongo_repo) == run(memory_repo)
+    assert without_id(mongo_repo.collection.find()) == \
+        without_id(order.to_dict() for order in memory_repo.orders)
+    assert without_id(mongo_repo.history.find()) == without_id(memory_repo.history)
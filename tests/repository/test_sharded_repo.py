@@ -0,0 +1,115 @@
+import pytest
+
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+from stock_exchange.repository.sharded_repo import ShardedRepo, shard_of
+
+
+def mkt(stock_name, amount):
+    return {"command": {"stock_name": stock_name, "amount": amount}}
+
+
+def lmt(stock_name, price, amount):
+    return {"command": {"stock_name": stock_name, "price": TICK_SIZES.to_ticks(stock_name, price),
+                        "amount": amount}}
+
+
+@pytest.fixture
+def repo():
+    repo = ShardedRepo(InMemoryRepo, 3)
+    yield repo
+    repo.close()
+
+
+def place_flow(repo):
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_sell(lmt("AAPL", "$30.00", "5"))
+    repo.place_mkt_buy(mkt("FB", "4"))
+    repo.place_lmt_buy(lmt("GOOG", "$10.00", "2"))
+    repo.place_mkt_sell(mkt("GOOG", "1"))
+    repo.place_lmt_buy(lmt("AAPL", "$31.00", "5"))
+
+
+def test_shard_of_is_stable():
+    assert shard_of("FB", 4) == shard_of("FB", 4)
+    assert {shard_of("S{}".format(i), 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_sharded_repo_matches_single_repo(repo):
+    single = InMemoryRepo()
+    place_flow(repo)
+    place_flow(single)
+
+    assert "".join(repo.view()) == "".join(single.view())
+    assert "".join(repo.view(status="FILLED", page=2, limit=1)) == \
+        "".join(single.view(status="FILLED", page=2, limit=1))
+    assert "".join(repo.view(stock_name="GOOG")) == "".join(single.view(stock_name="GOOG"))
+    for stock_name in ("FB", "AAPL", "GOOG"):
+        assert repo.quote(stock_name) == single.quote(stock_name)
+        assert repo.depth(stock_name, 3) == single.depth(stock_name, 3)
+    stock_names = ["GOOG", "FB", "MSFT", "AAPL", "FB"]
+    assert repo.quote_many(stock_names) == single.quote_many(stock_names)
+
+
+def test_sharded_repo_views_orders_after_failed_placement(repo):
+    single = InMemoryRepo()
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    single.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    with pytest.raises(KeyError):
+        repo.place_lmt_buy({"command": {"stock_name": "AAPL"}})
+    place_flow(repo)
+    place_flow(single)
+
+    assert "".join(repo.view()) == "".join(single.view())
+    assert "".join(repo.view(page=3, limit=2)) == "".join(single.view(page=3, limit=2))
+
+
+def test_find_returns_only_oldest_orders_of_page():
+    repo = InMemoryRepo()
+    place_flow(repo)
+
+    assert [position for position, _ in repo.find(order_type="BUY", limit=2)] == [2, 3]
+    assert len(repo.find(limit=0)) == 0
+
+
+def test_sharded_repo_pipelines_orders_of_one_stock(repo):
+    futures = [repo.submit("place_lmt_sell", lmt("FB", "$20.00", "1")) for _ in range(50)]
+    futures.append(repo.submit("place_mkt_buy", mkt("FB", "50")))
+
+    # Worker of FB numbers its orders shard + 1, shard + 1 + shards, ...
+    assert [future.result() for future in futures][-1] == \
+        "You have placed a MKT BUY order for 50 FB shares, order id {}".format(
+            shard_of("FB", 3) + 1 + 50 * 3)
+    assert repo.quote("FB") == "FB BID: 0 ASK: 0 LAST: 20.0"
+
+
+def test_sharded_repo_clear_drops_orders_of_all_workers(repo):
+    place_flow(repo)
+    repo.clear()
+
+    assert list(repo.view()) == []
+
+
+def test_sharded_repo_cancels_order_of_any_worker(repo):
+    place_flow(repo)
+    placed = repo.place_lmt_buy(lmt("MSFT", "$10.00", "3"))
+    order_id = placed.rsplit(" ", 1)[-1]
+
+    assert repo.amend(order_id, 2) == "You have amended order {} to 2 MSFT shares".format(order_id)
+    assert repo.cancel(order_id) == "You have cancelled order {} for 2 MSFT shares".format(
+        order_id)
+    assert repo.cancel(order_id) == "Order {} is not resting".format(order_id)
+    assert repo.quote("MSFT") == "MSFT BID: 0 ASK: 0 LAST: 0"
+
+
+def test_spawned_workers_match_with_settings_of_router():
+    TICK_SIZES.set("BRK", "0.05")
+    repo = ShardedRepo(InMemoryRepo, 2, start_method="spawn")
+    try:
+        repo.place_lmt_sell(lmt("BRK", "$20.05", "3"))
+
+        assert repo.quote("BRK") == "BRK BID: 0 ASK: 20.05 LAST: 0"
+        assert repo.depth("BRK", 1) == ["BRK ASK 20.05 3\n"]
+    finally:
+        repo.close()
+        TICK_SIZES.sizes.pop("BRK")
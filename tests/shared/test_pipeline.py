@@ -0,0 +1,58 @@
+import asyncio
+
+from stock_exchange.shared.pipeline import CommandPipeline
+
+
+async def record(events, name, delay):
+    events.append("start " + name)
+    await asyncio.sleep(delay)
+    events.append("end " + name)
+    return name
+
+
+def test_pipeline_serializes_commands_with_the_same_key():
+    async def run():
+        events = []
+        pipeline = CommandPipeline()
+        first = pipeline.submit("FB", record, events, "first", 0.01)
+        second = pipeline.submit("FB", record, events, "second", 0)
+        results = await asyncio.gather(first, second)
+        await pipeline.close()
+        return events, results
+
+    events, results = asyncio.run(run())
+
+    assert results == ["first", "second"]
+    assert events == ["start first", "end first", "start second", "end second"]
+
+
+def test_pipeline_runs_commands_with_different_keys_concurrently():
+    async def run():
+        events = []
+        pipeline = CommandPipeline()
+        slow = pipeline.submit("FB", record, events, "slow", 0.01)
+        fast = pipeline.submit("SNAP", record, events, "fast", 0)
+        await asyncio.gather(slow, fast)
+        await pipeline.close()
+        return events
+
+    events = asyncio.run(run())
+
+    assert events.index("end fast") < events.index("end slow")
+
+
+def test_pipeline_propagates_command_errors():
+    async def fail():
+        raise ValueError("Just an error message")
+
+    async def run():
+        pipeline = CommandPipeline()
+        future = pipeline.submit("FB", fail)
+        try:
+            await future
+        except ValueError as exc:
+            return str(exc)
+        finally:
+            await pipeline.close()
+
+    assert asyncio.run(run()) == "Just an error message"
@@ -0,0 +1,48 @@
+import json
+
+from stock_exchange.shared.stats import Histogram, Stats
+
+
+def test_histogram_counts_small_values_exactly():
+    histogram = Histogram()
+    for value in range(1, 11):
+        histogram.record(value)
+
+    assert histogram.percentile(0.5) == 5
+    assert histogram.percentile(0.99) == 10
+    assert histogram.to_dict(unit=1)["mean"] == 5.5
+
+
+def test_histogram_keeps_relative_precision_of_large_values():
+    histogram = Histogram()
+    for value in (1000, 1000000, 1000000000):
+        histogram.record(value)
+
+    for fraction, value in ((0.3, 1000), (0.6, 1000000), (1.0, 1000000000)):
+        assert abs(histogram.percentile(fraction) - value) <= value / 2 ** Histogram.SUB_BITS
+    assert len(histogram.counts) == 3
+
+
+def test_empty_histogram():
+    assert Histogram().to_dict() == {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0,
+                                     "p999": 0.0, "max": 0.0}
+
+
+def test_stats_report_and_dump(tmp_path):
+    stats = Stats()
+    assert stats.report() == Stats.DISABLED
+    stats.enabled = True
+    stats.record("parse", 2000)
+    stats.record("parse", 4000)
+    stats.count("match_fills", 3)
+
+    assert stats.report().splitlines() == [
+        "STAGE COUNT MEAN_US P50_US P99_US P999_US MAX_US",
+        "parse 2 3.00 2.02 4.00 4.00 4.00",
+        "match_fills 3",
+    ]
+    path = tmp_path / "stats.json"
+    stats.dump(str(path))
+    assert json.loads(path.read_text()) == stats.to_dict()
+    stats.reset()
+    assert stats.to_dict() == {"stages": {}, "counters": {}}
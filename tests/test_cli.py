@@ -0,0 +1,52 @@
+import io
+
+from stock_exchange.cli import ConsoleInterface
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+LINES = [
+    "BUY FB LMT $10 5\n",
+    "SELL FB MKT 2\n",
+    "HELLO\n",
+    "VIEW ORDERS\n",
+    "QUOTE FB\n",
+]
+
+
+def test_run_batch_writes_interactive_output():
+    output = io.StringIO()
+
+    summary = ConsoleInterface(InMemoryRepo()).run_batch(LINES, output)
+
+    assert output.getvalue() == (
+        "You have placed a LMT BUY order for 5 FB shares at 10.0 each, order id 1\n"
+        "You have placed a MKT SELL order for 2 FB shares, order id 2\n"
+        "1. FB LMT BUY 10.0 2/5 PARTIAL\n"
+        "2. FB MKT SELL 10.0 2/2 FILLED\n"
+        "FB BID: 10.0 ASK: 0 LAST: 10.0\n"
+    )
+    assert (summary["commands"], summary["orders"], summary["unknown"]) == (4, 2, 1)
+
+
+def test_run_batch_reports_price_between_ticks():
+    output = io.StringIO()
+
+    summary = ConsoleInterface(InMemoryRepo()).run_batch(["BUY AAPL LMT $1.005 10\n"], output)
+
+    assert output.getvalue() == (
+        "{'type': 'PARAMETERS_ERROR', 'message': "
+        "'command: price: Price $1.005 of AAPL is not a multiple of tick size 0.01'}\n")
+    assert summary["unknown"] == 0
+
+
+def test_run_batch_summary_only_and_quit():
+    output = io.StringIO()
+    repo = InMemoryRepo()
+
+    summary = ConsoleInterface(repo).run_batch(LINES[:2] + ["QUIT\n"] + LINES[2:], output,
+                                               summary_only=True)
+
+    assert output.getvalue() == ""
+    assert summary["orders"] == 2
+    assert summary["commands"] == 2
+    assert repo.orders == []
@@ -0,0 +1,113 @@
+from stock_exchange import commands
+
+
+def test_parse_buy_mkt_command():
+    command = commands.parse_command("BUY FB MKT 10".split())
+
+    assert command.name == commands.PLACE_MKT_BUY
+    assert command.stock_name == "FB"
+    assert command.request.command == {"stock_name": "FB", "amount": 10}
+
+
+def test_parse_sell_lmt_command():
+    command = commands.parse_command("SELL FB LMT $20.00 10".split())
+
+    assert command.name == commands.PLACE_LMT_SELL
+    assert command.request.command == {"stock_name": "FB", "price": 2000, "amount": 10}
+
+
+def test_parse_quote_command():
+    command = commands.parse_command("QUOTE SNAP".split())
+
+    assert command.name == commands.QUOTE
+    assert command.request.stock_name == "SNAP"
+
+
+def test_parse_bars_command():
+    command = commands.parse_command("BARS SNAP 1m".split())
+
+    assert command.name == commands.BARS
+    assert command.stock_name == "SNAP"
+    assert (command.request.stock_name, command.request.interval) == ("SNAP", "1m")
+
+
+def test_parse_bars_command_with_unknown_interval():
+    command = commands.parse_command("BARS SNAP 5m".split())
+
+    assert command.name == commands.BARS
+    assert bool(command.request) is False
+
+
+def test_parse_quote_command_of_several_stocks():
+    command = commands.parse_command("QUOTE SNAP FB AAPL".split())
+
+    assert command.name == commands.QUOTES
+    assert command.stock_name is None
+    assert command.request.stock_names == ["SNAP", "FB", "AAPL"]
+
+
+def test_parse_depth_command():
+    command = commands.parse_command("DEPTH SNAP 5".split())
+
+    assert command.name == commands.DEPTH
+    assert (command.request.stock_name, command.request.levels) == ("SNAP", 5)
+    assert commands.parse_command("DEPTH SNAP five".split()) is None
+
+
+def test_parse_view_command_has_no_stock_name():
+    command = commands.parse_command("VIEW ORDERS".split())
+
+    assert command.name == commands.VIEW
+    assert command.stock_name is None
+
+
+def test_parse_unknown_or_incomplete_command():
+    assert commands.parse_command([]) is None
+    assert commands.parse_command("HELLO".split()) is None
+    assert commands.parse_command("BUY FB LMT $20.00".split()) is None
+
+
+def test_parse_view_command_with_filters():
+    command = commands.parse_command("VIEW ORDERS FB SELL PENDING PAGE 2 LIMIT 10".split())
+
+    assert command.request.filters == {"stock_name": "FB",
+                                       "order_type": "SELL",
+                                       "status": "PENDING",
+                                       "page": 2,
+                                       "limit": 10}
+
+
+def test_parse_view_command_with_incomplete_limit():
+    assert commands.parse_command("VIEW ORDERS LIMIT".split()) is None
+    assert commands.parse_command("VIEW ORDERS LIMIT ten".split()) is None
+
+
+def test_parse_lmt_command_rejects_price_between_ticks():
+    command = commands.parse_command("BUY FB LMT $20.005 10".split())
+
+    assert command.name == commands.PLACE_LMT_BUY
+    assert bool(command.request) is False
+    assert command.request.errors[0]['parameter'] == 'command: price'
+
+
+def test_parse_place_command_rejects_amount_that_is_no_integer():
+    command = commands.parse_command("SELL FB MKT 1.5".split())
+
+    assert command.name == commands.PLACE_MKT_SELL
+    assert command.request.errors == [{'parameter': 'command: amount',
+                                       'message': 'Is not an integer'}]
+
+
+def test_parse_stats_command():
+    assert commands.parse_command(["STATS"]) == commands.Command(commands.STATS, None, None)
+
+
+def test_parse_cancel_and_amend_commands():
+    cancel = commands.parse_command("CANCEL 17".split())
+    amend = commands.parse_command("AMEND 17 5".split())
+
+    assert (cancel.name, cancel.stock_name) == (commands.CANCEL, None)
+    assert cancel.request.order_id == "17"
+    assert (amend.name, amend.request.order_id, amend.request.amount) == (commands.AMEND, "17", 5)
+    assert not commands.parse_command("AMEND 17 0".split()).request
+    assert commands.parse_command("AMEND 17 five".split()) is None
@@ -0,0 +1,78 @@
+import io
+import types
+
+import pytest
+
+from stock_exchange import commands, instrumentation
+from stock_exchange.cli import ConsoleInterface
+from stock_exchange.domain.order_book import OrderBook
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+from stock_exchange.shared.stats import STATS, Stats
+
+
+@pytest.fixture
+def stats():
+    instrumentation.enable()
+    yield STATS
+    instrumentation.disable()
+    STATS.reset()
+
+
+def test_enabled_instrumentation_times_stages(stats):
+    output = io.StringIO()
+
+    ConsoleInterface(InMemoryRepo()).run_batch(
+        ["SELL FB LMT $10 5\n", "BUY FB LMT $10 2\n", "QUOTE FB\n"], output)
+
+    assert {stage: histogram.count for stage, histogram in stats.stages.items()} == {
+        "parse": 3, "validate": 3, "execute": 3, "match": 2, "format": 3}
+    assert stats.counters == {"match_fills": 1}
+
+
+def test_disabled_instrumentation_restores_originals():
+    parse_command = commands.parse_command
+    place = OrderBook.place
+    stats = Stats()
+
+    instrumentation.enable(stats)
+    assert commands.parse_command is not parse_command
+    instrumentation.disable(stats)
+
+    assert commands.parse_command is parse_command
+    assert OrderBook.place is place
+    assert not stats.enabled
+
+
+def test_stats_command_writes_report(stats):
+    output = io.StringIO()
+
+    summary = ConsoleInterface(InMemoryRepo()).run_batch(["BUY FB MKT 1\n", "STATS\n"], output)
+
+    lines = output.getvalue().splitlines()
+    assert lines[1] == "STAGE COUNT MEAN_US P50_US P99_US P999_US MAX_US"
+    assert lines[2].startswith("execute 1 ")
+    assert summary["commands"] == 1
+
+
+def test_enabled_instrumentation_times_validation_of_cancel_and_amend(stats):
+    ConsoleInterface(InMemoryRepo()).run_batch(
+        ["SELL FB LMT $10 5\n", "AMEND 1 3\n", "CANCEL 1\n"], io.StringIO())
+
+    assert stats.stages["validate"].count == 3
+
+
+def test_enabled_instrumentation_times_database_round_trips(stats):
+    mongo_monitoring = pytest.importorskip("stock_exchange.repository.mongo_monitoring")
+
+    for command_name in ("find", "getMore", "update", "hello"):
+        mongo_monitoring.TIMER.succeeded(
+            types.SimpleNamespace(command_name=command_name, duration_micros=250))
+    mongo_monitoring.TIMER.failed(types.SimpleNamespace(command_name="insert",
+                                                        duration_micros=100))
+    instrumentation.disable()
+    mongo_monitoring.TIMER.succeeded(types.SimpleNamespace(command_name="find",
+                                                           duration_micros=250))
+
+    assert {stage: histogram.count for stage, histogram in stats.stages.items()} == {
+        "db_read": 2, "db_write": 2}
+    assert stats.stages["db_read"].max == 250000
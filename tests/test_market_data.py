@@ -0,0 +1,125 @@
+import os
+import socket
+
+from stock_exchange.domain.ticks import TICK_SIZES
+from stock_exchange.market_data import (
+    ConflatingQueue,
+    LevelUpdate,
+    MarketDataBus,
+    MarketDataFeed,
+    TradePrint,
+)
+from stock_exchange.repository.memoryrepo import InMemoryRepo
+
+
+def lmt(stock_name, price, amount):
+    return {"command": {"stock_name": stock_name, "price": TICK_SIZES.to_ticks(stock_name, price),
+                        "amount": amount}}
+
+
+def test_memory_repo_publishes_trades_and_changed_levels():
+    repo = InMemoryRepo()
+    published = []
+    repo.attach_market_data(MarketDataBus())
+    repo.market_data.subscribe(published.extend)
+
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_buy(lmt("FB", "$21.00", "4"))
+
+    assert published == [
+        LevelUpdate("FB", "SELL", 2000, 10),
+        TradePrint("FB", 2000, 4, repo.orders[1].timestamp),
+        LevelUpdate("FB", "SELL", 2000, 6),
+    ]
+
+
+def test_bus_sends_current_depth_to_new_subscriber():
+    bus = MarketDataBus()
+    bus.publish([LevelUpdate("FB", "BUY", 1000, 5), LevelUpdate("FB", "SELL", 1100, 3)])
+    bus.publish([LevelUpdate("FB", "BUY", 1000, 0)])
+    received = []
+
+    bus.subscribe(received.append)
+
+    assert received == [[LevelUpdate("FB", "SELL", 1100, 3)]]
+
+
+def test_bus_replace_empties_stale_levels_of_stock():
+    bus = MarketDataBus()
+    bus.publish([LevelUpdate("FB", "BUY", 1000, 5), LevelUpdate("AAPL", "BUY", 500, 1)])
+
+    bus.replace("FB", [LevelUpdate("FB", "BUY", 990, 2)])
+
+    assert bus.levels == {("AAPL", "BUY", 500): 1, ("FB", "BUY", 990): 2}
+
+
+def test_conflating_queue_keeps_latest_level_sizes_and_all_trades():
+    queue = ConflatingQueue()
+    queue([LevelUpdate("FB", "BUY", 1000, 5), TradePrint("FB", 1000, 1, 1)])
+    queue([LevelUpdate("FB", "BUY", 1000, 4), TradePrint("FB", 1000, 2, 2)])
+
+    assert queue.get() == [TradePrint("FB", 1000, 1, 1), LevelUpdate("FB", "BUY", 1000, 4),
+                           TradePrint("FB", 1000, 2, 2)]
+    assert queue.get(timeout=0) == []
+
+
+def test_conflating_queue_drops_oldest_messages_of_slow_consumer():
+    queue = ConflatingQueue(max_pending=2)
+    queue([TradePrint("FB", 1000, amount, amount) for amount in (1, 2, 3)])
+
+    assert [trade.amount for trade in queue.get()] == [2, 3]
+    assert queue.dropped == 1
+
+
+def test_conflating_queue_never_drops_level_updates():
+    queue = ConflatingQueue(max_pending=1)
+    queue([LevelUpdate("FB", "BUY", 1000, 5), TradePrint("FB", 1000, 1, 1),
+           LevelUpdate("FB", "SELL", 1010, 3)])
+    queue([TradePrint("FB", 1000, 2, 2), LevelUpdate("FB", "BUY", 1000, 4)])
+
+    assert queue.get() == [LevelUpdate("FB", "SELL", 1010, 3), TradePrint("FB", 1000, 2, 2),
+                           LevelUpdate("FB", "BUY", 1000, 4)]
+    assert queue.dropped == 1
+
+
+def test_feed_streams_depth_and_updates_over_unix_socket(tmpdir):
+    repo = InMemoryRepo()
+    repo.place_lmt_buy(lmt("FB", "$19.00", "5"))
+    repo.attach_market_data(MarketDataBus())
+    path = os.path.join(str(tmpdir), "feed.sock")
+    feed = MarketDataFeed(repo.market_data, path).start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.settimeout(5)
+            stream = client.makefile()
+
+            assert stream.readline() == "L2 FB BUY 19.0 5\n"
+
+            repo.place_lmt_sell(lmt("FB", "$19.00", "2"))
+
+            assert stream.readline().startswith("TRADE FB 19.0 2 ")
+            assert stream.readline() == "L2 FB BUY 19.0 3\n"
+    finally:
+        feed.close()
+
+
+def test_memory_repo_publishes_levels_changed_by_cancel_and_amend():
+    repo = InMemoryRepo()
+    published = []
+    repo.attach_market_data(MarketDataBus())
+    repo.place_lmt_sell(lmt("FB", "$20.00", "10"))
+    repo.place_lmt_sell(lmt("FB", "$20.00", "5"))
+    repo.market_data.subscribe(published.extend)
+
+    repo.amend("1", 4)
+    repo.cancel("2")
+
+    assert published == [
+        LevelUpdate("FB", "SELL", 2000, 15),
+        LevelUpdate("FB", "SELL", 2000, 9),
+        LevelUpdate("FB", "SELL", 2000, 4),
+    ]
+    repo.cancel("1")
+    assert published[-1] == LevelUpdate("FB", "SELL", 2000, 0)
+    assert repo.market_data.levels == {}
@@ -0,0 +1,58 @@
+import asyncio
+from unittest import mock
+
+from stock_exchange.server import OrderServer
+
+
+async def exchange(repo, lines):
+    server = await OrderServer(repo).start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(line + "\n" for line in lines).encode())
+    await writer.drain()
+    responses = [(await reader.readline()).decode().rstrip("\n") for _ in lines[:-1]]
+    assert await reader.readline() == b""
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return responses
+
+
+def test_order_server_answers_commands_in_order():
+    repo = mock.Mock()
+    repo.place_mkt_buy = mock.AsyncMock(return_value="You have placed a MKT BUY order")
+    repo.quote = mock.AsyncMock(return_value="FB BID: 0 ASK: 0 LAST: 0")
+
+    responses = asyncio.run(exchange(repo, ["BUY FB MKT 10", "QUOTE FB", "QUIT"]))
+
+    assert responses == ["You have placed a MKT BUY order", "FB BID: 0 ASK: 0 LAST: 0"]
+
+
+def test_order_server_reports_unknown_commands():
+    repo = mock.Mock()
+
+    responses = asyncio.run(exchange(repo, ["HELLO", "QUIT"]))
+
+    assert responses == ["{'type': 'PARAMETERS_ERROR', 'message': 'Unknown command'}"]
+
+
+def test_order_server_cancels_order_after_placing_it():
+    performed = []
+
+    async def place_lmt_buy(command):
+        await asyncio.sleep(0.05)
+        performed.append("BUY")
+        return "You have placed a LMT BUY order for 10 FB shares at 20.0 each, order id 1"
+
+    async def cancel(order_id):
+        performed.append("CANCEL")
+        return "You have cancelled order {} for 10 FB shares".format(order_id)
+
+    repo = mock.Mock()
+    repo.place_lmt_buy = place_lmt_buy
+    repo.cancel = cancel
+
+    responses = asyncio.run(exchange(repo, ["BUY FB LMT $20.00 10", "CANCEL 1", "QUIT"]))
+
+    assert performed == ["BUY", "CANCEL"]
+    assert responses[1] == "You have cancelled order 1 for 10 FB shares"
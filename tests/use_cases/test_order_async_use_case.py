@@ -0,0 +1,52 @@
+import asyncio
+from unittest import mock
+
+from stock_exchange.use_cases import request_objects as req
+from stock_exchange.shared import response_object as res
+from stock_exchange.use_cases import async_order_use_case as aouc
+
+
+def test_order_quote_async_with_stock_name():
+    repo = mock.Mock()
+    repo.quote = mock.AsyncMock(return_value="SNAP BID: 20.0 ASK: 21.0 LAST: 20.0")
+
+    use_case = aouc.OrderQuoteAsyncUseCase(repo)
+    request_object = req.OrderQuoteRequestObject.from_dict({'command': {'stock_name': "SNAP"}})
+
+    response_object = asyncio.run(use_case.execute(request_object))
+
+    assert bool(response_object) is True
+    repo.quote.assert_awaited_with(stock_name="SNAP")
+    assert response_object.value == "SNAP BID: 20.0 ASK: 21.0 LAST: 20.0"
+
+
+def test_order_mkt_buy_async_handles_generic_error():
+    repo = mock.Mock()
+    repo.place_mkt_buy = mock.AsyncMock(side_effect=Exception("Just an error message"))
+
+    use_case = aouc.OrderPlaceMktBuyAsyncUseCase(repo)
+    request_object = req.OrderPlaceMktRequestObject.from_dict({'command': {"stock_name": "FB",
+                                                                           "amount": 10}})
+
+    response_object = asyncio.run(use_case.execute(request_object))
+
+    assert bool(response_object) is False
+    assert response_object.value == {
+        'type': res.ResponseFailure.SYSTEM_ERROR,
+        'message': "Exception: Just an error message"
+    }
+
+
+def test_order_lmt_sell_async_handles_bad_request():
+    repo = mock.Mock()
+
+    use_case = aouc.OrderPlaceLmtSellAsyncUseCase(repo)
+    request_object = req.OrderPlaceLmtRequestObject.from_dict({'command': 5})
+
+    response_object = asyncio.run(use_case.execute(request_object))
+
+    assert bool(response_object) is False
+    assert response_object.value == {
+        'type': res.ResponseFailure.PARAMETERS_ERROR,
+        'message': "command: Is not iterable"
+    }
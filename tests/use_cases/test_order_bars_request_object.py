@@ -0,0 +1,24 @@
+from stock_exchange.use_cases import request_objects as ro
+
+
+def test_build_order_bars_request_object_from_dict():
+    req = ro.OrderBarsRequestObject.from_dict({'command': {"stock_name": "FB", "interval": "1h"}})
+
+    assert (req.stock_name, req.interval) == ("FB", "1h")
+    assert bool(req) is True
+
+
+def test_build_order_bars_request_object_without_interval():
+    req = ro.OrderBarsRequestObject.from_dict({'command': {"stock_name": "FB"}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command'
+    assert bool(req) is False
+
+
+def test_build_order_bars_request_object_with_unknown_interval():
+    req = ro.OrderBarsRequestObject.from_dict({'command': {"stock_name": "FB", "interval": "1d"}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command: interval'
+    assert bool(req) is False
@@ -0,0 +1,31 @@
+from stock_exchange.use_cases import request_objects as ro
+
+
+def test_build_order_cancel_request_object_from_dict():
+    req = ro.OrderCancelRequestObject.from_dict({'command': {"order_id": "17"}})
+
+    assert req.order_id == "17"
+    assert bool(req) is True
+
+
+def test_build_order_cancel_request_object_without_order_id():
+    req = ro.OrderCancelRequestObject.from_dict({'command': {}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command'
+    assert bool(req) is False
+
+
+def test_build_order_amend_request_object_from_dict():
+    req = ro.OrderAmendRequestObject.from_dict({'command': {"order_id": "17", "amount": 5}})
+
+    assert (req.order_id, req.amount) == ("17", 5)
+    assert bool(req) is True
+
+
+def test_build_order_amend_request_object_with_amount_not_positive():
+    req = ro.OrderAmendRequestObject.from_dict({'command': {"order_id": "17", "amount": 0}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command: amount'
+    assert bool(req) is False
@@ -0,0 +1,24 @@
+from stock_exchange.use_cases import request_objects as ro
+
+
+def test_build_order_depth_request_object_from_dict():
+    req = ro.OrderDepthRequestObject.from_dict({'command': {"stock_name": "FB", "levels": 5}})
+
+    assert (req.stock_name, req.levels) == ("FB", 5)
+    assert bool(req) is True
+
+
+def test_build_order_depth_request_object_without_levels():
+    req = ro.OrderDepthRequestObject.from_dict({'command': {"stock_name": "FB"}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command'
+    assert bool(req) is False
+
+
+def test_build_order_depth_request_object_with_levels_not_positive():
+    req = ro.OrderDepthRequestObject.from_dict({'command': {"stock_name": "FB", "levels": 0}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command: levels'
+    assert bool(req) is False
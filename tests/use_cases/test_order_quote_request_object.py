@@ -30,3 +30,11 @@ def test_build_order_quote_request_object_from_dict_without_stock_name():
     assert req.has_errors()
     assert req.errors[0]['parameter'] == 'command'
     assert bool(req) is False
+
+
+def test_build_order_quote_request_object_from_dict_with_several_stock_names():
+    req = ro.OrderQuoteRequestObject.from_dict({'command': {"stock_names": ["FB", "AAPL"]}})
+
+    assert req.stock_name == "FB"
+    assert req.stock_names == ["FB", "AAPL"]
+    assert bool(req) is True
@@ -27,6 +27,21 @@ def test_order_quote_with_stock_name(order_quote):
     assert response_object.value == order_quote
 
 
+def test_order_quote_of_several_stocks_in_one_call():
+    repo = mock.Mock()
+    repo.quote_many.return_value = ["SNAP BID: 0 ASK: 0 LAST: 0\nFB BID: 0 ASK: 0 LAST: 0\n"]
+
+    order_list_use_case = ouc.OrderQuoteUseCase(repo)
+    command = {'stock_names': ["SNAP", "FB"]}
+    request_object = req.OrderQuoteRequestObject.from_dict({'command': command})
+
+    response_object = order_list_use_case.execute(request_object)
+
+    assert bool(response_object) is True
+    repo.quote_many.assert_called_once_with(stock_names=["SNAP", "FB"])
+    repo.quote.assert_not_called()
+
+
 def test_order_quote_handles_generic_error():
     repo = mock.Mock()
     repo.quote.side_effect = Exception("Just an error message")
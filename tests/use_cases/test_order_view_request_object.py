@@ -30,3 +30,32 @@ def test_build_order_view_request_object_from_dict_with_wrong_command():
     assert req.has_errors()
     assert req.errors[0]['parameter'] == 'command'
     assert bool(req) is False
+
+
+def test_build_order_view_request_object_from_dict_with_filters():
+    req = ro.OrderViewRequestObject.from_dict({'command': "VIEW ORDERS",
+                                               'filters': {"stock_name": "FB",
+                                                           "status": "PENDING",
+                                                           "page": 2,
+                                                           "limit": 10}})
+
+    assert req.filters == {"stock_name": "FB", "status": "PENDING", "page": 2, "limit": 10}
+    assert bool(req) is True
+
+
+def test_build_order_view_request_object_from_dict_with_unknown_filter():
+    req = ro.OrderViewRequestObject.from_dict({'command': "VIEW ORDERS",
+                                               'filters': {"color": "red"}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'filters'
+    assert bool(req) is False
+
+
+def test_build_order_view_request_object_from_dict_with_page_without_limit():
+    req = ro.OrderViewRequestObject.from_dict({'command': "VIEW ORDERS",
+                                               'filters': {"page": 2}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'filters: page'
+    assert bool(req) is False
@@ -79,3 +79,27 @@ def test_build_order_buy_lmt_request_object_from_dict_with_limit_price_type_nega
     assert req.has_errors()
     assert req.errors[0]['parameter'] == 'command: amount'
     assert bool(req) is False
+
+
+def test_build_order_lmt_request_object_from_dict_converts_price_to_ticks():
+    req = ro.OrderPlaceLmtRequestObject.from_dict({'command': {"stock_name": "FB",
+                                                               "price": 20.05,
+                                                               "amount": 10}})
+
+    assert req.command == {"stock_name": "FB", "price": 2005, "amount": 10}
+
+
+def test_build_order_lmt_request_object_from_dict_with_price_between_ticks():
+    req = ro.OrderPlaceLmtRequestObject.from_dict({'command': {"stock_name": "FB",
+                                                               "price": 20.005,
+                                                               "amount": 10}})
+
+    assert req.has_errors()
+    assert req.errors[0]['parameter'] == 'command: price'
+
+
+def test_build_order_mkt_request_object_from_dict_with_amount_out_of_range():
+    req = ro.OrderPlaceMktRequestObject.from_dict({'command': {"stock_name": "FB",
+                                                               "amount": str(2 ** 63)}})
+
+    assert req.errors == [{'parameter': 'command: amount', 'message': 'Is too large'}]